@@ -122,7 +122,7 @@ InputGeom::~InputGeom()
 	delete m_mesh;
 }
 
-bool InputGeom::loadMesh_raw(class rcContext* ctx, std::vector<float> &vertices, std::vector<int> &faces)
+bool InputGeom::loadMesh_raw(class rcContext* ctx, const float* vertices, int vertices_size, const int* faces, int faces_size)
 {
 	if (m_mesh)
 	{
@@ -140,7 +140,7 @@ bool InputGeom::loadMesh_raw(class rcContext* ctx, std::vector<float> &vertices,
 		ctx->log(RC_LOG_ERROR, "loadMesh: Out of memory 'm_mesh'.");
 		return false;
 	}
-	if (!m_mesh->load_raw(vertices, faces))
+	if (!m_mesh->load_raw(vertices, vertices_size, faces, faces_size))
 	{
 		ctx->log(RC_LOG_ERROR, "buildTiledNavigation: Could not load raw mesh data");
 		return false;
@@ -107,7 +107,7 @@ public:
 	bool load(class rcContext* ctx, const std::string& filepath);
 	bool saveGeomSet(const BuildSettings* settings);
 
-	bool loadMesh_raw(class rcContext* ctx, std::vector<float>& vertices, std::vector<int>& faces);
+	bool loadMesh_raw(class rcContext* ctx, const float* vertices, int vertices_size, const int* faces, int faces_size);
 
 	/// Method to return static mesh data.
 	const rcMeshLoaderObj* getMesh() const { return m_mesh; }
@@ -136,12 +136,12 @@ static int parseFace(char* row, int* data, int n, int vcnt)
 	return j;
 }
 
-bool rcMeshLoaderObj::load_raw(const std::vector<float>& vertices, const std::vector<int>& faces)
+bool rcMeshLoaderObj::load_raw(const float* vertices, int vertices_size, const int* faces, int faces_size)
 {
 	int vcap = 0;
 	int tcap = 0;
 
-	int vertex_count = vertices.size() / 3;
+	int vertex_count = vertices_size / 3;
 	for (int i = 0; i < vertex_count; i++)
 	{
 		addVertex(vertices[3*i], vertices[3*i + 1], vertices[3*i + 2], vcap);
@@ -152,7 +152,7 @@ bool rcMeshLoaderObj::load_raw(const std::vector<float>& vertices, const std::ve
 	bool is_init_triangle = false;
 	int v0 = 0;
 	int v1 = 0;
-	for (size_t i = 0; i < faces.size(); i++)
+	for (int i = 0; i < faces_size; i++)
 	{
 		int value = faces[i];
 		if (remain_steps == 0)
@@ -169,7 +169,7 @@ bool rcMeshLoaderObj::load_raw(const std::vector<float>& vertices, const std::ve
 					triangle_start_index = value;
 					is_init_triangle = true;
 				}
-				else
+				else if (i + 1 < faces_size)
 				{
 					addTriangle(triangle_start_index, value, faces[i + 1], tcap);
 				}
@@ -262,8 +262,12 @@ bool rcMeshLoaderObj::load(const std::string& filename)
 		if (row[0] == '#') continue;
 		if (row[0] == 'v' && row[1] != 'n' && row[1] != 't')
 		{
-			// Vertex pos
-			sscanf(row + 1, "%f %f %f", &x, &y, &z);
+			// Vertex pos, strtof continues from the end of the previous number,
+			// so the row is scanned once without the format string parsing of sscanf
+			char* end = row + 1;
+			x = strtof(end, &end);
+			y = strtof(end, &end);
+			z = strtof(end, &end);
 			addVertex(x, y, z, vcap);
 		}
 		if (row[0] == 'f')
@@ -29,7 +29,7 @@ public:
 	~rcMeshLoaderObj();
 
 	bool load(const std::string& fileName);
-	bool load_raw(const std::vector<float>& vertices, const std::vector<int> &faces);
+	bool load_raw(const float* vertices, int vertices_size, const int* faces, int faces_size);
 
 	const float* getVerts() const { return m_verts; }
 	const float* getNormals() const { return m_normals; }
@@ -21,6 +21,8 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <algorithm>
+#include <limits>
 //#include "SDL.h"
 //#include "SDL_opengl.h"
 /*#ifdef __APPLE__
@@ -489,6 +491,157 @@ void NavMeshTesterTool::set_points(const float* s, const float* p)
 	recalc();
 }
 
+int NavMeshTesterTool::find_straight_path(dtNavMeshQuery* query, const float* s, const float* p, int vertex_mode, std::vector<float>& path) const
+{
+	path.clear();
+
+	dtPolyRef startRef = 0;
+	dtPolyRef endRef = 0;
+	query->findNearestPoly(s, m_polyPickExt, &m_filter, &startRef, 0);
+	query->findNearestPoly(p, m_polyPickExt, &m_filter, &endRef, 0);
+	if (!startRef || !endRef)
+		return 0;
+
+	dtPolyRef polys[MAX_POLYS];
+	int npolys = 0;
+	query->findPath(startRef, endRef, s, p, &m_filter, polys, &npolys, MAX_POLYS);
+	return straight_path_in_corridor(query, s, p, endRef, polys, npolys, vertex_mode, path);
+}
+
+int NavMeshTesterTool::straight_path_in_corridor(dtNavMeshQuery* query, const float* s, const float* p, dtPolyRef endRef, const dtPolyRef* polys, int npolys, int vertex_mode, std::vector<float>& path) const
+{
+	path.clear();
+	if (!npolys)
+		return 0;
+
+	// In case of partial path, make sure the end point is clamped to the last polygon.
+	float epos[3];
+	dtVcopy(epos, p);
+	if (polys[npolys - 1] != endRef)
+		query->closestPointOnPoly(polys[npolys - 1], p, epos, 0);
+
+	float straightPath[MAX_POLYS * 3];
+	unsigned char straightPathFlags[MAX_POLYS];
+	dtPolyRef straightPathPolys[MAX_POLYS];
+	int nstraightPath = 0;
+	query->findStraightPath(s, epos, polys, npolys,
+		straightPath, straightPathFlags,
+		straightPathPolys, &nstraightPath, MAX_POLYS, vertex_mode);
+
+	path.assign(straightPath, straightPath + 3 * nstraightPath);
+	return nstraightPath;
+}
+
+void NavMeshTesterTool::find_straight_paths_shared(dtNavMeshQuery* query, const float* coordinates, int count, int vertex_mode, std::vector<int>& sizes, std::vector<float>& points) const
+{
+	sizes.assign(count, 0);
+	points.clear();
+	if (count <= 0)
+		return;
+
+	// nearest polygons of all start and end points, the points are sorted so equal points are neighbours and searched only once
+	std::vector<dtPolyRef> refs(2 * count, 0);
+	std::vector<int> order(2 * count);
+	for (int i = 0; i < 2 * count; i++)
+		order[i] = i;
+	std::sort(order.begin(), order.end(), [coordinates](int a, int b)
+		{
+			return std::lexicographical_compare(coordinates + 3 * a, coordinates + 3 * a + 3, coordinates + 3 * b, coordinates + 3 * b + 3);
+		});
+	for (int i = 0; i < 2 * count; i++)
+	{
+		const float* point = coordinates + 3 * order[i];
+		if (i > 0 && std::equal(point, point + 3, coordinates + 3 * order[i - 1]))
+			refs[order[i]] = refs[order[i - 1]];
+		else
+			query->findNearestPoly(point, m_polyPickExt, &m_filter, &refs[order[i]], 0);
+	}
+
+	// only the queries with identical start and end points share one search: the corridor costs depend on
+	// the exact positions, so pairs with the same polygons but other points get their own findPath
+	std::vector<int> queries;
+	queries.reserve(count);
+	for (int i = 0; i < count; i++)
+	{
+		if (refs[2 * i] && refs[2 * i + 1])
+			queries.push_back(i);
+	}
+	std::stable_sort(queries.begin(), queries.end(), [coordinates](int a, int b)
+		{
+			return std::lexicographical_compare(coordinates + 6 * a, coordinates + 6 * a + 6, coordinates + 6 * b, coordinates + 6 * b + 6);
+		});
+
+	std::vector<std::vector<float>> paths(count);
+	dtPolyRef polys[MAX_POLYS];
+	int npolys = 0;
+	for (size_t i = 0; i < queries.size(); i++)
+	{
+		const int q = queries[i];
+		const float* s = coordinates + 6 * q;
+		const float* p = s + 3;
+		if (i > 0 && std::equal(s, s + 6, coordinates + 6 * queries[i - 1]))
+		{
+			paths[q] = paths[queries[i - 1]];
+			sizes[q] = sizes[queries[i - 1]];
+			continue;
+		}
+		query->findPath(refs[2 * q], refs[2 * q + 1], s, p, &m_filter, polys, &npolys, MAX_POLYS);
+		sizes[q] = straight_path_in_corridor(query, s, p, refs[2 * q + 1], polys, npolys, vertex_mode, paths[q]);
+	}
+
+	for (int i = 0; i < count; i++)
+		points.insert(points.end(), paths[i].begin(), paths[i].end());
+}
+
+void NavMeshTesterTool::find_distances_to_wall(dtNavMeshQuery* query, const float* points, int count, float* distances) const
+{
+	float hitPos[3];
+	float hitNormal[3];
+	for (int i = 0; i < count; i++)
+	{
+		const float* point = points + 3 * i;
+		dtPolyRef ref = 0;
+		distances[i] = 0.0f;
+		query->findNearestPoly(point, m_polyPickExt, &m_filter, &ref, 0);
+		if (ref)
+			query->findDistanceToWall(ref, point, 100.0f, &m_filter, &distances[i], hitPos, hitNormal);
+	}
+}
+
+void NavMeshTesterTool::find_raycast_hits(dtNavMeshQuery* query, const float* starts, const float* ends, int count, float* hits) const
+{
+	dtPolyRef polys[MAX_POLYS];
+	float hitNormal[3];
+	for (int i = 0; i < count; i++)
+	{
+		const float* s = starts + 3 * i;
+		const float* p = ends + 3 * i;
+		float* hit = hits + 3 * i;
+		dtPolyRef startRef = 0;
+		query->findNearestPoly(s, m_polyPickExt, &m_filter, &startRef, 0);
+		if (!startRef)
+		{
+			hit[0] = hit[1] = hit[2] = std::numeric_limits<float>::quiet_NaN();
+			continue;
+		}
+
+		float t = 0;
+		int npolys = 0;
+		query->raycast(startRef, s, p, &m_filter, &t, hitNormal, polys, &npolys, MAX_POLYS);
+		if (t > 1)
+			dtVcopy(hit, p);
+		else
+			dtVlerp(hit, s, p, t);
+		// Adjust height.
+		if (npolys > 0)
+		{
+			float h = 0;
+			query->getPolyHeight(polys[npolys - 1], hit, &h);
+			hit[1] = h;
+		}
+	}
+}
+
 void NavMeshTesterTool::set_point(const float* p)
 {
 	m_sposSet = true;
@@ -19,6 +19,7 @@
 #ifndef NAVMESHTESTERTOOL_H
 #define NAVMESHTESTERTOOL_H
 
+#include <vector>
 #include "Sample.h"
 #include "DetourNavMesh.h"
 #include "DetourNavMeshQuery.h"
@@ -92,6 +93,8 @@ class NavMeshTesterTool : public SampleTool
 	float m_steerPoints[MAX_STEER_POINTS * 3];
 	int m_steerPointCount;
 
+	int straight_path_in_corridor(dtNavMeshQuery* query, const float* s, const float* p, dtPolyRef endRef, const dtPolyRef* polys, int npolys, int vertex_mode, std::vector<float>& path) const;
+
 public:
 	NavMeshTesterTool();
 
@@ -120,6 +123,10 @@ public:
 
 	void set_points(const float* s, const float* p);
 	void set_point(const float* p);
+	int find_straight_path(dtNavMeshQuery* query, const float* s, const float* p, int vertex_mode, std::vector<float>& path) const;  // the same search as in the straight mode, but with the external query object and without changing the tool state
+	void find_straight_paths_shared(dtNavMeshQuery* query, const float* coordinates, int count, int vertex_mode, std::vector<int>& sizes, std::vector<float>& points) const;  // the same as find_straight_path for each pair, but nearest polygons are found once per unique point and identical pairs are searched once
+	void find_distances_to_wall(dtNavMeshQuery* query, const float* points, int count, float* distances) const;  // the same as the distance mode for each point, but with the external query object and without changing the tool state
+	void find_raycast_hits(dtNavMeshQuery* query, const float* starts, const float* ends, int count, float* hits) const;  // the same as the raycast mode for each pair, hits of the pairs with the start outside of the navmesh are NaN
 
 	int get_namesh_polys_count() { return m_npolys; }
 	int get_path_points_count(){ return m_nstraightPath;}
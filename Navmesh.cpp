@@ -1,6 +1,15 @@
 #include "Navmesh.h"
+#include "DetourCommon.h"
 #include <algorithm>
 #include <cstring>
+#include <limits>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+// simple plane geometry used by load_navmesh_fresh, the geometry loader reads it directly from these static arrays
+static const float PLACEHOLDER_PLANE_VERTICES[] = { 4.0f, 0.0f, 4.0f, -4.0f, 0.0f, 4.0f, -4.0f, 0.0f, -4.0f, 4.0f, 0.0f, -4.0f };
+static const int PLACEHOLDER_PLANE_FACES[] = { 4, 0, 3, 2, 1 };
 
 Navmesh::Navmesh()
 {
@@ -13,6 +22,7 @@ Navmesh::Navmesh()
 	is_init = false;
 	is_crowd_init = false;
 	next_formation_id = 0;
+	filter_version = 0;
 }
 
 Navmesh::~Navmesh()
@@ -23,6 +33,7 @@ Navmesh::~Navmesh()
 
 void Navmesh::clear()
 {
+	free_thread_queries();
 	if (crowd)
 	{
 		dtFreeCrowd(crowd);
@@ -38,6 +49,42 @@ void Navmesh::clear()
 	is_crowd_init = false;
 }
 
+bool Navmesh::init_thread_queries()
+{
+	free_thread_queries();
+#ifdef _OPENMP
+	const int threads_count = omp_get_max_threads();
+	if (!is_build || threads_count <= 1)
+	{
+		return false;
+	}
+
+	thread_queries.assign(threads_count, 0);
+	for (int i = 0; i < threads_count; i++)
+	{
+		thread_queries[i] = dtAllocNavMeshQuery();
+		if (!thread_queries[i] || dtStatusFailed(thread_queries[i]->init(sample->getNavMesh(), 2048)))
+		{
+			ctx.log(RC_LOG_WARNING, "Init thread queries: fail to allocate navmesh queries, batch pathfinding is serial.");
+			free_thread_queries();
+			return false;
+		}
+	}
+	return true;
+#else
+	return false;
+#endif
+}
+
+void Navmesh::free_thread_queries()
+{
+	for (size_t i = 0; i < thread_queries.size(); i++)
+	{
+		dtFreeNavMeshQuery(thread_queries[i]);
+	}
+	thread_queries.clear();
+}
+
 std::string Navmesh::get_log()
 {
 	std::string to_return;
@@ -198,7 +245,12 @@ void Navmesh::load_navmesh(std::string file_path)
 {
 	if (is_init)
 	{
-		sample->load_from_file(file_path.c_str());
+		is_build = sample->load_from_file(file_path.c_str());
+		if (!is_build)
+		{
+			ctx.log(RC_LOG_ERROR, "Load navmesh: fail to read navmesh from file.");
+		}
+		init_thread_queries();
 	}
 	else
 	{
@@ -206,6 +258,64 @@ void Navmesh::load_navmesh(std::string file_path)
 	}
 }
 
+bool Navmesh::load_navmesh_fresh(std::string file_path)
+{
+	// the geometry is only the placeholder for the sample, the navmesh itself is not built from it
+	init_by_raw(PLACEHOLDER_PLANE_VERTICES, (int)(sizeof(PLACEHOLDER_PLANE_VERTICES) / sizeof(float)), PLACEHOLDER_PLANE_FACES, (int)(sizeof(PLACEHOLDER_PLANE_FACES) / sizeof(int)));
+	if (!is_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Load navmesh: fail to initialize geometry.");
+		return false;
+	}
+
+	is_build = sample->load_from_file(file_path.c_str());
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Load navmesh: fail to read navmesh from file.");
+	}
+	init_thread_queries();
+	return is_build;
+}
+
+std::vector<unsigned char> Navmesh::save_navmesh_to_bytes()
+{
+	std::vector<unsigned char> data;
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Save navmesh to bytes: navmesh is not builded.");
+		return data;
+	}
+
+	if (!sample->save_to_memory(data))
+	{
+		ctx.log(RC_LOG_ERROR, "Save navmesh to bytes: fail to serialize navmesh.");
+		data.clear();
+	}
+	return data;
+}
+
+bool Navmesh::load_navmesh_from_bytes(const unsigned char* data, size_t size)
+{
+	// the current geometry is kept (hit_mesh uses it), without geometry the placeholder is used as in load_navmesh_fresh
+	if (!is_init)
+	{
+		init_by_raw(PLACEHOLDER_PLANE_VERTICES, (int)(sizeof(PLACEHOLDER_PLANE_VERTICES) / sizeof(float)), PLACEHOLDER_PLANE_FACES, (int)(sizeof(PLACEHOLDER_PLANE_FACES) / sizeof(int)));
+		if (!is_init)
+		{
+			ctx.log(RC_LOG_ERROR, "Load navmesh from bytes: fail to initialize geometry.");
+			return false;
+		}
+	}
+
+	is_build = sample->load_from_memory(data, size);
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Load navmesh from bytes: data does not contain a valid navmesh.");
+	}
+	init_thread_queries();
+	return is_build;
+}
+
 std::tuple<std::vector<float>, std::vector<int>> Navmesh::get_navmesh_trianglulation()
 {
 	if (is_build)
@@ -395,7 +505,66 @@ std::tuple<std::vector<float>, std::vector<int>, std::vector<int>> Navmesh::get_
 	}
 }
 
-void Navmesh::init_by_raw(std::vector<float> vertices, std::vector<int> faces)
+std::vector<unsigned short> Navmesh::get_navmesh_poly_flags()
+{
+	std::vector<unsigned short> flags(0);
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Get navmesh poly flags: navmesh is not builded.");
+		return flags;
+	}
+
+	const dtNavMesh* navmesh = sample->getNavMesh();
+	int max_tiles = navmesh->getMaxTiles();
+	for (int i = 0; i < max_tiles; i++)
+	{
+		const dtMeshTile* tile = navmesh->getTile(i);
+		if (!tile->header) continue;
+
+		for (int j = 0; j < tile->header->polyCount; ++j)
+		{
+			const dtPoly* p = &tile->polys[j];
+			if (p->getType() == DT_POLYTYPE_OFFMESH_CONNECTION)	// skip off-mesh links.
+				continue;
+			flags.push_back(p->flags);
+		}
+	}
+	return flags;
+}
+
+std::vector<unsigned char> Navmesh::get_navmesh_poly_areas()
+{
+	std::vector<unsigned char> areas(0);
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Get navmesh poly areas: navmesh is not builded.");
+		return areas;
+	}
+
+	const dtNavMesh* navmesh = sample->getNavMesh();
+	int max_tiles = navmesh->getMaxTiles();
+	for (int i = 0; i < max_tiles; i++)
+	{
+		const dtMeshTile* tile = navmesh->getTile(i);
+		if (!tile->header) continue;
+
+		for (int j = 0; j < tile->header->polyCount; ++j)
+		{
+			const dtPoly* p = &tile->polys[j];
+			if (p->getType() == DT_POLYTYPE_OFFMESH_CONNECTION)	// skip off-mesh links.
+				continue;
+			areas.push_back(p->getArea());
+		}
+	}
+	return areas;
+}
+
+void Navmesh::init_by_raw(const std::vector<float>& vertices, const std::vector<int>& faces)
+{
+	init_by_raw(vertices.data(), (int)vertices.size(), faces.data(), (int)faces.size());
+}
+
+void Navmesh::init_by_raw(const float* vertices, int vertices_size, const int* faces, int faces_size)
 {
 	if (is_init)
 	{
@@ -403,7 +572,7 @@ void Navmesh::init_by_raw(std::vector<float> vertices, std::vector<int> faces)
 	}
 
 	geom = new InputGeom;
-	if (!geom->loadMesh_raw(&ctx, vertices, faces))
+	if (!geom->loadMesh_raw(&ctx, vertices, vertices_size, faces, faces_size))
 	{
 		ctx.log(RC_LOG_ERROR, "Fail to load geometry from raw data.");
 		clear();
@@ -421,7 +590,7 @@ void Navmesh::init_by_raw(std::vector<float> vertices, std::vector<int> faces)
 	}
 }
 
-void Navmesh::init_by_obj(std::string file_path)
+bool Navmesh::init_by_obj(std::string file_path)
 {
 	if (is_init)
 	{
@@ -445,6 +614,7 @@ void Navmesh::init_by_obj(std::string file_path)
 
 		is_init = true;
 	}
+	return is_init;
 }
 
 void Navmesh::build_navmesh()
@@ -459,15 +629,16 @@ void Navmesh::build_navmesh()
 	{
 		is_build = true;
 	}
+	init_thread_queries();
 }
 
-std::vector<float> Navmesh::pathfind_straight(std::vector<float> start, std::vector<float> end, int vertex_mode)
+std::vector<float> Navmesh::pathfind_straight(const Float3& start, const Float3& end, int vertex_mode)
 {
-	if (start.size() == 3 && end.size() == 3 && is_build)
+	if (is_build)
 	{
 		tool->set_mode_streight(vertex_mode);
 
-		tool->set_points(&start[0], &end[0]);
+		tool->set_points(start.data(), end.data());
 
 		int length = tool->get_path_points_count();
 		float* coordinates = tool->get_path();
@@ -482,15 +653,8 @@ std::vector<float> Navmesh::pathfind_straight(std::vector<float> start, std::vec
 	}
 	else
 	{
-		if (!is_build)
-		{
-			ctx.log(RC_LOG_ERROR, "Find straight path: navmesh is not builded.");
-		}
-		else
-		{
-			ctx.log(RC_LOG_ERROR, "Find straight path: invalid input vectors.");
-		}
-		
+		ctx.log(RC_LOG_ERROR, "Find straight path: navmesh is not builded.");
+
 		std::vector<float> to_return(0);
 		return to_return;
 	}
@@ -498,75 +662,137 @@ std::vector<float> Navmesh::pathfind_straight(std::vector<float> start, std::vec
 
 std::vector<float> Navmesh::pathfind_straight_batch(std::vector<float> coordinates, int vertex_mode)
 {
-	if (coordinates.size() % 6 == 0 && is_build)
+	std::vector<float> to_return(0);
+	if (coordinates.size() % 6 != 0)
 	{
-		std::vector<float> to_return(0);
-		// we assume that first 6 coordinates in the array define the first pair of start and end point, next 6 coordinates defines the second pair and so on
-		for (size_t step = 0; step < coordinates.size() / 6; step++)
-		{
-			std::vector<float> start(3);
-			std::vector<float> end(3);
-			copy(coordinates.begin() + 6 * step, coordinates.begin() + 6 * step + 3, start.begin());
-			copy(coordinates.begin() + 6 * step + 3, coordinates.begin() + 6 * step + 6, end.begin());
-
-			// calculate the path
-			std::vector<float> path = pathfind_straight(start, end, vertex_mode);
-
-			// add calculated coordinates to the one output array
-			// each result starts from the number of points (and then x3 floats for actual coordinates)
-			to_return.push_back(path.size() / 3);
-			to_return.insert(to_return.end(), path.begin(), path.end());
-		}
+		ctx.log(RC_LOG_ERROR, "Find straight path batch: invalid input vector with coordinates.");
+		return to_return;
+	}
 
+	std::vector<int> sizes;
+	std::vector<float> points;
+	if (!pathfind_straight_batch_buf(coordinates.data(), coordinates.size() / 6, vertex_mode, sizes, points))
+	{
 		return to_return;
 	}
-	else
+
+	// each result starts from the number of points (and then x3 floats for actual coordinates)
+	to_return.reserve(sizes.size() + points.size());
+	size_t point_index = 0;
+	for (size_t step = 0; step < sizes.size(); step++)
 	{
-		if (!is_build)
+		to_return.push_back((float)sizes[step]);
+		to_return.insert(to_return.end(), points.begin() + 3 * point_index, points.begin() + 3 * (point_index + sizes[step]));
+		point_index += sizes[step];
+	}
+
+	return to_return;
+}
+
+bool Navmesh::pathfind_straight_batch_buf(const float* coordinates, size_t pairs_count, int vertex_mode, std::vector<int>& sizes, std::vector<float>& points)
+{
+	sizes.clear();
+	points.clear();
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Find straight path batch: navmesh is not builded.");
+		return false;
+	}
+
+	// the same layout as in pathfind_straight_batch: 6 floats (start and end point) per pair
+	// but the result is splitted into two arrays, so it can be copied into numpy buffers without parsing
+	sizes.reserve(pairs_count);
+
+#ifdef _OPENMP
+	const int threads_count = omp_get_max_threads();
+	// the queries are created with the navmesh, again only if the number of threads has grown since then
+	if (threads_count > 1 && pairs_count > 1 && ((int)thread_queries.size() >= threads_count || init_thread_queries()))
+	{
+		// the navmesh is not changed during the search, so each thread only needs its own query object
+		const std::vector<dtNavMeshQuery*>& queries = thread_queries;
+		std::vector<std::vector<float>> paths(pairs_count);
+		sizes.resize(pairs_count);
+		const int count = (int)pairs_count;
+#pragma omp parallel for schedule(dynamic)
+		for (int step = 0; step < count; step++)
 		{
-			ctx.log(RC_LOG_ERROR, "Find straight path batch: navmesh is not builded.");
+			dtNavMeshQuery* query = queries[omp_get_thread_num()];
+			sizes[step] = tool->find_straight_path(query, coordinates + 6 * step, coordinates + 6 * step + 3, vertex_mode, paths[step]);
 		}
-		else
+
+		for (size_t step = 0; step < pairs_count; step++)
 		{
-			ctx.log(RC_LOG_ERROR, "Find straight path batch: invalid input vector with coordinates.");
+			points.insert(points.end(), paths[step].begin(), paths[step].end());
 		}
+		return true;
+	}
+#endif
 
-		std::vector<float> to_return(0);
-		return to_return;
+	tool->set_mode_streight(vertex_mode);
+	for (size_t step = 0; step < pairs_count; step++)
+	{
+		tool->set_points(coordinates + 6 * step, coordinates + 6 * step + 3);
+
+		int length = tool->get_path_points_count();
+		const float* path = tool->get_path();
+		sizes.push_back(length);
+		points.insert(points.end(), path, path + 3 * length);
 	}
+
+	return true;
 }
 
-float Navmesh::distance_to_wall(std::vector<float> point)
+bool Navmesh::pathfind_straight_batch_shared_buf(const float* coordinates, size_t pairs_count, int vertex_mode, std::vector<int>& sizes, std::vector<float>& points)
 {
-	if (is_build && point.size() == 3)
+	sizes.clear();
+	points.clear();
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Find straight path batch shared: navmesh is not builded.");
+		return false;
+	}
+
+	// Detour has no multi-target search, so only nearest polygon lookups and identical pairs are shared, the results stay exact
+	tool->find_straight_paths_shared(sample->getNavMeshQuery(), coordinates, (int)pairs_count, vertex_mode, sizes, points);
+	return true;
+}
+
+float Navmesh::distance_to_wall(const Float3& point)
+{
+	if (is_build)
 	{
 		tool->set_mode_distance();
-		tool->set_point(&point[0]);
+		tool->set_point(point.data());
 
 		float to_return = tool->get_distance_to_wall();
 		return to_return;
 	}
 	else
 	{
-		if (!is_build)
-		{
-			ctx.log(RC_LOG_ERROR, "Distance to wall: navmesh is not builded.");
-		}
-		else
-		{
-			ctx.log(RC_LOG_ERROR, "Distance to wall: invalid input vector.");
-		}
+		ctx.log(RC_LOG_ERROR, "Distance to wall: navmesh is not builded.");
 	}
 	return 0.0f;
 }
 
-std::vector<float> Navmesh::raycast(std::vector<float> start, std::vector<float> end)
+bool Navmesh::distance_to_wall_batch(const float* points, size_t count, float* distances)
 {
-	if (start.size() == 3 && end.size() == 3 && is_build)
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Distance to wall batch: navmesh is not builded.");
+		return false;
+	}
+
+	tool->find_distances_to_wall(sample->getNavMeshQuery(), points, (int)count, distances);
+	return true;
+}
+
+std::vector<float> Navmesh::raycast(const Float3& start, const Float3& end)
+{
+	if (is_build)
 	{
 		tool->set_mode_raycast();
 
-		tool->set_points(&start[0], &end[0]);
+		tool->set_points(start.data(), end.data());
 
 		int length = tool->get_path_points_count();
 		float* coordinates = tool->get_path();
@@ -581,50 +807,51 @@ std::vector<float> Navmesh::raycast(std::vector<float> start, std::vector<float>
 	}
 	else
 	{
-		if (is_build)
-		{
-			ctx.log(RC_LOG_ERROR, "Raycast: navmesh is not builded.");
-		}
-		else
-		{
-			ctx.log(RC_LOG_ERROR, "Raycast: invalid input vectors.");
-		}
+		ctx.log(RC_LOG_ERROR, "Raycast: navmesh is not builded.");
 
 		std::vector<float> to_return(0);
 		return to_return;
 	}
 }
 
-std::vector<float> Navmesh::hit_mesh(std::vector<float> start, std::vector<float> end)
+bool Navmesh::raycast_batch(const float* starts, const float* ends, size_t count, float* hits)
+{
+	if (!is_build)
+	{
+		ctx.log(RC_LOG_ERROR, "Raycast batch: navmesh is not builded.");
+		return false;
+	}
+
+	tool->find_raycast_hits(sample->getNavMeshQuery(), starts, ends, (int)count, hits);
+	return true;
+}
+
+std::vector<float> Navmesh::hit_mesh(const Float3& start, const Float3& end)
 {
-	if (start.size() == 3 && end.size() == 3)
+	if (is_init)
 	{
-		if (is_init)
+		Float3 src = start;
+		Float3 dst = end;
+		float hit_time;
+		bool hit = geom->raycastMesh(src.data(), dst.data(), hit_time);
+		if (hit)
 		{
-			float hit_time;
-			bool hit = geom->raycastMesh(&start[0], &end[0], hit_time);
-			if (hit)
-			{
-				std::vector<float> to_return(3);
-				for (int i = 0; i < to_return.size(); i++)
-				{
-					to_return[i] = start[i] + (end[i] - start[i]) * hit_time;
-				}
-				return to_return;
-			}
-			else
+			std::vector<float> to_return(3);
+			for (int i = 0; i < to_return.size(); i++)
 			{
-				return end;
+				to_return[i] = start[i] + (end[i] - start[i]) * hit_time;
 			}
+			return to_return;
 		}
 		else
 		{
-			ctx.log(RC_LOG_ERROR, "Hit mesh: geometry is not initialized.");
+			return std::vector<float>(end.begin(), end.end());
 		}
 	}
 	else
 	{
-		ctx.log(RC_LOG_ERROR, "Hit mesh: invalid input vectors.");
+		ctx.log(RC_LOG_ERROR, "Hit mesh: geometry is not initialized.");
+		return std::vector<float>(0);
 	}
 }
 
@@ -667,25 +894,16 @@ bool Navmesh::init_crowd(int maxAgents, float maxAgentRadius)
 		return false;
 	}
 
+	target_filter_versions.assign(maxAgents, 0);
+	positions_mirror.reset();
+	velocities_mirror.reset();
 	is_crowd_init = true;
 	return true;
 }
 
-int Navmesh::add_agent(std::vector<float> pos, std::map<std::string, float> params)
+// default crowd agent parameters overridden by the provided values
+static void fill_agent_params(const std::map<std::string, float>& params, dtCrowdAgentParams& ap)
 {
-	if (!is_crowd_init)
-	{
-		ctx.log(RC_LOG_ERROR, "Add agent: crowd is not initialized.");
-		return -1;
-	}
-
-	if (pos.size() != 3)
-	{
-		ctx.log(RC_LOG_ERROR, "Add agent: invalid position vector (must have 3 elements).");
-		return -1;
-	}
-
-	dtCrowdAgentParams ap;
 	memset(&ap, 0, sizeof(ap));
 
 	// Set default values
@@ -706,10 +924,10 @@ int Navmesh::add_agent(std::vector<float> pos, std::map<std::string, float> para
 	ap.userData = 0;
 
 	// Override with provided parameters
-	std::map<std::string, float>::iterator it;
+	std::map<std::string, float>::const_iterator it;
 	for (it = params.begin(); it != params.end(); it++)
 	{
-		std::string k = it->first;
+		const std::string& k = it->first;
 		float v = it->second;
 
 		if (k == "radius") { ap.radius = v; }
@@ -723,9 +941,20 @@ int Navmesh::add_agent(std::vector<float> pos, std::map<std::string, float> para
 		else if (k == "obstacleAvoidanceType") { ap.obstacleAvoidanceType = (unsigned char)v; }
 		else if (k == "queryFilterType") { ap.queryFilterType = (unsigned char)v; }
 	}
+}
+
+int Navmesh::add_agent(const Float3& pos, std::map<std::string, float> params)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Add agent: crowd is not initialized.");
+		return -1;
+	}
 
-	float p[3] = { pos[0], pos[1], pos[2] };
-	int idx = crowd->addAgent(p, &ap);
+	dtCrowdAgentParams ap;
+	fill_agent_params(params, ap);
+
+	int idx = crowd->addAgent(pos.data(), &ap);
 
 	if (idx == -1)
 	{
@@ -735,6 +964,86 @@ int Navmesh::add_agent(std::vector<float> pos, std::map<std::string, float> para
 	return idx;
 }
 
+int Navmesh::add_agents(const float* positions, int count, const std::map<std::string, float>& params, int* ids, const float* targets)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Add agents: crowd is not initialized.");
+		for (int i = 0; i < count; i++)
+		{
+			ids[i] = -1;
+		}
+		return 0;
+	}
+
+	// the parameters are the same for all agents, so they are parsed once
+	dtCrowdAgentParams ap;
+	fill_agent_params(params, ap);
+
+	int added = 0;
+	for (int i = 0; i < count; i++)
+	{
+		ids[i] = crowd->addAgent(positions + 3 * i, &ap);
+		if (ids[i] != -1)
+		{
+			added++;
+		}
+	}
+	if (added < count)
+	{
+		ctx.log(RC_LOG_ERROR, "Add agents: failed to add %d agents to crowd.", count - added);
+	}
+
+	if (targets)
+	{
+		set_new_agent_targets(ids, count, targets);
+	}
+
+	return added;
+}
+
+void Navmesh::set_new_agent_targets(const int* ids, int count, const float* targets)
+{
+	dtNavMeshQuery* navquery = sample->getNavMeshQuery();
+	if (!navquery)
+	{
+		ctx.log(RC_LOG_ERROR, "Add agents: navmesh query not available, targets are not set.");
+		return;
+	}
+
+	// the same query as in set_agent_target, repeated targets (e.g. one target for the whole group) reuse the previous polygon
+	const float ext[3] = { 2.0f, 4.0f, 2.0f };
+	dtQueryFilter filter;
+	dtPolyRef targetRef = 0;
+	float nearestPt[3];
+	const float* previous = nullptr;
+
+	int failed = 0;
+	for (int i = 0; i < count; i++)
+	{
+		if (ids[i] == -1)
+		{
+			continue;
+		}
+
+		const float* target = targets + 3 * i;
+		if (!previous || !dtVequal(previous, target))
+		{
+			navquery->findNearestPoly(target, ext, &filter, &targetRef, nearestPt);
+			previous = target;
+		}
+
+		if (!targetRef || !request_move_target(ids[i], targetRef, nearestPt))
+		{
+			failed++;
+		}
+	}
+	if (failed > 0)
+	{
+		ctx.log(RC_LOG_ERROR, "Add agents: failed to set targets of %d agents.", failed);
+	}
+}
+
 void Navmesh::remove_agent(int idx)
 {
 	if (!is_crowd_init)
@@ -755,19 +1064,28 @@ void Navmesh::update_crowd(float dt)
 	}
 
 	crowd->update(dt, 0);
+	update_agent_mirrors();
 }
 
-bool Navmesh::set_agent_target(int idx, std::vector<float> pos)
+void Navmesh::tick(float dt)
 {
 	if (!is_crowd_init)
 	{
-		ctx.log(RC_LOG_ERROR, "Set agent target: crowd is not initialized.");
-		return false;
+		ctx.log(RC_LOG_ERROR, "Tick: crowd is not initialized.");
+		return;
 	}
 
-	if (pos.size() != 3)
+	// formation targets are requested first, so the crowd update already plans and steers towards them
+	update_formations(dt);
+	crowd->update(dt, 0);
+	update_agent_mirrors();
+}
+
+bool Navmesh::set_agent_target(int idx, const Float3& pos)
+{
+	if (!is_crowd_init)
 	{
-		ctx.log(RC_LOG_ERROR, "Set agent target: invalid position vector (must have 3 elements).");
+		ctx.log(RC_LOG_ERROR, "Set agent target: crowd is not initialized.");
 		return false;
 	}
 
@@ -782,10 +1100,9 @@ bool Navmesh::set_agent_target(int idx, std::vector<float> pos)
 	const float ext[3] = { 2.0f, 4.0f, 2.0f };
 	dtQueryFilter filter;
 	dtPolyRef targetRef;
-	float targetPos[3] = { pos[0], pos[1], pos[2] };
 	float nearestPt[3];
 
-	navquery->findNearestPoly(targetPos, ext, &filter, &targetRef, nearestPt);
+	navquery->findNearestPoly(pos.data(), ext, &filter, &targetRef, nearestPt);
 
 	if (!targetRef)
 	{
@@ -793,25 +1110,44 @@ bool Navmesh::set_agent_target(int idx, std::vector<float> pos)
 		return false;
 	}
 
-	return crowd->requestMoveTarget(idx, targetRef, nearestPt);
+	return request_move_target(idx, targetRef, nearestPt);
 }
 
-bool Navmesh::set_agent_velocity(int idx, std::vector<float> vel)
+bool Navmesh::request_move_target(int idx, dtPolyRef ref, const float* pos)
 {
-	if (!is_crowd_init)
+	// targets closer than 0.1 are the same target
+	static const float SAME_TARGET_DIST_SQR = 0.01f;
+
+	const dtCrowdAgent* ag = crowd->getAgent(idx);
+	if (!ag || !ag->active)
 	{
-		ctx.log(RC_LOG_ERROR, "Set agent velocity: crowd is not initialized.");
 		return false;
 	}
 
-	if (vel.size() != 3)
+	// the path to this target is found (or is being searched) with the current filters
+	const bool has_path = ag->targetState == DT_CROWDAGENT_TARGET_VALID
+		|| ag->targetState == DT_CROWDAGENT_TARGET_REQUESTING
+		|| ag->targetState == DT_CROWDAGENT_TARGET_WAITING_FOR_QUEUE
+		|| ag->targetState == DT_CROWDAGENT_TARGET_WAITING_FOR_PATH;
+	if (has_path && ag->targetRef == ref && dtVdistSqr(ag->targetPos, pos) < SAME_TARGET_DIST_SQR
+		&& target_filter_versions[idx] == filter_version)
+	{
+		return true;
+	}
+
+	target_filter_versions[idx] = filter_version;
+	return crowd->requestMoveTarget(idx, ref, pos);
+}
+
+bool Navmesh::set_agent_velocity(int idx, const Float3& vel)
+{
+	if (!is_crowd_init)
 	{
-		ctx.log(RC_LOG_ERROR, "Set agent velocity: invalid velocity vector (must have 3 elements).");
+		ctx.log(RC_LOG_ERROR, "Set agent velocity: crowd is not initialized.");
 		return false;
 	}
 
-	float v[3] = { vel[0], vel[1], vel[2] };
-	return crowd->requestMoveVelocity(idx, v);
+	return crowd->requestMoveVelocity(idx, vel.data());
 }
 
 bool Navmesh::reset_agent_target(int idx)
@@ -875,6 +1211,44 @@ std::vector<float> Navmesh::get_agent_velocity(int idx)
 	return to_return;
 }
 
+bool Navmesh::get_agent_position_row(int idx, float* out)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent position: crowd is not initialized.");
+		return false;
+	}
+
+	const dtCrowdAgent* ag = crowd->getAgent(idx);
+	if (!ag || !ag->active)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent position: invalid agent index or agent not active.");
+		return false;
+	}
+
+	dtVcopy(out, ag->npos);
+	return true;
+}
+
+bool Navmesh::get_agent_velocity_row(int idx, float* out)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent velocity: crowd is not initialized.");
+		return false;
+	}
+
+	const dtCrowdAgent* ag = crowd->getAgent(idx);
+	if (!ag || !ag->active)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent velocity: invalid agent index or agent not active.");
+		return false;
+	}
+
+	dtVcopy(out, ag->vel);
+	return true;
+}
+
 std::map<std::string, float> Navmesh::get_agent_state(int idx)
 {
 	std::map<std::string, float> to_return;
@@ -929,6 +1303,203 @@ std::map<std::string, float> Navmesh::get_agent_state(int idx)
 	return to_return;
 }
 
+bool Navmesh::get_all_agent_states(float* positions, float* velocities, unsigned char* states, unsigned char* target_states, unsigned char* active, int count)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all agent states: crowd is not initialized.");
+		return false;
+	}
+
+	// inactive agents are also written, so the i-th item of each array always corresponds to the agent with index i
+	const int agents_count = std::min(count, crowd->getAgentCount());
+	for (int i = 0; i < agents_count; i++)
+	{
+		const dtCrowdAgent* ag = crowd->getAgent(i);
+		std::memcpy(positions + 3 * i, ag->npos, 3 * sizeof(float));
+		std::memcpy(velocities + 3 * i, ag->vel, 3 * sizeof(float));
+		states[i] = ag->state;
+		target_states[i] = ag->targetState;
+		active[i] = ag->active ? 1 : 0;
+	}
+
+	return true;
+}
+
+int Navmesh::get_agents_snapshot(const int* ids, int count, float* positions, float* velocities, unsigned char* target_states)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agents snapshot: crowd is not initialized.");
+		return -1;
+	}
+
+	// the i-th row corresponds to ids[i], invalid or inactive agents get NaN vectors and no target
+	const float nan = std::numeric_limits<float>::quiet_NaN();
+	int written = 0;
+	for (int i = 0; i < count; i++)
+	{
+		const dtCrowdAgent* ag = crowd->getAgent(ids[i]);
+		if (!ag || !ag->active)
+		{
+			std::fill(positions + 3 * i, positions + 3 * i + 3, nan);
+			std::fill(velocities + 3 * i, velocities + 3 * i + 3, nan);
+			target_states[i] = DT_CROWDAGENT_TARGET_NONE;
+			continue;
+		}
+		std::memcpy(positions + 3 * i, ag->npos, 3 * sizeof(float));
+		std::memcpy(velocities + 3 * i, ag->vel, 3 * sizeof(float));
+		target_states[i] = ag->targetState;
+		written++;
+	}
+
+	return written;
+}
+
+// copy one 3-float member of the first count agents into out, the i-th row always corresponds to the agent with index i
+static int copy_agent_vectors(dtCrowd* crowd, float (dtCrowdAgent::*field)[3], float* out, int count)
+{
+	const int agents_count = std::min(count, crowd->getAgentCount());
+	for (int i = 0; i < agents_count; i++)
+	{
+		std::memcpy(out + 3 * i, crowd->getAgent(i)->*field, 3 * sizeof(float));
+	}
+	return agents_count;
+}
+
+void Navmesh::update_agent_mirrors()
+{
+	// one linear pass over the agents, so the readers of the mirrors do not touch the agent structs
+	if (positions_mirror)
+	{
+		copy_agent_vectors(crowd, &dtCrowdAgent::npos, positions_mirror->data(), (int)(positions_mirror->size() / 3));
+	}
+	if (velocities_mirror)
+	{
+		copy_agent_vectors(crowd, &dtCrowdAgent::vel, velocities_mirror->data(), (int)(velocities_mirror->size() / 3));
+	}
+}
+
+std::shared_ptr<std::vector<float>> Navmesh::get_agent_positions_mirror()
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent positions mirror: crowd is not initialized.");
+		return std::shared_ptr<std::vector<float>>();
+	}
+
+	if (!positions_mirror)
+	{
+		positions_mirror = std::make_shared<std::vector<float>>(3 * crowd->getAgentCount(), 0.0f);
+		copy_agent_vectors(crowd, &dtCrowdAgent::npos, positions_mirror->data(), crowd->getAgentCount());
+	}
+	return positions_mirror;
+}
+
+std::shared_ptr<std::vector<float>> Navmesh::get_agent_velocities_mirror()
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent velocities mirror: crowd is not initialized.");
+		return std::shared_ptr<std::vector<float>>();
+	}
+
+	if (!velocities_mirror)
+	{
+		velocities_mirror = std::make_shared<std::vector<float>>(3 * crowd->getAgentCount(), 0.0f);
+		copy_agent_vectors(crowd, &dtCrowdAgent::vel, velocities_mirror->data(), crowd->getAgentCount());
+	}
+	return velocities_mirror;
+}
+
+int Navmesh::get_all_agent_positions(float* out, int count)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all agent positions: crowd is not initialized.");
+		return 0;
+	}
+
+	return copy_agent_vectors(crowd, &dtCrowdAgent::npos, out, count);
+}
+
+int Navmesh::get_all_agent_velocities(float* out, int count)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all agent velocities: crowd is not initialized.");
+		return 0;
+	}
+
+	return copy_agent_vectors(crowd, &dtCrowdAgent::vel, out, count);
+}
+
+int Navmesh::get_all_agent_targets(float* out, int count)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all agent targets: crowd is not initialized.");
+		return 0;
+	}
+
+	return copy_agent_vectors(crowd, &dtCrowdAgent::targetPos, out, count);
+}
+
+static void write_agent_state_row(const dtCrowdAgent* ag, float* out)
+{
+	out[0] = ag->npos[0];
+	out[1] = ag->npos[1];
+	out[2] = ag->npos[2];
+	out[3] = ag->vel[0];
+	out[4] = ag->vel[1];
+	out[5] = ag->vel[2];
+	out[6] = ag->dvel[0];
+	out[7] = ag->dvel[1];
+	out[8] = ag->dvel[2];
+	out[9] = ag->targetPos[0];
+	out[10] = ag->targetPos[1];
+	out[11] = ag->targetPos[2];
+	out[12] = ag->desiredSpeed;
+	out[13] = (float)ag->state;
+	out[14] = (float)ag->targetState;
+	out[15] = ag->active ? 1.0f : 0.0f;
+}
+
+bool Navmesh::get_agent_state_row(int idx, float* out)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent state row: crowd is not initialized.");
+		return false;
+	}
+
+	const dtCrowdAgent* ag = crowd->getAgent(idx);
+	if (!ag || !ag->active)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent state row: invalid agent index or agent not active.");
+		return false;
+	}
+
+	write_agent_state_row(ag, out);
+	return true;
+}
+
+int Navmesh::get_all_agent_state_rows(float* out, int count)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all agent state rows: crowd is not initialized.");
+		return 0;
+	}
+
+	const int agents_count = std::min(count, crowd->getAgentCount());
+	for (int i = 0; i < agents_count; i++)
+	{
+		write_agent_state_row(crowd->getAgent(i), out + AGENT_STATE_SIZE * i);
+	}
+	return agents_count;
+}
+
 int Navmesh::get_agent_count()
 {
 	if (!is_crowd_init)
@@ -977,6 +1548,8 @@ void Navmesh::update_agent_parameters(int idx, std::map<std::string, float> para
 	}
 
 	crowd->updateAgentParameters(idx, &ap);
+	// the agent can use another filter now
+	target_filter_versions[idx] = filter_version - 1;
 }
 
 // ============================================================================
@@ -1080,31 +1653,89 @@ void Navmesh::set_query_filter_area_cost(int filter_index, int area_id, float co
 	dtQueryFilter* filter = crowd->getEditableFilter(filter_index);
 	if (filter)
 	{
-		filter->setAreaCost(area_id, cost);
+		filter->setAreaCost(area_id, cost);
+		filter_version++;
+	}
+}
+
+float Navmesh::get_query_filter_area_cost(int filter_index, int area_id)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get query filter area cost: crowd is not initialized.");
+		return 0.0f;
+	}
+
+	if (filter_index < 0 || filter_index >= DT_CROWD_MAX_QUERY_FILTER_TYPE)
+	{
+		ctx.log(RC_LOG_ERROR, "Get query filter area cost: invalid filter index.");
+		return 0.0f;
+	}
+
+	const dtQueryFilter* filter = crowd->getFilter(filter_index);
+	if (filter)
+	{
+		return filter->getAreaCost(area_id);
+	}
+
+	return 0.0f;
+}
+
+int Navmesh::set_query_filter_area_costs(int filter_index, const float* costs, int count)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Set query filter area costs: crowd is not initialized.");
+		return 0;
+	}
+
+	if (filter_index < 0 || filter_index >= DT_CROWD_MAX_QUERY_FILTER_TYPE)
+	{
+		ctx.log(RC_LOG_ERROR, "Set query filter area costs: invalid filter index.");
+		return 0;
+	}
+
+	dtQueryFilter* filter = crowd->getEditableFilter(filter_index);
+	if (!filter)
+	{
+		return 0;
+	}
+
+	count = std::min(count, DT_MAX_AREAS);
+	for (int i = 0; i < count; i++)
+	{
+		filter->setAreaCost(i, costs[i]);
 	}
+	filter_version++;
+	return count;
 }
 
-float Navmesh::get_query_filter_area_cost(int filter_index, int area_id)
+bool Navmesh::get_query_filter_area_costs(int filter_index, float* costs, int count)
 {
 	if (!is_crowd_init)
 	{
-		ctx.log(RC_LOG_ERROR, "Get query filter area cost: crowd is not initialized.");
-		return 0.0f;
+		ctx.log(RC_LOG_ERROR, "Get query filter area costs: crowd is not initialized.");
+		return false;
 	}
 
 	if (filter_index < 0 || filter_index >= DT_CROWD_MAX_QUERY_FILTER_TYPE)
 	{
-		ctx.log(RC_LOG_ERROR, "Get query filter area cost: invalid filter index.");
-		return 0.0f;
+		ctx.log(RC_LOG_ERROR, "Get query filter area costs: invalid filter index.");
+		return false;
 	}
 
 	const dtQueryFilter* filter = crowd->getFilter(filter_index);
-	if (filter)
+	if (!filter)
 	{
-		return filter->getAreaCost(area_id);
+		return false;
 	}
 
-	return 0.0f;
+	count = std::min(count, DT_MAX_AREAS);
+	for (int i = 0; i < count; i++)
+	{
+		costs[i] = filter->getAreaCost(i);
+	}
+	return true;
 }
 
 void Navmesh::set_query_filter_include_flags(int filter_index, unsigned short flags)
@@ -1125,6 +1756,7 @@ void Navmesh::set_query_filter_include_flags(int filter_index, unsigned short fl
 	if (filter)
 	{
 		filter->setIncludeFlags(flags);
+		filter_version++;
 	}
 }
 
@@ -1146,6 +1778,7 @@ void Navmesh::set_query_filter_exclude_flags(int filter_index, unsigned short fl
 	if (filter)
 	{
 		filter->setExcludeFlags(flags);
+		filter_version++;
 	}
 }
 
@@ -1201,6 +1834,32 @@ std::vector<float> Navmesh::get_agent_corners(int agent_idx)
 	return to_return;
 }
 
+bool Navmesh::get_all_agent_corners(const int* indices, int count, std::vector<int>& sizes, std::vector<float>& points)
+{
+	sizes.clear();
+	points.clear();
+
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all agent corners: crowd is not initialized.");
+		return false;
+	}
+
+	sizes.resize(count, 0);
+	points.reserve((size_t)count * 3 * DT_CROWDAGENT_MAX_CORNERS);
+	for (int i = 0; i < count; i++)
+	{
+		const dtCrowdAgent* ag = crowd->getAgent(indices[i]);
+		if (ag && ag->active)
+		{
+			sizes[i] = ag->ncorners;
+			points.insert(points.end(), ag->cornerVerts, ag->cornerVerts + 3 * ag->ncorners);
+		}
+	}
+
+	return true;
+}
+
 std::vector<int> Navmesh::get_active_agents()
 {
 	std::vector<int> to_return;
@@ -1299,6 +1958,35 @@ std::map<std::string, float> Navmesh::get_agent_parameters(int idx)
 	return to_return;
 }
 
+bool Navmesh::get_agent_parameters_row(int idx, float* out)
+{
+	if (!is_crowd_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent parameters row: crowd is not initialized.");
+		return false;
+	}
+
+	const dtCrowdAgent* ag = crowd->getAgent(idx);
+	if (!ag || !ag->active)
+	{
+		ctx.log(RC_LOG_ERROR, "Get agent parameters row: invalid agent index or agent not active.");
+		return false;
+	}
+
+	const dtCrowdAgentParams& ap = ag->params;
+	out[0] = ap.radius;
+	out[1] = ap.height;
+	out[2] = ap.maxAcceleration;
+	out[3] = ap.maxSpeed;
+	out[4] = ap.collisionQueryRange;
+	out[5] = ap.pathOptimizationRange;
+	out[6] = ap.separationWeight;
+	out[7] = (float)ap.updateFlags;
+	out[8] = (float)ap.obstacleAvoidanceType;
+	out[9] = (float)ap.queryFilterType;
+	return true;
+}
+
 // ============================================================================
 // CONVEX VOLUMES IMPLEMENTATION
 // ============================================================================
@@ -1384,6 +2072,62 @@ std::map<std::string, std::vector<float>> Navmesh::get_convex_volume(int index)
 	return to_return;
 }
 
+bool Navmesh::get_all_convex_volumes_soa(std::vector<float>& verts, std::vector<int>& counts, std::vector<float>& hmins, std::vector<float>& hmaxs, std::vector<unsigned char>& areas)
+{
+	if (!is_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all convex volumes: geometry is not initialized.");
+		return false;
+	}
+
+	const ConvexVolume* vols = geom->getConvexVolumes();
+	int count = geom->getConvexVolumeCount();
+	counts.resize(count);
+	hmins.resize(count);
+	hmaxs.resize(count);
+	areas.resize(count);
+	verts.clear();
+	verts.reserve((size_t)count * 3 * MAX_CONVEXVOL_PTS);
+	for (int i = 0; i < count; i++)
+	{
+		const ConvexVolume& vol = vols[i];
+		verts.insert(verts.end(), vol.verts, vol.verts + 3 * vol.nverts);
+		counts[i] = vol.nverts;
+		hmins[i] = vol.hmin;
+		hmaxs[i] = vol.hmax;
+		areas[i] = (unsigned char)vol.area;
+	}
+
+	return true;
+}
+
+int Navmesh::add_convex_volumes(const float* verts, const int* counts, const float* hmins, const float* hmaxs, const unsigned char* areas, int count)
+{
+	if (!is_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Add convex volumes: geometry is not initialized.");
+		return 0;
+	}
+
+	int start_count = geom->getConvexVolumeCount();
+	const float* volume_verts = verts;
+	for (int i = 0; i < count; i++)
+	{
+		int nverts = counts[i];
+		if (nverts < 3 || nverts > MAX_CONVEXVOL_PTS)
+		{
+			ctx.log(RC_LOG_ERROR, "Add convex volumes: invalid number of vertices %d of the volume %d (must be from 3 to 12).", nverts, i);
+		}
+		else
+		{
+			geom->addConvexVolume(volume_verts, nverts, hmins[i], hmaxs[i], areas[i]);
+		}
+		volume_verts += 3 * nverts;
+	}
+
+	return geom->getConvexVolumeCount() - start_count;
+}
+
 std::vector<std::map<std::string, std::vector<float>>> Navmesh::get_all_convex_volumes()
 {
 	std::vector<std::map<std::string, std::vector<float>>> to_return;
@@ -1407,7 +2151,7 @@ std::vector<std::map<std::string, std::vector<float>>> Navmesh::get_all_convex_v
 // OFF-MESH CONNECTIONS IMPLEMENTATION
 // ============================================================================
 
-void Navmesh::add_offmesh_connection(std::vector<float> start_pos, std::vector<float> end_pos,
+void Navmesh::add_offmesh_connection(const Float3& start_pos, const Float3& end_pos,
                                      float radius, bool bidirectional, unsigned char area,
                                      unsigned short flags)
 {
@@ -1417,13 +2161,7 @@ void Navmesh::add_offmesh_connection(std::vector<float> start_pos, std::vector<f
 		return;
 	}
 
-	if (start_pos.size() != 3 || end_pos.size() != 3)
-	{
-		ctx.log(RC_LOG_ERROR, "Add off-mesh connection: invalid positions (must have 3 elements each).");
-		return;
-	}
-
-	geom->addOffMeshConnection(&start_pos[0], &end_pos[0], radius, bidirectional ? 1 : 0, area, flags);
+	geom->addOffMeshConnection(start_pos.data(), end_pos.data(), radius, bidirectional ? 1 : 0, area, flags);
 }
 
 void Navmesh::delete_offmesh_connection(int index)
@@ -1484,6 +2222,42 @@ std::map<std::string, std::vector<float>> Navmesh::get_offmesh_connection(int in
 	return to_return;
 }
 
+bool Navmesh::get_all_offmesh_connections_soa(std::vector<float>& verts, std::vector<float>& radii, std::vector<unsigned char>& bidirectional, std::vector<unsigned char>& areas, std::vector<unsigned short>& flags)
+{
+	if (!is_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Get all off-mesh connections: geometry is not initialized.");
+		return false;
+	}
+
+	// the geometry already keeps connections in separate arrays, so they are copied as a whole
+	int count = geom->getOffMeshConnectionCount();
+	verts.assign(geom->getOffMeshConnectionVerts(), geom->getOffMeshConnectionVerts() + 6 * count);
+	radii.assign(geom->getOffMeshConnectionRads(), geom->getOffMeshConnectionRads() + count);
+	bidirectional.assign(geom->getOffMeshConnectionDirs(), geom->getOffMeshConnectionDirs() + count);
+	areas.assign(geom->getOffMeshConnectionAreas(), geom->getOffMeshConnectionAreas() + count);
+	flags.assign(geom->getOffMeshConnectionFlags(), geom->getOffMeshConnectionFlags() + count);
+
+	return true;
+}
+
+int Navmesh::add_offmesh_connections(const float* verts, const float* radii, const unsigned char* bidirectional, const unsigned char* areas, const unsigned short* flags, int count)
+{
+	if (!is_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Add off-mesh connections: geometry is not initialized.");
+		return 0;
+	}
+
+	int start_count = geom->getOffMeshConnectionCount();
+	for (int i = 0; i < count; i++)
+	{
+		geom->addOffMeshConnection(&verts[6 * i], &verts[6 * i + 3], radii[i], bidirectional[i] ? 1 : 0, areas[i], flags[i]);
+	}
+
+	return geom->getOffMeshConnectionCount() - start_count;
+}
+
 std::vector<std::map<std::string, std::vector<float>>> Navmesh::get_all_offmesh_connections()
 {
 	std::vector<std::map<std::string, std::vector<float>>> to_return;
@@ -1524,32 +2298,49 @@ void Navmesh::mark_walkable_triangles(float walkable_slope_angle)
 	set_settings(settings);
 }
 
-void Navmesh::mark_box_area(std::vector<float> bmin, std::vector<float> bmax, unsigned char area_id)
+// number of segments of the polygon which approximates the cylinder
+static const int CYLINDER_SEGMENTS = 8;
+
+// write 4 bottom corners of the box into verts (12 floats)
+static void fill_box_verts(const float* bmin, const float* bmax, float* verts)
+{
+	const float corners[12] = {
+		bmin[0], bmin[1], bmin[2],
+		bmax[0], bmin[1], bmin[2],
+		bmax[0], bmin[1], bmax[2],
+		bmin[0], bmin[1], bmax[2]
+	};
+	memcpy(verts, corners, sizeof(corners));
+}
+
+// write CYLINDER_SEGMENTS bottom points of the cylinder into verts (3 * CYLINDER_SEGMENTS floats)
+static void fill_cylinder_verts(const float* pos, float radius, float* verts)
 {
-	if (!is_init)
+	for (int i = 0; i < CYLINDER_SEGMENTS; i++)
 	{
-		ctx.log(RC_LOG_ERROR, "Mark box area: geometry is not initialized.");
-		return;
+		float angle = (float)i / (float)CYLINDER_SEGMENTS * 3.14159f * 2.0f;
+		verts[3 * i + 0] = pos[0] + cosf(angle) * radius;
+		verts[3 * i + 1] = pos[1];
+		verts[3 * i + 2] = pos[2] + sinf(angle) * radius;
 	}
+}
 
-	if (bmin.size() != 3 || bmax.size() != 3)
+void Navmesh::mark_box_area(const Float3& bmin, const Float3& bmax, unsigned char area_id)
+{
+	if (!is_init)
 	{
-		ctx.log(RC_LOG_ERROR, "Mark box area: invalid bounds (must have 3 elements each).");
+		ctx.log(RC_LOG_ERROR, "Mark box area: geometry is not initialized.");
 		return;
 	}
 
 	// Create a box convex volume
-	std::vector<float> verts = {
-		bmin[0], bmin[1], bmin[2],
-		bmax[0], bmin[1], bmin[2],
-		bmax[0], bmin[1], bmax[2],
-		bmin[0], bmin[1], bmax[2]
-	};
+	float verts[12];
+	fill_box_verts(bmin.data(), bmax.data(), verts);
 
-	add_convex_volume(verts, bmin[1], bmax[1], area_id);
+	geom->addConvexVolume(verts, 4, bmin[1], bmax[1], area_id);
 }
 
-void Navmesh::mark_cylinder_area(std::vector<float> pos, float radius, float height, unsigned char area_id)
+void Navmesh::mark_cylinder_area(const Float3& pos, float radius, float height, unsigned char area_id)
 {
 	if (!is_init)
 	{
@@ -1557,29 +2348,57 @@ void Navmesh::mark_cylinder_area(std::vector<float> pos, float radius, float hei
 		return;
 	}
 
-	if (pos.size() != 3)
+	// Approximate cylinder with octagon
+	float verts[3 * CYLINDER_SEGMENTS];
+	fill_cylinder_verts(pos.data(), radius, verts);
+
+	geom->addConvexVolume(verts, CYLINDER_SEGMENTS, pos[1], pos[1] + height, area_id);
+}
+
+void Navmesh::mark_convex_poly_area(std::vector<float> verts, float hmin, float hmax, unsigned char area_id)
+{
+	add_convex_volume(verts, hmin, hmax, area_id);
+}
+
+int Navmesh::mark_box_areas(const float* bounds, const unsigned char* area_ids, int count)
+{
+	if (!is_init)
 	{
-		ctx.log(RC_LOG_ERROR, "Mark cylinder area: invalid position (must have 3 elements).");
-		return;
+		ctx.log(RC_LOG_ERROR, "Mark box areas: geometry is not initialized.");
+		return 0;
 	}
 
-	// Approximate cylinder with octagon
-	const int segments = 8;
-	std::vector<float> verts;
-	for (int i = 0; i < segments; i++)
+	int start_count = geom->getConvexVolumeCount();
+	float verts[12];
+	for (int i = 0; i < count; i++)
 	{
-		float angle = (float)i / (float)segments * 3.14159f * 2.0f;
-		verts.push_back(pos[0] + cosf(angle) * radius);
-		verts.push_back(pos[1]);
-		verts.push_back(pos[2] + sinf(angle) * radius);
+		const float* bmin = &bounds[6 * i];
+		const float* bmax = &bounds[6 * i + 3];
+		fill_box_verts(bmin, bmax, verts);
+		geom->addConvexVolume(verts, 4, bmin[1], bmax[1], area_ids[i]);
 	}
 
-	add_convex_volume(verts, pos[1], pos[1] + height, area_id);
+	return geom->getConvexVolumeCount() - start_count;
 }
 
-void Navmesh::mark_convex_poly_area(std::vector<float> verts, float hmin, float hmax, unsigned char area_id)
+int Navmesh::mark_cylinder_areas(const float* positions, const float* radii, const float* heights, const unsigned char* area_ids, int count)
 {
-	add_convex_volume(verts, hmin, hmax, area_id);
+	if (!is_init)
+	{
+		ctx.log(RC_LOG_ERROR, "Mark cylinder areas: geometry is not initialized.");
+		return 0;
+	}
+
+	int start_count = geom->getConvexVolumeCount();
+	float verts[3 * CYLINDER_SEGMENTS];
+	for (int i = 0; i < count; i++)
+	{
+		const float* pos = &positions[3 * i];
+		fill_cylinder_verts(pos, radii[i], verts);
+		geom->addConvexVolume(verts, CYLINDER_SEGMENTS, pos[1], pos[1] + heights[i], area_ids[i]);
+	}
+
+	return geom->getConvexVolumeCount() - start_count;
 }
 
 void Navmesh::erode_walkable_area(int radius)
@@ -1611,7 +2430,72 @@ void Navmesh::median_filter_walkable_area()
 // FORMATIONS & GROUP BEHAVIORS
 // ============================================================================
 
-int Navmesh::create_formation(int formation_type, float spacing)
+// slot offsets of each formation type in the formation frame: x along the right vector, z along the direction
+// the functions write 2 floats per slot and are selected once in create_formation
+
+static void line_slot_offsets(int num_agents, float spacing, float* offsets)
+{
+	int center_idx = num_agents / 2;
+	for (int i = 0; i < num_agents; i++)
+	{
+		offsets[2 * i] = (i - center_idx) * spacing;
+		offsets[2 * i + 1] = 0.0f;
+	}
+}
+
+static void column_slot_offsets(int num_agents, float spacing, float* offsets)
+{
+	for (int i = 0; i < num_agents; i++)
+	{
+		offsets[2 * i] = 0.0f;
+		offsets[2 * i + 1] = -i * spacing;
+	}
+}
+
+static void wedge_slot_offsets(int num_agents, float spacing, float* offsets)
+{
+	for (int i = 0; i < num_agents; i++)
+	{
+		int row = (int)sqrtf((float)i);
+		int col = i - row * row;
+		offsets[2 * i] = (col - row * 0.5f) * spacing;
+		offsets[2 * i + 1] = -row * spacing;
+	}
+}
+
+static void box_slot_offsets(int num_agents, float spacing, float* offsets)
+{
+	int side_len = (int)ceil(sqrtf((float)num_agents));
+	for (int i = 0; i < num_agents; i++)
+	{
+		int row = i / side_len;
+		int col = i % side_len;
+		offsets[2 * i] = (col - side_len * 0.5f) * spacing;
+		offsets[2 * i + 1] = -row * spacing;
+	}
+}
+
+static void circle_slot_offsets(int num_agents, float spacing, float* offsets)
+{
+	float radius = spacing * num_agents / (2.0f * 3.14159f);
+	for (int i = 0; i < num_agents; i++)
+	{
+		float angle = (float)i / (float)num_agents * 2.0f * 3.14159f;
+		offsets[2 * i] = radius * cosf(angle);
+		offsets[2 * i + 1] = radius * sinf(angle);
+	}
+}
+
+// unknown formation types keep all agents at the target point
+static void center_slot_offsets(int num_agents, float spacing, float* offsets)
+{
+	std::fill(offsets, offsets + 2 * num_agents, 0.0f);
+}
+
+static const Navmesh::SlotFn SLOT_FUNCTIONS[] = { line_slot_offsets, column_slot_offsets, wedge_slot_offsets, box_slot_offsets, circle_slot_offsets };
+static const int SLOT_FUNCTIONS_COUNT = (int)(sizeof(SLOT_FUNCTIONS) / sizeof(SLOT_FUNCTIONS[0]));
+
+int Navmesh::create_formation(int formation_type, float spacing, int max_agents)
 {
 	if (!is_crowd_init)
 	{
@@ -1619,10 +2503,18 @@ int Navmesh::create_formation(int formation_type, float spacing)
 		return -1;
 	}
 
+	if (max_agents <= 0)
+	{
+		ctx.log(RC_LOG_ERROR, "Create formation: max_agents should be positive, got %d.", max_agents);
+		return -1;
+	}
+
 	Formation formation;
 	formation.id = next_formation_id++;
 	formation.type = formation_type;
 	formation.spacing = spacing;
+	formation.slot_fn = formation_type >= 0 && formation_type < SLOT_FUNCTIONS_COUNT ? SLOT_FUNCTIONS[formation_type] : center_slot_offsets;
+	formation.max_agents = max_agents;
 	formation.leader_idx = -1;
 	formation.has_target = false;
 	formation.target_pos[0] = formation.target_pos[1] = formation.target_pos[2] = 0.0f;
@@ -1630,10 +2522,13 @@ int Navmesh::create_formation(int formation_type, float spacing)
 	formation.target_dir[1] = 0.0f;
 	formation.target_dir[2] = 1.0f;  // Default forward direction
 
-	formations[formation.id] = formation;
+	// reserve in the stored formation (a copy does not keep the capacity), so adding agents never reallocates
+	Formation& stored = formations[formation.id] = formation;
+	stored.agent_indices.reserve(max_agents);
+	stored.slot_offsets.reserve(2 * max_agents);
 
-	ctx.log(RC_LOG_PROGRESS, "Created formation %d with type %d and spacing %.2f",
-	        formation.id, formation_type, spacing);
+	ctx.log(RC_LOG_PROGRESS, "Created formation %d with type %d, spacing %.2f and at most %d agents",
+	        formation.id, formation_type, spacing, max_agents);
 
 	return formation.id;
 }
@@ -1686,7 +2581,14 @@ bool Navmesh::add_agent_to_formation(int formation_id, int agent_idx)
 		return true;
 	}
 
+	if ((int)formation.agent_indices.size() >= formation.max_agents)
+	{
+		ctx.log(RC_LOG_ERROR, "Add agent to formation: formation %d is full (%d agents).", formation_id, formation.max_agents);
+		return false;
+	}
+
 	formation.agent_indices.push_back(agent_idx);
+	update_slot_offsets(formation);
 
 	ctx.log(RC_LOG_PROGRESS, "Added agent %d to formation %d", agent_idx, formation_id);
 	return true;
@@ -1708,6 +2610,7 @@ bool Navmesh::remove_agent_from_formation(int agent_idx)
 		if (it != formation.agent_indices.end())
 		{
 			formation.agent_indices.erase(it);
+			update_slot_offsets(formation);
 
 			// If this was the leader, clear leader
 			if (formation.leader_idx == agent_idx)
@@ -1724,7 +2627,7 @@ bool Navmesh::remove_agent_from_formation(int agent_idx)
 	return false;
 }
 
-void Navmesh::set_formation_target(int formation_id, std::vector<float> target_pos, std::vector<float> target_dir)
+void Navmesh::set_formation_target(int formation_id, const Float3& target_pos, const Float3& target_dir)
 {
 	if (formations.find(formation_id) == formations.end())
 	{
@@ -1732,18 +2635,6 @@ void Navmesh::set_formation_target(int formation_id, std::vector<float> target_p
 		return;
 	}
 
-	if (target_pos.size() < 3)
-	{
-		ctx.log(RC_LOG_ERROR, "Set formation target: target_pos must have 3 components.");
-		return;
-	}
-
-	if (target_dir.size() < 3)
-	{
-		ctx.log(RC_LOG_ERROR, "Set formation target: target_dir must have 3 components.");
-		return;
-	}
-
 	Formation& formation = formations[formation_id];
 	formation.has_target = true;
 	formation.target_pos[0] = target_pos[0];
@@ -1829,6 +2720,51 @@ std::map<std::string, float> Navmesh::get_formation_info(int formation_id)
 	return info;
 }
 
+bool Navmesh::get_formation_info_row(int formation_id, float* out)
+{
+	auto it = formations.find(formation_id);
+	if (it == formations.end())
+	{
+		ctx.log(RC_LOG_ERROR, "Get formation info row: formation %d not found.", formation_id);
+		return false;
+	}
+
+	const Formation& formation = it->second;
+	out[0] = (float)formation.id;
+	out[1] = (float)formation.type;
+	out[2] = formation.spacing;
+	out[3] = (float)formation.leader_idx;
+	out[4] = (float)formation.agent_indices.size();
+	out[5] = formation.has_target ? 1.0f : 0.0f;
+	out[6] = formation.target_pos[0];
+	out[7] = formation.target_pos[1];
+	out[8] = formation.target_pos[2];
+	out[9] = formation.target_dir[0];
+	out[10] = formation.target_dir[1];
+	out[11] = formation.target_dir[2];
+	return true;
+}
+
+void Navmesh::update_slot_offsets(Formation& formation)
+{
+	const int num_agents = (int)formation.agent_indices.size();
+	formation.slot_offsets.resize(2 * num_agents);
+	formation.slot_fn(num_agents, formation.spacing, formation.slot_offsets.data());
+}
+
+bool Navmesh::get_formation_slot_offsets(int formation_id, std::vector<float>& offsets)
+{
+	auto it = formations.find(formation_id);
+	if (it == formations.end())
+	{
+		ctx.log(RC_LOG_ERROR, "Get formation slot offsets: formation %d not found.", formation_id);
+		return false;
+	}
+
+	offsets.assign(it->second.slot_offsets.begin(), it->second.slot_offsets.end());
+	return true;
+}
+
 void Navmesh::update_formations(float dt)
 {
 	if (!is_crowd_init)
@@ -1836,6 +2772,15 @@ void Navmesh::update_formations(float dt)
 		return;
 	}
 
+	dtNavMeshQuery* navquery = sample->getNavMeshQuery();
+	if (!navquery)
+	{
+		return;
+	}
+
+	const float ext[3] = { 2.0f, 4.0f, 2.0f };
+	dtQueryFilter filter;
+
 	for (auto& pair : formations)
 	{
 		Formation& formation = pair.second;
@@ -1845,26 +2790,24 @@ void Navmesh::update_formations(float dt)
 			continue;
 		}
 
-		// Calculate formation positions based on type
 		const float* center = formation.target_pos;
 		const float* dir = formation.target_dir;
 
 		// Right vector (perpendicular to direction)
-		float right[3];
-		right[0] = dir[2];
-		right[1] = 0.0f;
-		right[2] = -dir[0];
+		float right_x = dir[2];
+		float right_z = -dir[0];
 
 		// Normalize right vector
-		float right_len = sqrtf(right[0]*right[0] + right[2]*right[2]);
+		float right_len = sqrtf(right_x*right_x + right_z*right_z);
 		if (right_len > 0.001f)
 		{
-			right[0] /= right_len;
-			right[2] /= right_len;
+			right_x /= right_len;
+			right_z /= right_len;
 		}
 
-		int num_agents = (int)formation.agent_indices.size();
-
+		// slot offsets are cached per formation, only the rotation into the target direction is done per frame
+		const int num_agents = (int)formation.agent_indices.size();
+		const float* offsets = formation.slot_offsets.data();
 		for (int i = 0; i < num_agents; i++)
 		{
 			int agent_idx = formation.agent_indices[i];
@@ -1873,65 +2816,27 @@ void Navmesh::update_formations(float dt)
 				continue;
 			}
 
-			float offset_x = 0.0f;
-			float offset_z = 0.0f;
-
-			switch (formation.type)
+			const dtCrowdAgent* ag = crowd->getAgent(agent_idx);
+			if (!ag || !ag->active)
 			{
-				case 0: // Line formation
-				{
-					int center_idx = num_agents / 2;
-					offset_x = (i - center_idx) * formation.spacing * right[0];
-					offset_z = (i - center_idx) * formation.spacing * right[2];
-					break;
-				}
-
-				case 1: // Column formation
-				{
-					offset_x = -i * formation.spacing * dir[0];
-					offset_z = -i * formation.spacing * dir[2];
-					break;
-				}
-
-				case 2: // Wedge formation
-				{
-					int row = (int)sqrtf((float)i);
-					int col = i - row * row;
-					offset_x = (col - row * 0.5f) * formation.spacing * right[0] - row * formation.spacing * dir[0];
-					offset_z = (col - row * 0.5f) * formation.spacing * right[2] - row * formation.spacing * dir[2];
-					break;
-				}
-
-				case 3: // Box formation
-				{
-					int side_len = (int)ceil(sqrtf((float)num_agents));
-					int row = i / side_len;
-					int col = i % side_len;
-					offset_x = (col - side_len * 0.5f) * formation.spacing * right[0] - row * formation.spacing * dir[0];
-					offset_z = (col - side_len * 0.5f) * formation.spacing * right[2] - row * formation.spacing * dir[2];
-					break;
-				}
-
-				case 4: // Circle formation
-				{
-					float angle = (float)i / (float)num_agents * 2.0f * 3.14159f;
-					float radius = formation.spacing * num_agents / (2.0f * 3.14159f);
-					offset_x = radius * cosf(angle) * right[0] + radius * sinf(angle) * dir[0];
-					offset_z = radius * cosf(angle) * right[2] + radius * sinf(angle) * dir[2];
-					break;
-				}
+				continue;
 			}
 
 			// Set agent target to formation position
+			const float local_x = offsets[2 * i];
+			const float local_z = offsets[2 * i + 1];
 			float target[3];
-			target[0] = center[0] + offset_x;
+			target[0] = center[0] + local_x * right_x + local_z * dir[0];
 			target[1] = center[1];
-			target[2] = center[2] + offset_z;
+			target[2] = center[2] + local_x * right_z + local_z * dir[2];
 
-			const dtCrowdAgent* ag = crowd->getAgent(agent_idx);
-			if (ag && ag->active)
+			// the crowd ignores move requests without the target polygon
+			dtPolyRef targetRef = 0;
+			float nearestPt[3];
+			navquery->findNearestPoly(target, ext, &filter, &targetRef, nearestPt);
+			if (targetRef)
 			{
-				crowd->requestMoveTarget(agent_idx, 0, target);
+				request_move_target(agent_idx, targetRef, nearestPt);
 			}
 		}
 	}
@@ -4,6 +4,8 @@
 #include <iostream>
 #include <vector>
 #include <map>
+#include <array>
+#include <memory>
 #include "SampleInterfaces.h"
 #include "InputGeom.h"
 #include "Sample_SoloMesh.h"
@@ -14,20 +16,36 @@
 #include "NavMeshTesterTool.h"
 #include "DetourCrowd.h"
 
+// fixed-size point type, converted directly from any python sequence of 3 numbers (no intermediate list is created)
+typedef std::array<float, 3> Float3;
+
 class Navmesh
 {
 public:
+	// pos (3), vel (3), dvel (3), targetPos (3), desiredSpeed, state, targetState, active
+	static const int AGENT_STATE_SIZE = 16;
+	// radius, height, maxAcceleration, maxSpeed, collisionQueryRange, pathOptimizationRange, separationWeight, updateFlags, obstacleAvoidanceType, queryFilterType
+	static const int AGENT_PARAMS_SIZE = 10;
+	// id, type, spacing, leader_idx, agent_count, has_target, target (3), dir (3)
+	static const int FORMATION_INFO_SIZE = 12;
+
 	Navmesh();
 	~Navmesh();
 
-	void init_by_obj(std::string file_path);
-	void init_by_raw(std::vector<float> vertices, std::vector<int> faces);
+	bool init_by_obj(std::string file_path);  // return false if the file can not be read
+	void init_by_raw(const std::vector<float>& vertices, const std::vector<int>& faces);
+	void init_by_raw(const float* vertices, int vertices_size, const int* faces, int faces_size);  // the same for raw buffers, the data is copied into the geometry
 	void build_navmesh();
 	std::string get_log();  // clear ctx log after call this function
-	std::vector<float> pathfind_straight(std::vector<float> start, std::vector<float> end, int vertex_mode = 0);  // return array of path point coordinates
+	unsigned long long get_log_version() const { return ctx.getLogVersion(); }  // changes when a new message is logged
+	std::vector<float> pathfind_straight(const Float3& start, const Float3& end, int vertex_mode = 0);  // return array of path point coordinates
 	std::vector<float> pathfind_straight_batch(std::vector<float> coordinates, int vertex_mode = 0);
-	float distance_to_wall(std::vector<float> point);
-	std::vector<float> raycast(std::vector<float> start, std::vector<float> end);
+	bool pathfind_straight_batch_buf(const float* coordinates, size_t pairs_count, int vertex_mode, std::vector<int>& sizes, std::vector<float>& points);  // fill the number of points of each path and packed path coordinates
+	bool pathfind_straight_batch_shared_buf(const float* coordinates, size_t pairs_count, int vertex_mode, std::vector<int>& sizes, std::vector<float>& points);  // the same as pathfind_straight_batch_buf, but nearest polygon lookups and identical pairs are shared
+	float distance_to_wall(const Float3& point);
+	bool distance_to_wall_batch(const float* points, size_t count, float* distances);  // fill count distances, one query setup for all points
+	std::vector<float> raycast(const Float3& start, const Float3& end);
+	bool raycast_batch(const float* starts, const float* ends, size_t count, float* hits);  // fill count hit points (3 floats each), NaN for the starts outside of the navmesh
 	std::map<std::string, float> get_settings();
 	void set_settings(std::map<std::string, float> settings);
 	int get_partition_type();
@@ -35,23 +53,43 @@ public:
 	std::vector<float> get_bounding_box();  // return 6-tuple of floats with geometry bounding box
 	void save_navmesh(std::string file_path);
 	void load_navmesh(std::string file_path);
+	bool load_navmesh_fresh(std::string file_path);  // load navmesh into the new instance without building the navmesh from geometry
+	std::vector<unsigned char> save_navmesh_to_bytes();  // the same data as in the *.bin file, empty if the navmesh is not built
+	bool load_navmesh_from_bytes(const unsigned char* data, size_t size);  // keep the current geometry, or use the placeholder one as load_navmesh_fresh
 	std::tuple<std::vector<float>, std::vector<int>> get_navmesh_trianglulation();  // return the pair ([vertices coordinates], [triangles point indexes])
 	std::tuple<std::vector<float>, std::vector<int>> get_navmesh_trianglulation_sample();
 	std::tuple<std::vector<float>, std::vector<int>, std::vector<int>> get_navmesh_polygonization();  // return the tripple ([vertex coordinates], [polygon vertex indexes], [polygon sizes])
 	std::tuple<std::vector<float>, std::vector<int>, std::vector<int>> get_navmesh_polygonization_sample();
-	std::vector<float> hit_mesh(std::vector<float> start, std::vector<float> end);
+	std::vector<unsigned short> get_navmesh_poly_flags();  // flags of the navmesh polygons in the same order as in get_navmesh_polygonization_sample
+	std::vector<unsigned char> get_navmesh_poly_areas();  // area types of the navmesh polygons in the same order as in get_navmesh_polygonization_sample
+	std::vector<float> hit_mesh(const Float3& start, const Float3& end);
 
 	// Crowd management
 	bool init_crowd(int maxAgents, float maxAgentRadius);
-	int add_agent(std::vector<float> pos, std::map<std::string, float> params);
+	int add_agent(const Float3& pos, std::map<std::string, float> params);
+	int add_agents(const float* positions, int count, const std::map<std::string, float>& params, int* ids, const float* targets = nullptr);  // add count agents with the same parameters, write agent indexes (-1 on failure) into ids, return the number of added agents; targets (3 floats per agent) are optional move targets
 	void remove_agent(int idx);
 	void update_crowd(float dt);
-	bool set_agent_target(int idx, std::vector<float> pos);
-	bool set_agent_velocity(int idx, std::vector<float> vel);
+	void tick(float dt);  // update_formations and then update_crowd, one call per frame
+	bool set_agent_target(int idx, const Float3& pos);
+	bool set_agent_velocity(int idx, const Float3& vel);
 	bool reset_agent_target(int idx);
 	std::vector<float> get_agent_position(int idx);
 	std::vector<float> get_agent_velocity(int idx);
+	bool get_agent_position_row(int idx, float* out);  // write (x, y, z) of the agent into out without allocation
+	bool get_agent_velocity_row(int idx, float* out);
 	std::map<std::string, float> get_agent_state(int idx);
+	bool get_all_agent_states(float* positions, float* velocities, unsigned char* states, unsigned char* target_states, unsigned char* active, int count);  // fill SoA arrays with the state of the first count agents
+	int get_agents_snapshot(const int* ids, int count, float* positions, float* velocities, unsigned char* target_states);  // fill rows for the given agents, return the number of active ones or -1 if the crowd is not initialized
+	int get_all_agent_positions(float* out, int count);  // write (x, y, z) of the first count agents (inactive agents are included), return the number of written agents
+	int get_all_agent_velocities(float* out, int count);
+	int get_all_agent_targets(float* out, int count);
+	// positions and velocities of all agents (3 floats per agent), refreshed after each update_crowd / tick
+	// the mirror is allocated and filled on the first call, a new crowd gets new mirrors
+	std::shared_ptr<std::vector<float>> get_agent_positions_mirror();
+	std::shared_ptr<std::vector<float>> get_agent_velocities_mirror();
+	bool get_agent_state_row(int idx, float* out);  // write AGENT_STATE_SIZE floats with the agent state (the layout is in the AGENT_STATE_FIELDS of the python module)
+	int get_all_agent_state_rows(float* out, int count);  // write state rows for the first count agents, return the number of written rows
 	int get_agent_count();
 	void update_agent_parameters(int idx, std::map<std::string, float> params);
 
@@ -60,15 +98,19 @@ public:
 	std::map<std::string, float> get_obstacle_avoidance_params(int idx);
 	void set_query_filter_area_cost(int filter_index, int area_id, float cost);
 	float get_query_filter_area_cost(int filter_index, int area_id);
+	int set_query_filter_area_costs(int filter_index, const float* costs, int count);  // set costs of the areas 0..count-1 (at most DT_MAX_AREAS), return the number of changed areas
+	bool get_query_filter_area_costs(int filter_index, float* costs, int count);  // fill costs of the areas 0..count-1
 	void set_query_filter_include_flags(int filter_index, unsigned short flags);
 	void set_query_filter_exclude_flags(int filter_index, unsigned short flags);
 	std::vector<int> get_agent_neighbors(int agent_idx);
 	std::vector<float> get_agent_corners(int agent_idx);
+	bool get_all_agent_corners(const int* indices, int count, std::vector<int>& sizes, std::vector<float>& points);  // fill the number of corners of each agent (0 for invalid or inactive agents) and packed corner coordinates
 	std::vector<int> get_active_agents();
 	int get_max_agent_count();
 	std::vector<float> get_query_half_extents();
 	bool is_agent_active(int idx);
 	std::map<std::string, float> get_agent_parameters(int idx);
+	bool get_agent_parameters_row(int idx, float* out);  // write AGENT_PARAMS_SIZE floats with the agent parameters
 
 	// Convex Volumes (Nav Volumes for area marking)
 	void add_convex_volume(std::vector<float> verts, float minh, float maxh, unsigned char area);
@@ -76,33 +118,41 @@ public:
 	int get_convex_volume_count();
 	std::map<std::string, std::vector<float>> get_convex_volume(int index);
 	std::vector<std::map<std::string, std::vector<float>>> get_all_convex_volumes();
+	bool get_all_convex_volumes_soa(std::vector<float>& verts, std::vector<int>& counts, std::vector<float>& hmins, std::vector<float>& hmaxs, std::vector<unsigned char>& areas);  // the same layout as in add_convex_volumes
+	int add_convex_volumes(const float* verts, const int* counts, const float* hmins, const float* hmaxs, const unsigned char* areas, int count);  // verts of all volumes one after another, counts[i] vertices of the i-th volume, return the number of added volumes
 
 	// Off-Mesh Connections (Climbing, Jumping, etc.)
-	void add_offmesh_connection(std::vector<float> start_pos, std::vector<float> end_pos,
+	void add_offmesh_connection(const Float3& start_pos, const Float3& end_pos,
 	                            float radius, bool bidirectional, unsigned char area,
 	                            unsigned short flags);
 	void delete_offmesh_connection(int index);
 	int get_offmesh_connection_count();
 	std::map<std::string, std::vector<float>> get_offmesh_connection(int index);
 	std::vector<std::map<std::string, std::vector<float>>> get_all_offmesh_connections();
+	bool get_all_offmesh_connections_soa(std::vector<float>& verts, std::vector<float>& radii, std::vector<unsigned char>& bidirectional, std::vector<unsigned char>& areas, std::vector<unsigned short>& flags);  // the same layout as in add_offmesh_connections
+	int add_offmesh_connections(const float* verts, const float* radii, const unsigned char* bidirectional, const unsigned char* areas, const unsigned short* flags, int count);  // verts contains 6 floats (start and end) per connection, return the number of added connections
 
 	// Auto-Markup System (Area marking based on geometry)
 	void mark_walkable_triangles(float walkable_slope_angle);
-	void mark_box_area(std::vector<float> bmin, std::vector<float> bmax, unsigned char area_id);
-	void mark_cylinder_area(std::vector<float> pos, float radius, float height, unsigned char area_id);
+	void mark_box_area(const Float3& bmin, const Float3& bmax, unsigned char area_id);
+	void mark_cylinder_area(const Float3& pos, float radius, float height, unsigned char area_id);
 	void mark_convex_poly_area(std::vector<float> verts, float hmin, float hmax, unsigned char area_id);
+	int mark_box_areas(const float* bounds, const unsigned char* area_ids, int count);  // bounds contains 6 floats (bmin and bmax) per box, return the number of marked boxes
+	int mark_cylinder_areas(const float* positions, const float* radii, const float* heights, const unsigned char* area_ids, int count);  // return the number of marked cylinders
 	void erode_walkable_area(int radius);
 	void median_filter_walkable_area();
 
 	// Formations & Group Behaviors
-	int create_formation(int formation_type, float spacing);
+	int create_formation(int formation_type, float spacing, int max_agents = 64);  // storage for max_agents is reserved, add_agent_to_formation fails past it
 	void delete_formation(int formation_id);
 	bool add_agent_to_formation(int formation_id, int agent_idx);
 	bool remove_agent_from_formation(int agent_idx);
-	void set_formation_target(int formation_id, std::vector<float> target_pos, std::vector<float> target_dir);
+	void set_formation_target(int formation_id, const Float3& target_pos, const Float3& target_dir);
 	void set_formation_leader(int formation_id, int agent_idx);
 	std::vector<int> get_formation_agents(int formation_id);
 	std::map<std::string, float> get_formation_info(int formation_id);
+	bool get_formation_info_row(int formation_id, float* out);  // write FORMATION_INFO_SIZE floats in the same order as the keys of get_formation_info
+	bool get_formation_slot_offsets(int formation_id, std::vector<float>& offsets);  // 2 floats (along the right vector and the direction) per agent in the order of get_formation_agents
 	void update_formations(float dt);
 	int get_formation_count();
 
@@ -115,23 +165,49 @@ private:
 
 	void clear();
 
+	// one query object per OpenMP thread for pathfind_straight_batch_buf, created again after each build or load
+	// because the queries point to the navmesh, empty without OpenMP or when the allocation fails
+	std::vector<dtNavMeshQuery*> thread_queries;
+	bool init_thread_queries();
+	void free_thread_queries();
+
 	bool is_init;
 	bool is_build;
 	bool is_crowd_init;
 
+	// a repeated request of the current target does not restart the path search,
+	// unless the query filters are changed after the path was requested
+	unsigned int filter_version;
+	std::vector<unsigned int> target_filter_versions;  // filter_version at the last move request of each agent
+	bool request_move_target(int idx, dtPolyRef ref, const float* pos);
+
+	std::shared_ptr<std::vector<float>> positions_mirror;
+	std::shared_ptr<std::vector<float>> velocities_mirror;
+	void update_agent_mirrors();
+	void set_new_agent_targets(const int* ids, int count, const float* targets);
+
 	// Formation management structures
+public:
+	typedef void (*SlotFn)(int num_agents, float spacing, float* offsets);  // write 2 floats (right, forward) per slot
+
+private:
 	struct Formation {
 		int id;
 		int type;  // 0=line, 1=column, 2=wedge, 3=box, 4=circle
 		float spacing;
+		SlotFn slot_fn;  // layout of the formation type
+		int max_agents;  // capacity reserved in create_formation
 		int leader_idx;
 		std::vector<int> agent_indices;
+		std::vector<float> slot_offsets;  // 2 floats (along the right and the forward direction) per agent, depends only on the type, spacing and the number of agents
 		float target_pos[3];
 		float target_dir[3];
 		bool has_target;
 	};
 	std::map<int, Formation> formations;
 	int next_formation_id;
+
+	static void update_slot_offsets(Formation& formation);  // recompute slot_offsets after the change of the formation members
 };
 
 #endif
\ No newline at end of file
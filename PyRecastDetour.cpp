@@ -3,9 +3,74 @@
 #ifndef _MAIN_APP
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+#include <cstring>
+#include <algorithm>
 
 namespace py = pybind11;
 
+// agent and obstacle avoidance parameters can be passed as any mapping, for example read-only DEFAULT_AGENT_PARAMS from the python module
+static std::map<std::string, float> to_params_map(const py::object& params)
+{
+	if (py::isinstance<py::dict>(params))
+	{
+		return params.cast<std::map<std::string, float>>();
+	}
+	return py::dict(params).cast<std::map<std::string, float>>();
+}
+
+// copy flat [x1, y1, z1, x2, y2, z2, ...] coordinates into the numpy array with shape (n, 3)
+static py::array_t<float> to_points_array(const std::vector<float>& coordinates)
+{
+	py::array_t<float> points({ (py::ssize_t)(coordinates.size() / 3), (py::ssize_t)3 });
+	if (!coordinates.empty())
+	{
+		std::memcpy(points.mutable_data(), coordinates.data(), coordinates.size() * sizeof(float));
+	}
+	return points;
+}
+
+// move the vector into the heap and expose its buffer as the numpy array with shape (size / columns, columns) without copying
+// the capsule owns the vector, so the buffer lives as long as the numpy array
+template <typename T>
+static py::array_t<T> to_owned_array(std::vector<T>&& data, py::ssize_t columns)
+{
+	std::vector<T>* owned = new std::vector<T>(std::move(data));
+	py::capsule base(owned, [](void* ptr) { delete reinterpret_cast<std::vector<T>*>(ptr); });
+	py::ssize_t rows = columns > 0 ? (py::ssize_t)owned->size() / columns : 0;
+	if (columns > 1)
+	{
+		return py::array_t<T>({ rows, columns }, owned->data(), base);
+	}
+	return py::array_t<T>({ (py::ssize_t)owned->size() }, owned->data(), base);
+}
+
+// offsets of each item in the packed points array, the i-th item is points[offsets[i]:offsets[i + 1]]
+static py::array_t<int> to_offsets_array(const std::vector<int>& sizes)
+{
+	py::array_t<int> offsets(sizes.size() + 1);
+	int* offsets_ptr = offsets.mutable_data();
+	offsets_ptr[0] = 0;
+	for (size_t i = 0; i < sizes.size(); i++)
+	{
+		offsets_ptr[i + 1] = offsets_ptr[i] + sizes[i];
+	}
+	return offsets;
+}
+
+// expose the shared buffer as the numpy array with shape (n, 3) without copying
+// the capsule holds one reference, so the buffer stays valid even after the crowd is reinitialized
+static py::array_t<float> to_mirror_array(std::shared_ptr<std::vector<float>> mirror)
+{
+	if (!mirror)
+	{
+		return py::array_t<float>(std::vector<py::ssize_t>{ 0, 3 });
+	}
+	auto* owner = new std::shared_ptr<std::vector<float>>(std::move(mirror));
+	py::capsule base(owner, [](void* ptr) { delete reinterpret_cast<std::shared_ptr<std::vector<float>>*>(ptr); });
+	return py::array_t<float>({ (py::ssize_t)((*owner)->size() / 3), (py::ssize_t)3 }, (*owner)->data(), base);
+}
+
 #ifdef _Python2
 PYBIND11_MODULE(Py2RecastDetour, m)
 #else
@@ -31,51 +96,332 @@ PYBIND11_MODULE(Py310RecastDetour, m)
 	m.doc() = "Class allows to build navmesh from obj or raw vertices and polygons data. Also allows to find the shortest path between two points. Based on RecastNavigation c++ library https://github.com/recastnavigation/recastnavigation";
 	py::class_<Navmesh>(m, "Navmesh")
 		.def(py::init<>())
-		.def("init_by_obj", &Navmesh::init_by_obj, py::arg("file_path"))
-		.def("init_by_raw", &Navmesh::init_by_raw, py::arg("vertices"), py::arg("faces"))
-		.def("build_navmesh", &Navmesh::build_navmesh)
+		.def("init_by_obj", &Navmesh::init_by_obj, py::arg("file_path"), py::call_guard<py::gil_scoped_release>())
+		.def("init_by_raw", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> vertices, py::array_t<int, py::array::c_style | py::array::forcecast> faces)
+			{
+				// any buffer (numpy array, array.array, list) is read in place, without conversion of each value
+				py::gil_scoped_release release;
+				self.init_by_raw(vertices.data(), (int)vertices.size(), faces.data(), (int)faces.size());
+			}, py::arg("vertices"), py::arg("faces"))
+		.def("build_navmesh", &Navmesh::build_navmesh, py::call_guard<py::gil_scoped_release>())
 		.def("get_log", &Navmesh::get_log)
-		.def("pathfind_straight", &Navmesh::pathfind_straight, py::arg("start"), py::arg("end"), py::arg("vertex_mode") = 0)
-		.def("pathfind_straight_batch", &Navmesh::pathfind_straight_batch, py::arg("coordinates"), py::arg("vertex_mode") = 0)
+		.def("get_log_version", &Navmesh::get_log_version)
+		.def("pathfind_straight", [](Navmesh& self, const Float3& start, const Float3& end, int vertex_mode)
+			{
+				return to_points_array(self.pathfind_straight(start, end, vertex_mode));
+			}, py::arg("start"), py::arg("end"), py::arg("vertex_mode") = 0)
+		.def("pathfind_straight_batch", &Navmesh::pathfind_straight_batch, py::arg("coordinates"), py::arg("vertex_mode") = 0, py::call_guard<py::gil_scoped_release>())
+		.def("pathfind_straight_batch_buf", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> coordinates, int vertex_mode) -> py::object
+			{
+				std::vector<int> sizes;
+				std::vector<float> points;
+				bool is_ok;
+				{
+					// the input array is kept alive by the argument, only the output is converted with the GIL
+					py::gil_scoped_release release;
+					is_ok = self.pathfind_straight_batch_buf(coordinates.data(), coordinates.size() / 6, vertex_mode, sizes, points);
+				}
+				if (!is_ok)
+				{
+					return py::none();
+				}
+
+				return py::make_tuple(to_offsets_array(sizes), to_points_array(points));
+			}, py::arg("coordinates"), py::arg("vertex_mode") = 0)
+		.def("pathfind_straight_batch_shared_buf", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> coordinates, int vertex_mode) -> py::object
+			{
+				std::vector<int> sizes;
+				std::vector<float> points;
+				bool is_ok;
+				{
+					py::gil_scoped_release release;
+					is_ok = self.pathfind_straight_batch_shared_buf(coordinates.data(), coordinates.size() / 6, vertex_mode, sizes, points);
+				}
+				if (!is_ok)
+				{
+					return py::none();
+				}
+
+				return py::make_tuple(to_offsets_array(sizes), to_points_array(points));
+			}, py::arg("coordinates"), py::arg("vertex_mode") = 0)
 		.def("distance_to_wall", &Navmesh::distance_to_wall, py::arg("point"))
-		.def("raycast", &Navmesh::raycast, py::arg("start"), py::arg("end"))
+		.def("distance_to_wall_batch", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> points) -> py::object
+			{
+				if (points.size() % 3 != 0)
+				{
+					throw py::value_error("Distance to wall batch: the number of point coordinates should be divisible by 3.");
+				}
+				const py::ssize_t count = points.size() / 3;
+				py::array_t<float> distances(count);
+				bool is_ok;
+				{
+					py::gil_scoped_release release;
+					is_ok = self.distance_to_wall_batch(points.data(), (size_t)count, distances.mutable_data());
+				}
+				if (!is_ok)
+				{
+					return py::none();
+				}
+				return distances;
+			}, py::arg("points"))
+		.def("raycast", [](Navmesh& self, const Float3& start, const Float3& end) -> py::object
+			{
+				std::vector<float> c = self.raycast(start, end);
+				if (c.size() < 6)
+				{
+					return py::none();
+				}
+				return py::make_tuple(py::make_tuple(c[0], c[1], c[2]), py::make_tuple(c[3], c[4], c[5]));
+			}, py::arg("start"), py::arg("end"))
+		.def("raycast_batch", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> starts, py::array_t<float, py::array::c_style | py::array::forcecast> ends) -> py::object
+			{
+				if (starts.size() % 3 != 0 || starts.size() != ends.size())
+				{
+					throw py::value_error("Raycast batch: starts and ends should have the same number of coordinates, divisible by 3.");
+				}
+				const py::ssize_t count = starts.size() / 3;
+				py::array_t<float> hits({ count, (py::ssize_t)3 });
+				bool is_ok;
+				{
+					py::gil_scoped_release release;
+					is_ok = self.raycast_batch(starts.data(), ends.data(), (size_t)count, hits.mutable_data());
+				}
+				if (!is_ok)
+				{
+					return py::none();
+				}
+				return hits;
+			}, py::arg("starts"), py::arg("ends"))
 		.def("get_settings", &Navmesh::get_settings)
 		.def("set_settings", &Navmesh::set_settings, py::arg("settings"))
 		.def("get_partition_type", &Navmesh::get_partition_type)
 		.def("set_partition_type", &Navmesh::set_partition_type, py::arg("type"))
 		.def("get_bounding_box", &Navmesh::get_bounding_box)
-		.def("save_navmesh", &Navmesh::save_navmesh, py::arg("file_path"))
-		.def("load_navmesh", &Navmesh::load_navmesh, py::arg("file_path"))
-		.def("get_navmesh_trianglulation", &Navmesh::get_navmesh_trianglulation_sample)
-		.def("get_navmesh_polygonization", &Navmesh::get_navmesh_polygonization_sample)
-		.def("hit_mesh", &Navmesh::hit_mesh, py::arg("start"), py::arg("end"))
+		.def("save_navmesh", &Navmesh::save_navmesh, py::arg("file_path"), py::call_guard<py::gil_scoped_release>())
+		.def("load_navmesh", &Navmesh::load_navmesh, py::arg("file_path"), py::call_guard<py::gil_scoped_release>())
+		.def("load_navmesh_fresh", &Navmesh::load_navmesh_fresh, py::arg("file_path"), py::call_guard<py::gil_scoped_release>())
+		.def("save_navmesh_to_bytes", [](Navmesh& self)
+			{
+				std::vector<unsigned char> data;
+				{
+					py::gil_scoped_release release;
+					data = self.save_navmesh_to_bytes();
+				}
+				return py::bytes(reinterpret_cast<const char*>(data.data()), data.size());
+			})
+		.def("load_navmesh_from_bytes", [](Navmesh& self, py::buffer data)
+			{
+				// the buffer is held by the caller during the call, so it can be read without the GIL
+				py::buffer_info info = data.request();
+				const unsigned char* ptr = static_cast<const unsigned char*>(info.ptr);
+				size_t size = (size_t)(info.size * info.itemsize);
+				py::gil_scoped_release release;
+				return self.load_navmesh_from_bytes(ptr, size);
+			}, py::arg("data"))
+		.def("get_navmesh_trianglulation", [](Navmesh& self)
+			{
+				std::tuple<std::vector<float>, std::vector<int>> t = self.get_navmesh_trianglulation_sample();
+				return py::make_tuple(to_owned_array(std::move(std::get<0>(t)), 3), to_owned_array(std::move(std::get<1>(t)), 3));
+			})
+		.def("get_navmesh_polygonization", [](Navmesh& self)
+			{
+				std::tuple<std::vector<float>, std::vector<int>, std::vector<int>> t = self.get_navmesh_polygonization_sample();
+				return py::make_tuple(to_owned_array(std::move(std::get<0>(t)), 3), to_owned_array(std::move(std::get<1>(t)), 1), to_owned_array(std::move(std::get<2>(t)), 1));
+			})
+		.def("get_navmesh_poly_flags", [](Navmesh& self)
+			{
+				return to_owned_array(self.get_navmesh_poly_flags(), 1);
+			})
+		.def("get_navmesh_poly_areas", [](Navmesh& self)
+			{
+				return to_owned_array(self.get_navmesh_poly_areas(), 1);
+			})
+		.def("hit_mesh", [](Navmesh& self, const Float3& start, const Float3& end) -> py::object
+			{
+				std::vector<float> c = self.hit_mesh(start, end);
+				if (c.size() != 3)
+				{
+					return py::none();
+				}
+				return py::make_tuple(c[0], c[1], c[2]);
+			}, py::arg("start"), py::arg("end"))
 		.def("init_crowd", &Navmesh::init_crowd, py::arg("maxAgents"), py::arg("maxAgentRadius"))
-		.def("add_agent", &Navmesh::add_agent, py::arg("pos"), py::arg("params"))
+		.def("add_agent", [](Navmesh& self, const Float3& pos, const py::object& params)
+			{
+				return self.add_agent(pos, to_params_map(params));
+			}, py::arg("pos"), py::arg("params"))
+		.def("add_agents", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> positions, const py::object& params, const py::object& targets)
+			{
+				if (positions.size() % 3 != 0)
+				{
+					throw py::value_error("Add agents: the number of position coordinates should be divisible by 3.");
+				}
+				int count = (int)(positions.size() / 3);
+				py::array_t<int> ids(count);
+				if (targets.is_none())
+				{
+					self.add_agents(positions.data(), count, to_params_map(params), ids.mutable_data());
+					return ids;
+				}
+
+				auto target_array = py::array_t<float, py::array::c_style | py::array::forcecast>::ensure(targets);
+				if (!target_array || target_array.size() != positions.size())
+				{
+					throw py::value_error("Add agents: targets should have the same number of coordinates as positions.");
+				}
+				self.add_agents(positions.data(), count, to_params_map(params), ids.mutable_data(), target_array.data());
+				return ids;
+			}, py::arg("positions"), py::arg("params"), py::arg("targets") = py::none())
 		.def("remove_agent", &Navmesh::remove_agent, py::arg("idx"))
-		.def("update_crowd", &Navmesh::update_crowd, py::arg("dt"))
-		.def("set_agent_target", &Navmesh::set_agent_target, py::arg("idx"), py::arg("pos"))
+		.def("update_crowd", &Navmesh::update_crowd, py::arg("dt"), py::call_guard<py::gil_scoped_release>())
+		.def("tick", &Navmesh::tick, py::arg("dt"), py::call_guard<py::gil_scoped_release>())
+		.def("set_agent_target", &Navmesh::set_agent_target, py::arg("idx"), py::arg("pos"), py::call_guard<py::gil_scoped_release>())
 		.def("set_agent_velocity", &Navmesh::set_agent_velocity, py::arg("idx"), py::arg("vel"))
 		.def("reset_agent_target", &Navmesh::reset_agent_target, py::arg("idx"))
-		.def("get_agent_position", &Navmesh::get_agent_position, py::arg("idx"))
-		.def("get_agent_velocity", &Navmesh::get_agent_velocity, py::arg("idx"))
+		.def("get_agent_position", [](Navmesh& self, int idx)
+			{
+				std::vector<float> pos = self.get_agent_position(idx);
+				if (pos.empty())
+				{
+					throw py::value_error("Get agent position: crowd is not initialized, invalid agent index or agent not active.");
+				}
+				return py::make_tuple(pos[0], pos[1], pos[2]);
+			}, py::arg("idx"))
+		.def("get_agent_velocity", [](Navmesh& self, int idx)
+			{
+				std::vector<float> vel = self.get_agent_velocity(idx);
+				if (vel.empty())
+				{
+					throw py::value_error("Get agent velocity: crowd is not initialized, invalid agent index or agent not active.");
+				}
+				return py::make_tuple(vel[0], vel[1], vel[2]);
+			}, py::arg("idx"))
+		.def("get_agent_position_into", [](Navmesh& self, int idx, py::array_t<float, py::array::c_style> out)
+			{
+				if (out.size() < 3)
+				{
+					throw py::value_error("Get agent position into: the output array is too small.");
+				}
+				return self.get_agent_position_row(idx, out.mutable_data());
+			}, py::arg("idx"), py::arg("out").noconvert())
+		.def("get_agent_velocity_into", [](Navmesh& self, int idx, py::array_t<float, py::array::c_style> out)
+			{
+				if (out.size() < 3)
+				{
+					throw py::value_error("Get agent velocity into: the output array is too small.");
+				}
+				return self.get_agent_velocity_row(idx, out.mutable_data());
+			}, py::arg("idx"), py::arg("out").noconvert())
 		.def("get_agent_state", &Navmesh::get_agent_state, py::arg("idx"))
+		.def("get_all_agent_states", [](Navmesh& self, py::array_t<float, py::array::c_style> positions, py::array_t<float, py::array::c_style> velocities,
+			py::array_t<unsigned char, py::array::c_style> states, py::array_t<unsigned char, py::array::c_style> target_states, py::array_t<unsigned char, py::array::c_style> active)
+			{
+				// output arrays are filled in place, so all of them should have the same number of agents
+				int count = (int)std::min({ positions.size() / 3, velocities.size() / 3, states.size(), target_states.size(), active.size() });
+				return self.get_all_agent_states(positions.mutable_data(), velocities.mutable_data(), states.mutable_data(), target_states.mutable_data(), active.mutable_data(), count);
+			}, py::arg("positions").noconvert(), py::arg("velocities").noconvert(), py::arg("states").noconvert(), py::arg("target_states").noconvert(), py::arg("active").noconvert())
+		.def("get_agents_snapshot", [](Navmesh& self, py::array_t<int, py::array::c_style | py::array::forcecast> ids) -> py::object
+			{
+				const py::ssize_t count = ids.size();
+				py::array_t<float> positions({ count, (py::ssize_t)3 });
+				py::array_t<float> velocities({ count, (py::ssize_t)3 });
+				py::array_t<unsigned char> target_states(count);
+				if (self.get_agents_snapshot(ids.data(), (int)count, positions.mutable_data(), velocities.mutable_data(), target_states.mutable_data()) < 0)
+				{
+					return py::none();
+				}
+				return py::make_tuple(positions, velocities, target_states);
+			}, py::arg("ids"))
+		.def("get_all_agent_positions", [](Navmesh& self)
+			{
+				py::array_t<float> out({ (py::ssize_t)self.get_max_agent_count(), (py::ssize_t)3 });
+				self.get_all_agent_positions(out.mutable_data(), (int)out.shape(0));
+				return out;
+			})
+		.def("get_all_agent_velocities", [](Navmesh& self)
+			{
+				py::array_t<float> out({ (py::ssize_t)self.get_max_agent_count(), (py::ssize_t)3 });
+				self.get_all_agent_velocities(out.mutable_data(), (int)out.shape(0));
+				return out;
+			})
+		.def("get_all_agent_targets", [](Navmesh& self)
+			{
+				py::array_t<float> out({ (py::ssize_t)self.get_max_agent_count(), (py::ssize_t)3 });
+				self.get_all_agent_targets(out.mutable_data(), (int)out.shape(0));
+				return out;
+			})
+		.def("get_agent_positions_view", [](Navmesh& self)
+			{
+				return to_mirror_array(self.get_agent_positions_mirror());
+			})
+		.def("get_agent_velocities_view", [](Navmesh& self)
+			{
+				return to_mirror_array(self.get_agent_velocities_mirror());
+			})
+		.def("get_agent_state_into", [](Navmesh& self, int idx, py::array_t<float, py::array::c_style> out)
+			{
+				if (out.size() < Navmesh::AGENT_STATE_SIZE)
+				{
+					throw py::value_error("Get agent state into: the output array is too small.");
+				}
+				return self.get_agent_state_row(idx, out.mutable_data());
+			}, py::arg("idx"), py::arg("out").noconvert())
+		.def("get_all_agent_state_rows", [](Navmesh& self, py::array_t<float, py::array::c_style> out)
+			{
+				return self.get_all_agent_state_rows(out.mutable_data(), (int)(out.size() / Navmesh::AGENT_STATE_SIZE));
+			}, py::arg("out").noconvert())
 		.def("get_agent_count", &Navmesh::get_agent_count)
 		.def("update_agent_parameters", &Navmesh::update_agent_parameters, py::arg("idx"), py::arg("params"))
 
 		// Crowd Advanced Features
-		.def("set_obstacle_avoidance_params", &Navmesh::set_obstacle_avoidance_params, py::arg("idx"), py::arg("params"))
+		.def("set_obstacle_avoidance_params", [](Navmesh& self, int idx, const py::object& params)
+			{
+				self.set_obstacle_avoidance_params(idx, to_params_map(params));
+			}, py::arg("idx"), py::arg("params"))
 		.def("get_obstacle_avoidance_params", &Navmesh::get_obstacle_avoidance_params, py::arg("idx"))
 		.def("set_query_filter_area_cost", &Navmesh::set_query_filter_area_cost, py::arg("filter_index"), py::arg("area_id"), py::arg("cost"))
 		.def("get_query_filter_area_cost", &Navmesh::get_query_filter_area_cost, py::arg("filter_index"), py::arg("area_id"))
+		.def("set_query_filter_area_costs", [](Navmesh& self, int filter_index, py::array_t<float, py::array::c_style | py::array::forcecast> costs)
+			{
+				return self.set_query_filter_area_costs(filter_index, costs.data(), (int)costs.size());
+			}, py::arg("filter_index"), py::arg("costs"))
+		.def("get_query_filter_area_costs", [](Navmesh& self, int filter_index)
+			{
+				py::array_t<float> out((py::ssize_t)DT_MAX_AREAS);
+				if (!self.get_query_filter_area_costs(filter_index, out.mutable_data(), DT_MAX_AREAS))
+				{
+					return py::array_t<float>((py::ssize_t)0);
+				}
+				return out;
+			}, py::arg("filter_index"))
 		.def("set_query_filter_include_flags", &Navmesh::set_query_filter_include_flags, py::arg("filter_index"), py::arg("flags"))
 		.def("set_query_filter_exclude_flags", &Navmesh::set_query_filter_exclude_flags, py::arg("filter_index"), py::arg("flags"))
 		.def("get_agent_neighbors", &Navmesh::get_agent_neighbors, py::arg("agent_idx"))
-		.def("get_agent_corners", &Navmesh::get_agent_corners, py::arg("agent_idx"))
+		.def("get_agent_corners", [](Navmesh& self, int agent_idx)
+			{
+				return to_points_array(self.get_agent_corners(agent_idx));
+			}, py::arg("agent_idx"))
+		.def("get_all_agent_corners", [](Navmesh& self, py::array_t<int, py::array::c_style | py::array::forcecast> indices)
+			{
+				std::vector<int> sizes;
+				std::vector<float> points;
+				self.get_all_agent_corners(indices.data(), (int)indices.size(), sizes, points);
+				return py::make_tuple(to_offsets_array(sizes), to_points_array(points));
+			}, py::arg("indices"))
 		.def("get_active_agents", &Navmesh::get_active_agents)
 		.def("get_max_agent_count", &Navmesh::get_max_agent_count)
 		.def("get_query_half_extents", &Navmesh::get_query_half_extents)
 		.def("is_agent_active", &Navmesh::is_agent_active, py::arg("idx"))
 		.def("get_agent_parameters", &Navmesh::get_agent_parameters, py::arg("idx"))
+		.def("get_agent_parameters_tuple", [](Navmesh& self, int idx) -> py::object
+			{
+				float row[Navmesh::AGENT_PARAMS_SIZE];
+				if (!self.get_agent_parameters_row(idx, row))
+				{
+					return py::none();
+				}
+				return py::make_tuple(row[0], row[1], row[2], row[3], row[4], row[5], row[6], (int)row[7], (int)row[8], (int)row[9]);
+			}, py::arg("idx"))
 
 		// Convex Volumes
 		.def("add_convex_volume", &Navmesh::add_convex_volume, py::arg("verts"), py::arg("minh"), py::arg("maxh"), py::arg("area"))
@@ -83,6 +429,47 @@ PYBIND11_MODULE(Py310RecastDetour, m)
 		.def("get_convex_volume_count", &Navmesh::get_convex_volume_count)
 		.def("get_convex_volume", &Navmesh::get_convex_volume, py::arg("index"))
 		.def("get_all_convex_volumes", &Navmesh::get_all_convex_volumes)
+		.def("get_all_convex_volumes_soa", [](Navmesh& self)
+			{
+				std::vector<float> verts;
+				std::vector<int> counts;
+				std::vector<float> hmins;
+				std::vector<float> hmaxs;
+				std::vector<unsigned char> areas;
+				self.get_all_convex_volumes_soa(verts, counts, hmins, hmaxs, areas);
+
+				py::dict to_return;
+				to_return["offsets"] = to_offsets_array(counts);
+				to_return["verts"] = to_owned_array(std::move(verts), 3);
+				to_return["hmin"] = to_owned_array(std::move(hmins), 1);
+				to_return["hmax"] = to_owned_array(std::move(hmaxs), 1);
+				to_return["area"] = to_owned_array(std::move(areas), 1);
+				return to_return;
+			})
+		.def("add_convex_volumes_batch", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> verts, py::array_t<int, py::array::c_style | py::array::forcecast> counts,
+			py::array_t<float, py::array::c_style | py::array::forcecast> hmins, py::array_t<float, py::array::c_style | py::array::forcecast> hmaxs, py::array_t<unsigned char, py::array::c_style | py::array::forcecast> areas)
+			{
+				py::ssize_t count = counts.size();
+				if (hmins.size() != count || hmaxs.size() != count || areas.size() != count)
+				{
+					throw py::value_error("Add convex volumes: counts, hmins, hmaxs and areas should have the same size.");
+				}
+				const int* counts_ptr = counts.data();
+				py::ssize_t total = 0;
+				for (py::ssize_t i = 0; i < count; i++)
+				{
+					if (counts_ptr[i] < 0)
+					{
+						throw py::value_error("Add convex volumes: the number of vertices should not be negative.");
+					}
+					total += counts_ptr[i];
+				}
+				if (verts.size() != 3 * total)
+				{
+					throw py::value_error("Add convex volumes: the number of vertex coordinates should be 3 * sum(counts).");
+				}
+				return self.add_convex_volumes(verts.data(), counts_ptr, hmins.data(), hmaxs.data(), areas.data(), (int)count);
+			}, py::arg("verts"), py::arg("counts"), py::arg("hmins"), py::arg("hmaxs"), py::arg("areas"))
 
 		// Off-Mesh Connections
 		.def("add_offmesh_connection", &Navmesh::add_offmesh_connection,
@@ -92,25 +479,93 @@ PYBIND11_MODULE(Py310RecastDetour, m)
 		.def("get_offmesh_connection_count", &Navmesh::get_offmesh_connection_count)
 		.def("get_offmesh_connection", &Navmesh::get_offmesh_connection, py::arg("index"))
 		.def("get_all_offmesh_connections", &Navmesh::get_all_offmesh_connections)
+		.def("get_all_offmesh_connections_soa", [](Navmesh& self)
+			{
+				std::vector<float> verts;
+				std::vector<float> radii;
+				std::vector<unsigned char> bidirectional;
+				std::vector<unsigned char> areas;
+				std::vector<unsigned short> flags;
+				self.get_all_offmesh_connections_soa(verts, radii, bidirectional, areas, flags);
+
+				py::dict to_return;
+				to_return["verts"] = to_owned_array(std::move(verts), 6);
+				to_return["radius"] = to_owned_array(std::move(radii), 1);
+				to_return["bidirectional"] = to_owned_array(std::move(bidirectional), 1);
+				to_return["area"] = to_owned_array(std::move(areas), 1);
+				to_return["flags"] = to_owned_array(std::move(flags), 1);
+				return to_return;
+			})
+		.def("add_offmesh_connections_batch", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> verts, py::array_t<float, py::array::c_style | py::array::forcecast> radii,
+			py::array_t<unsigned char, py::array::c_style | py::array::forcecast> bidirectional, py::array_t<unsigned char, py::array::c_style | py::array::forcecast> areas, py::array_t<unsigned short, py::array::c_style | py::array::forcecast> flags)
+			{
+				py::ssize_t count = radii.size();
+				if (verts.size() != 6 * count || bidirectional.size() != count || areas.size() != count || flags.size() != count)
+				{
+					throw py::value_error("Add off-mesh connections: verts should have 6 coordinates and radii, bidirectional, areas and flags one value per connection.");
+				}
+				return self.add_offmesh_connections(verts.data(), radii.data(), bidirectional.data(), areas.data(), flags.data(), (int)count);
+			}, py::arg("verts"), py::arg("radii"), py::arg("bidirectional"), py::arg("areas"), py::arg("flags"))
 
 		// Auto-Markup System
 		.def("mark_walkable_triangles", &Navmesh::mark_walkable_triangles, py::arg("walkable_slope_angle"))
 		.def("mark_box_area", &Navmesh::mark_box_area, py::arg("bmin"), py::arg("bmax"), py::arg("area_id"))
 		.def("mark_cylinder_area", &Navmesh::mark_cylinder_area, py::arg("pos"), py::arg("radius"), py::arg("height"), py::arg("area_id"))
 		.def("mark_convex_poly_area", &Navmesh::mark_convex_poly_area, py::arg("verts"), py::arg("hmin"), py::arg("hmax"), py::arg("area_id"))
+		.def("mark_box_areas_batch", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> bounds, py::array_t<unsigned char, py::array::c_style | py::array::forcecast> area_ids)
+			{
+				py::ssize_t count = area_ids.size();
+				if (bounds.size() != 6 * count)
+				{
+					throw py::value_error("Mark box areas: bounds should have 6 coordinates per box.");
+				}
+				return self.mark_box_areas(bounds.data(), area_ids.data(), (int)count);
+			}, py::arg("bounds"), py::arg("area_ids"))
+		.def("mark_cylinder_areas_batch", [](Navmesh& self, py::array_t<float, py::array::c_style | py::array::forcecast> positions, py::array_t<float, py::array::c_style | py::array::forcecast> radii,
+			py::array_t<float, py::array::c_style | py::array::forcecast> heights, py::array_t<unsigned char, py::array::c_style | py::array::forcecast> area_ids)
+			{
+				py::ssize_t count = area_ids.size();
+				if (positions.size() != 3 * count || radii.size() != count || heights.size() != count)
+				{
+					throw py::value_error("Mark cylinder areas: positions should have 3 coordinates and radii and heights one value per cylinder.");
+				}
+				return self.mark_cylinder_areas(positions.data(), radii.data(), heights.data(), area_ids.data(), (int)count);
+			}, py::arg("positions"), py::arg("radii"), py::arg("heights"), py::arg("area_ids"))
 		.def("erode_walkable_area", &Navmesh::erode_walkable_area, py::arg("radius"))
 		.def("median_filter_walkable_area", &Navmesh::median_filter_walkable_area)
 
 		// Formations & Group Behaviors
-		.def("create_formation", &Navmesh::create_formation, py::arg("formation_type"), py::arg("spacing"))
+		.def("create_formation", &Navmesh::create_formation, py::arg("formation_type"), py::arg("spacing"), py::arg("max_agents") = 64)
 		.def("delete_formation", &Navmesh::delete_formation, py::arg("formation_id"))
 		.def("add_agent_to_formation", &Navmesh::add_agent_to_formation, py::arg("formation_id"), py::arg("agent_idx"))
 		.def("remove_agent_from_formation", &Navmesh::remove_agent_from_formation, py::arg("agent_idx"))
 		.def("set_formation_target", &Navmesh::set_formation_target, py::arg("formation_id"), py::arg("target_pos"), py::arg("target_dir"))
 		.def("set_formation_leader", &Navmesh::set_formation_leader, py::arg("formation_id"), py::arg("agent_idx"))
-		.def("get_formation_agents", &Navmesh::get_formation_agents, py::arg("formation_id"))
+		.def("get_formation_agents", [](Navmesh& self, int formation_id)
+			{
+				return to_owned_array(self.get_formation_agents(formation_id), 1);
+			}, py::arg("formation_id"))
 		.def("get_formation_info", &Navmesh::get_formation_info, py::arg("formation_id"))
-		.def("update_formations", &Navmesh::update_formations, py::arg("dt"))
+		.def("get_formation_info_tuple", [](Navmesh& self, int formation_id) -> py::object
+			{
+				float row[Navmesh::FORMATION_INFO_SIZE];
+				if (!self.get_formation_info_row(formation_id, row))
+				{
+					return py::none();
+				}
+				return py::make_tuple((int)row[0], (int)row[1], row[2], (int)row[3], (int)row[4], row[5] != 0.0f,
+					row[6], row[7], row[8], row[9], row[10], row[11]);
+			}, py::arg("formation_id"))
+		.def("get_formation_slot_offsets", [](Navmesh& self, int formation_id) -> py::object
+			{
+				std::vector<float> offsets;
+				if (!self.get_formation_slot_offsets(formation_id, offsets))
+				{
+					return py::none();
+				}
+				return to_owned_array(std::move(offsets), 2);
+			}, py::arg("formation_id"))
+		.def("update_formations", &Navmesh::update_formations, py::arg("dt"), py::call_guard<py::gil_scoped_release>())
 		.def("get_formation_count", &Navmesh::get_formation_count);
 }
 #endif // !_MAIN_APP
\ No newline at end of file
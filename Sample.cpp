@@ -345,35 +345,39 @@ dtNavMesh* Sample::loadAll(const char* path)
 	FILE* fp = fopen(path, "rb");
 	if (!fp) return 0;
 
+	std::vector<unsigned char> data;
+	unsigned char chunk[4096];
+	size_t readLen;
+	while ((readLen = fread(chunk, 1, sizeof(chunk), fp)) > 0)
+		data.insert(data.end(), chunk, chunk + readLen);
+	fclose(fp);
+
+	return loadAllFromMemory(data.data(), data.size());
+}
+
+dtNavMesh* Sample::loadAllFromMemory(const unsigned char* data, size_t size)
+{
+	// The same layout as the file written by saveAll: set header, then tile header and tile data for each tile.
+	size_t offset = 0;
+
 	// Read header.
 	NavMeshSetHeader header;
-	size_t readLen = fread(&header, sizeof(NavMeshSetHeader), 1, fp);
-	if (readLen != 1)
-	{
-		fclose(fp);
+	if (size < sizeof(NavMeshSetHeader))
 		return 0;
-	}
+	memcpy(&header, data, sizeof(NavMeshSetHeader));
+	offset += sizeof(NavMeshSetHeader);
 	if (header.magic != NAVMESHSET_MAGIC)
-	{
-		fclose(fp);
 		return 0;
-	}
 	if (header.version != NAVMESHSET_VERSION)
-	{
-		fclose(fp);
 		return 0;
-	}
 
 	dtNavMesh* mesh = dtAllocNavMesh();
 	if (!mesh)
-	{
-		fclose(fp);
 		return 0;
-	}
 	dtStatus status = mesh->init(&header.params);
 	if (dtStatusFailed(status))
 	{
-		fclose(fp);
+		dtFreeNavMesh(mesh);
 		return 0;
 	}
 
@@ -381,56 +385,69 @@ dtNavMesh* Sample::loadAll(const char* path)
 	for (int i = 0; i < header.numTiles; ++i)
 	{
 		NavMeshTileHeader tileHeader;
-		readLen = fread(&tileHeader, sizeof(tileHeader), 1, fp);
-		if (readLen != 1)
+		if (size - offset < sizeof(tileHeader))
 		{
-			fclose(fp);
+			dtFreeNavMesh(mesh);
 			return 0;
 		}
+		memcpy(&tileHeader, data + offset, sizeof(tileHeader));
+		offset += sizeof(tileHeader);
 
 		if (!tileHeader.tileRef || !tileHeader.dataSize)
 			break;
 
-		unsigned char* data = (unsigned char*)dtAlloc(tileHeader.dataSize, DT_ALLOC_PERM);
-		if (!data) break;
-		memset(data, 0, tileHeader.dataSize);
-		readLen = fread(data, tileHeader.dataSize, 1, fp);
-		if (readLen != 1)
+		if (tileHeader.dataSize < 0 || size - offset < (size_t)tileHeader.dataSize)
 		{
-			dtFree(data);
-			fclose(fp);
+			dtFreeNavMesh(mesh);
 			return 0;
 		}
 
-		mesh->addTile(data, tileHeader.dataSize, DT_TILE_FREE_DATA, tileHeader.tileRef, 0);
-	}
+		unsigned char* tileData = (unsigned char*)dtAlloc(tileHeader.dataSize, DT_ALLOC_PERM);
+		if (!tileData) break;
+		memcpy(tileData, data + offset, tileHeader.dataSize);
+		offset += tileHeader.dataSize;
 
-	fclose(fp);
+		mesh->addTile(tileData, tileHeader.dataSize, DT_TILE_FREE_DATA, tileHeader.tileRef, 0);
+	}
 
 	return mesh;
 }
 
 void Sample::saveAll(const char* path, const dtNavMesh* mesh)
 {
-	if (!mesh) return;
+	std::vector<unsigned char> data;
+	if (!saveAllToMemory(mesh, data)) return;
 
 	FILE* fp = fopen(path, "wb");
 	if (!fp)
 		return;
+	fwrite(data.data(), 1, data.size(), fp);
+	fclose(fp);
+}
+
+bool Sample::saveAllToMemory(const dtNavMesh* mesh, std::vector<unsigned char>& data)
+{
+	if (!mesh) return false;
 
 	// Store header.
 	NavMeshSetHeader header;
 	header.magic = NAVMESHSET_MAGIC;
 	header.version = NAVMESHSET_VERSION;
 	header.numTiles = 0;
+	size_t size = sizeof(NavMeshSetHeader);
 	for (int i = 0; i < mesh->getMaxTiles(); ++i)
 	{
 		const dtMeshTile* tile = mesh->getTile(i);
 		if (!tile || !tile->header || !tile->dataSize) continue;
 		header.numTiles++;
+		size += sizeof(NavMeshTileHeader) + tile->dataSize;
 	}
 	memcpy(&header.params, mesh->getParams(), sizeof(dtNavMeshParams));
-	fwrite(&header, sizeof(NavMeshSetHeader), 1, fp);
+
+	data.resize(size);
+	unsigned char* out = data.data();
+	memcpy(out, &header, sizeof(NavMeshSetHeader));
+	out += sizeof(NavMeshSetHeader);
 
 	// Store tiles.
 	for (int i = 0; i < mesh->getMaxTiles(); ++i)
@@ -441,10 +458,12 @@ void Sample::saveAll(const char* path, const dtNavMesh* mesh)
 		NavMeshTileHeader tileHeader;
 		tileHeader.tileRef = mesh->getTileRef(tile);
 		tileHeader.dataSize = tile->dataSize;
-		fwrite(&tileHeader, sizeof(tileHeader), 1, fp);
+		memcpy(out, &tileHeader, sizeof(tileHeader));
+		out += sizeof(tileHeader);
 
-		fwrite(tile->data, tile->dataSize, 1, fp);
+		memcpy(out, tile->data, tile->dataSize);
+		out += tile->dataSize;
 	}
 
-	fclose(fp);
+	return true;
 }
@@ -21,6 +21,7 @@
 
 #include "Recast.h"
 #include "SampleInterfaces.h"
+#include <vector>
 
 
 /// Tool types.
@@ -134,6 +135,8 @@ protected:
 
 	dtNavMesh* loadAll(const char* path);
 	void saveAll(const char* path, const dtNavMesh* mesh);
+	dtNavMesh* loadAllFromMemory(const unsigned char* data, size_t size);
+	bool saveAllToMemory(const dtNavMesh* mesh, std::vector<unsigned char>& data);
 
 public:
 	Sample();
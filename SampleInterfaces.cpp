@@ -18,7 +18,8 @@
 
 BuildContext::BuildContext() :
 	m_messageCount(0),
-	m_textPoolSize(0)
+	m_textPoolSize(0),
+	m_logVersion(0)
 {
 	memset(m_messages, 0, sizeof(char*) * MAX_MESSAGES);
 
@@ -52,6 +53,7 @@ void BuildContext::doLog(const rcLogCategory category, const char* msg, const in
 	text[count - 1] = '\0';
 	m_textPoolSize += 1 + count;
 	m_messages[m_messageCount++] = dst;
+	m_logVersion++;
 }
 
 void BuildContext::doResetTimers()
@@ -135,6 +137,11 @@ const char* BuildContext::getLogText(const int i) const
 	return m_messages[i] + 1;
 }
 
+unsigned long long BuildContext::getLogVersion() const
+{
+	return m_logVersion;
+}
+
 ////////////////////////////////////////////////////////////////////////////////////////////////////
 
 /*class GLCheckerTexture
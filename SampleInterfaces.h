@@ -42,6 +42,7 @@ class BuildContext : public rcContext
 	static const int TEXT_POOL_SIZE = 8000;
 	char m_textPool[TEXT_POOL_SIZE];
 	int m_textPoolSize;
+	unsigned long long m_logVersion;
 
 public:
 	BuildContext();
@@ -52,6 +53,8 @@ public:
 	int getLogCount() const;
 	/// Returns log message text.
 	const char* getLogText(const int i) const;
+	/// Returns the number of messages stored since the creation (it is not reset with the log).
+	unsigned long long getLogVersion() const;
 
 protected:
 	/// Virtual functions for custom implementations.
@@ -40,6 +40,51 @@
 #	define snprintf _snprintf
 #endif
 
+static bool buildWatershedRegions(rcContext* ctx, rcCompactHeightfield& chf, const rcConfig& cfg)
+{
+	// Prepare for region partitioning, by calculating distance field along the walkable surface.
+	if (!rcBuildDistanceField(ctx, chf))
+	{
+		ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build distance field.");
+		return false;
+	}
+
+	// Partition the walkable surface into simple regions without holes.
+	if (!rcBuildRegions(ctx, chf, 0, cfg.minRegionArea, cfg.mergeRegionArea))
+	{
+		ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build watershed regions.");
+		return false;
+	}
+	return true;
+}
+
+static bool buildMonotoneRegions(rcContext* ctx, rcCompactHeightfield& chf, const rcConfig& cfg)
+{
+	// Partition the walkable surface into simple regions without holes.
+	// Monotone partitioning does not need distancefield.
+	if (!rcBuildRegionsMonotone(ctx, chf, 0, cfg.minRegionArea, cfg.mergeRegionArea))
+	{
+		ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build monotone regions.");
+		return false;
+	}
+	return true;
+}
+
+static bool buildLayerRegions(rcContext* ctx, rcCompactHeightfield& chf, const rcConfig& cfg)
+{
+	// Partition the walkable surface into simple regions without holes.
+	if (!rcBuildLayerRegions(ctx, chf, 0, cfg.minRegionArea))
+	{
+		ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build layer regions.");
+		return false;
+	}
+	return true;
+}
+
+// region partitioning functions indexed by SamplePartitionType
+typedef bool (*PartitionFunc)(rcContext* ctx, rcCompactHeightfield& chf, const rcConfig& cfg);
+static const PartitionFunc PARTITION_DISPATCH[] = { buildWatershedRegions, buildMonotoneRegions, buildLayerRegions };
+
 
 Sample_SoloMesh::Sample_SoloMesh() :
 	m_keepInterResults(true),
@@ -341,40 +386,14 @@ bool Sample_SoloMesh::handleBuild()
 	//     if you have large open areas with small obstacles (not a problem if you use tiles)
 	//   * good choice to use for tiled navmesh with medium and small sized tiles
 
-	if (m_partitionType == SAMPLE_PARTITION_WATERSHED)
+	if (m_partitionType < 0 || m_partitionType >= (int)(sizeof(PARTITION_DISPATCH) / sizeof(PARTITION_DISPATCH[0])))
 	{
-		// Prepare for region partitioning, by calculating distance field along the walkable surface.
-		if (!rcBuildDistanceField(m_ctx, *m_chf))
-		{
-			m_ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build distance field.");
-			return false;
-		}
-
-		// Partition the walkable surface into simple regions without holes.
-		if (!rcBuildRegions(m_ctx, *m_chf, 0, m_cfg.minRegionArea, m_cfg.mergeRegionArea))
-		{
-			m_ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build watershed regions.");
-			return false;
-		}
-	}
-	else if (m_partitionType == SAMPLE_PARTITION_MONOTONE)
-	{
-		// Partition the walkable surface into simple regions without holes.
-		// Monotone partitioning does not need distancefield.
-		if (!rcBuildRegionsMonotone(m_ctx, *m_chf, 0, m_cfg.minRegionArea, m_cfg.mergeRegionArea))
-		{
-			m_ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build monotone regions.");
-			return false;
-		}
+		m_ctx->log(RC_LOG_ERROR, "buildNavigation: Invalid partition type %d.", m_partitionType);
+		return false;
 	}
-	else // SAMPLE_PARTITION_LAYERS
+	if (!PARTITION_DISPATCH[m_partitionType](m_ctx, *m_chf, m_cfg))
 	{
-		// Partition the walkable surface into simple regions without holes.
-		if (!rcBuildLayerRegions(m_ctx, *m_chf, 0, m_cfg.minRegionArea))
-		{
-			m_ctx->log(RC_LOG_ERROR, "buildNavigation: Could not build layer regions.");
-			return false;
-		}
+		return false;
 	}
 
 	//
@@ -558,9 +577,40 @@ void Sample_SoloMesh::save_to_file(const char* path)
 	saveAll(path, m_navMesh);
 }
 
-void Sample_SoloMesh::load_from_file(const char* path)
+bool Sample_SoloMesh::load_from_file(const char* path)
 {
 	dtFreeNavMesh(m_navMesh);
 	m_navMesh = Sample::loadAll(path);
-	m_navQuery->init(m_navMesh, 2048);
+	return init_loaded_navmesh();
+}
+
+bool Sample_SoloMesh::save_to_memory(std::vector<unsigned char>& data)
+{
+	return saveAllToMemory(m_navMesh, data);
+}
+
+bool Sample_SoloMesh::load_from_memory(const unsigned char* data, size_t size)
+{
+	dtFreeNavMesh(m_navMesh);
+	m_navMesh = Sample::loadAllFromMemory(data, size);
+	return init_loaded_navmesh();
+}
+
+bool Sample_SoloMesh::init_loaded_navmesh()
+{
+	if (!m_navMesh)
+	{
+		return false;
+	}
+	if (dtStatusFailed(m_navQuery->init(m_navMesh, 2048)))
+	{
+		return false;
+	}
+
+	// the tool keeps the pointer to the navmesh, so it should be updated after loading
+	if (m_tool)
+		m_tool->init(this);
+	initToolStates(this);
+
+	return true;
 }
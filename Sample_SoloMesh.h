@@ -77,11 +77,15 @@ public:
 	virtual bool handleBuild();
 
 	void save_to_file(const char* path);
-	void load_from_file(const char* path);
+	bool load_from_file(const char* path);
+	bool save_to_memory(std::vector<unsigned char>& data);
+	bool load_from_memory(const unsigned char* data, size_t size);
 
 	rcPolyMesh* get_m_pmesh() { return m_pmesh; };
 
 private:
+	bool init_loaded_navmesh();  // init the query and the tools for the navmesh read by load_from_file / load_from_memory
+
 	// Explicitly disabled copy constructor and copy assignment operator.
 	Sample_SoloMesh(const Sample_SoloMesh&);
 	Sample_SoloMesh& operator=(const Sample_SoloMesh&);
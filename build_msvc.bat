@@ -36,6 +36,10 @@ echo PyBind11 Include: %PYBIND11_INCLUDE%
 echo Python Libs: %PYTHON_LIBS%
 echo Extension Suffix: %EXT_SUFFIX%
 
+REM Set PYRECAST_OPENMP=1 to run independent per-agent crowd update passes in parallel
+set OPENMP_FLAG=
+if "%PYRECAST_OPENMP%"=="1" set OPENMP_FLAG=/openmp
+
 REM Set module name based on Python version
 set MODULE_NAME=Py37RecastDetour
 
@@ -49,7 +53,7 @@ echo Compiling source files with MSVC...
 echo ================================================
 
 REM Compile all source files (project + Recast/Detour sources)
-cl /c /O2 /EHsc /MD /std:c++14 ^
+cl /c /O2 /EHsc /MD /std:c++14 %OPENMP_FLAG% ^
     /D_Python37 /DNDEBUG ^
     /I"%PYTHON_INCLUDE%" ^
     /I"%PYBIND11_INCLUDE%" ^
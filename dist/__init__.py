@@ -34,24 +34,62 @@ Example usage:
     # Get agent state
     pos = navmesh.get_agent_position(agent_id)
     vel = navmesh.get_agent_velocity(agent_id)
+
+Flag and state constants:
+    All POLYAREA_*, POLYFLAGS_*, CROWD_*, CROWDAGENT_*, FORMATION_* and PARTITION_*
+    values are also collected in the read-only namespace F (F.POLYFLAGS_DISABLED, ...).
+    In per-agent or per-polygon loops bind the constants as default arguments, so
+    they are read as local variables instead of global lookups:
+
+        def is_blocked(flags, _DIS=POLYFLAGS_DISABLED):
+            return (flags & _DIS) != 0
 """
 
+import sys
 import os
-from typing import List, Tuple, Dict, Optional, Any
+import importlib
+import functools
+from collections import namedtuple
+from enum import IntFlag
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Mapping, Optional, Any, Callable
 
-# Import the appropriate compiled module based on Python version
-import Py37RecastDetour as rd
+import numpy as np
+
+# Import the compiled module built for the current Python version
+# (the same Py310RecastDetour name is used for Python 3.10 and newer)
+_MOD_NAME: str = f"Py{sys.version_info.major}{min(sys.version_info.minor, 10)}RecastDetour"
+rd = importlib.import_module("." + _MOD_NAME, __package__)
 
 # ============================================================================
 # CONSTANTS
 # ============================================================================
 
 # Crowd update flags
-CROWD_ANTICIPATE_TURNS = 1
-CROWD_OBSTACLE_AVOIDANCE = 2
-CROWD_SEPARATION = 4
-CROWD_OPTIMIZE_VIS = 8
-CROWD_OPTIMIZE_TOPO = 16
+class CrowdUpdateFlags(IntFlag):
+    """Flags of the agent parameter "updateFlags" """
+    ANTICIPATE_TURNS = 1
+    OBSTACLE_AVOIDANCE = 2
+    SEPARATION = 4
+    OPTIMIZE_VIS = 8
+    OPTIMIZE_TOPO = 16
+
+
+# Plain int aliases of the crowd update flags
+CROWD_ANTICIPATE_TURNS = int(CrowdUpdateFlags.ANTICIPATE_TURNS)
+CROWD_OBSTACLE_AVOIDANCE = int(CrowdUpdateFlags.OBSTACLE_AVOIDANCE)
+CROWD_SEPARATION = int(CrowdUpdateFlags.SEPARATION)
+CROWD_OPTIMIZE_VIS = int(CrowdUpdateFlags.OPTIMIZE_VIS)
+CROWD_OPTIMIZE_TOPO = int(CrowdUpdateFlags.OPTIMIZE_TOPO)
+
+# Update flags of the default agent and vehicle parameters, combined once at import time
+_DEFAULT_UPDATE_FLAGS = CROWD_ANTICIPATE_TURNS | CROWD_OPTIMIZE_VIS | CROWD_OPTIMIZE_TOPO | CROWD_OBSTACLE_AVOIDANCE
+_VEHICLE_UPDATE_FLAGS = CROWD_ANTICIPATE_TURNS | CROWD_OBSTACLE_AVOIDANCE
+
+# Decoded (anticipate, avoid, separation, vis, topo) tuple for every combination of the crowd update flags
+_CROWD_FLAG_TABLE: Tuple[Tuple[bool, bool, bool, bool, bool], ...] = tuple(
+    ((f & 1) != 0, (f & 2) != 0, (f & 4) != 0, (f & 8) != 0, (f & 16) != 0) for f in range(32)
+)
 
 # Crowd agent states
 CROWDAGENT_STATE_INVALID = 0
@@ -67,6 +105,11 @@ CROWDAGENT_TARGET_WAITING_FOR_QUEUE = 4
 CROWDAGENT_TARGET_WAITING_FOR_PATH = 5
 CROWDAGENT_TARGET_VELOCITY = 6
 
+# Agent and target states are dense small integers, they are stored as uint8 in the crowd state arrays
+AGENT_STATE_DTYPE = np.uint8
+TARGET_STATE_DTYPE = np.uint8
+assert CROWDAGENT_TARGET_VELOCITY < 256
+
 # Partition types
 PARTITION_WATERSHED = 0
 PARTITION_MONOTONE = 1
@@ -81,6 +124,10 @@ POLYAREA_GRASS = 4       # Grass (slower movement)
 POLYAREA_JUMP = 5        # Jump connections
 POLYAREA_CLIMB = 6       # Climbable surfaces
 POLYAREA_DANGER = 7      # Dangerous areas (high cost)
+NUM_POLYAREAS = 8
+
+# Traversal cost of each area type, indexed by POLYAREA_* (change with set_area_cost)
+POLYAREA_COST_LUT = np.array([1.0, 10.0, 0.5, 1.0, 1.5, 1.0, 2.0, 20.0], dtype=np.float32)
 
 # Poly Flags - capabilities of each polygon
 POLYFLAGS_WALK = 0x01       # Ability to walk (ground travel)
@@ -91,6 +138,16 @@ POLYFLAGS_CLIMB = 0x10      # Ability to climb
 POLYFLAGS_DISABLED = 0x20   # Disabled polygon
 POLYFLAGS_ALL = 0xFFFF      # All abilities
 
+# Default "any ability and not disabled" filter, precomputed for the hot polygon tests
+POLYFLAGS_DEFAULT_INCLUDE = POLYFLAGS_WALK | POLYFLAGS_SWIM | POLYFLAGS_DOOR | POLYFLAGS_JUMP | POLYFLAGS_CLIMB  # 0x1F
+POLYFLAGS_DEFAULT_EXCLUDE = POLYFLAGS_DISABLED  # 0x20
+
+# Poly flags for vectorized filtering of polygon flag arrays (see polyflags_match)
+POLYFLAGS_DTYPE = np.uint16
+POLYFLAG_MASKS = np.array([POLYFLAGS_WALK, POLYFLAGS_SWIM, POLYFLAGS_DOOR,
+                           POLYFLAGS_JUMP, POLYFLAGS_CLIMB, POLYFLAGS_DISABLED], dtype=POLYFLAGS_DTYPE)
+POLYFLAG_MASKS.setflags(write=False)
+
 # Formation types
 FORMATION_LINE = 0          # Horizontal line formation
 FORMATION_COLUMN = 1        # Vertical column formation
@@ -98,6 +155,90 @@ FORMATION_WEDGE = 2         # V-shaped wedge formation
 FORMATION_BOX = 3           # Rectangular box/grid formation
 FORMATION_CIRCLE = 4        # Circular formation
 
+# Read-only namespace with all flag and state constants
+_FLAG_PREFIXES = ("POLYAREA_", "POLYFLAGS_", "CROWD_", "CROWDAGENT_", "FORMATION_", "PARTITION_")
+_FLAG_NAMES = tuple(name for name, value in globals().items()
+                    if name.startswith(_FLAG_PREFIXES) and type(value) is int)
+
+
+class _Flags:
+    """Frozen namespace, attributes are the module constants with the same names"""
+    __slots__ = _FLAG_NAMES
+
+    def __init__(self, values: Dict[str, int]) -> None:
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Flag constants are read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Flag constants are read-only")
+
+
+F = _Flags(globals())
+
+# Layout of one agent state row (get_agent_state_into, get_all_states)
+AGENT_STATE_FIELDS = (
+    "posX", "posY", "posZ",
+    "velX", "velY", "velZ",
+    "dvelX", "dvelY", "dvelZ",
+    "targetPosX", "targetPosY", "targetPosZ",
+    "desiredSpeed", "state", "targetState", "active"
+)
+
+# Immutable agent state with named fields in the AGENT_STATE_FIELDS order (get_agent_state_tuple)
+AgentState = namedtuple("AgentState", AGENT_STATE_FIELDS)
+
+# Immutable agent parameters (get_agent_parameters_tuple), the same keys as in get_agent_parameters
+AgentParameters = namedtuple("AgentParameters", (
+    "radius", "height", "maxAcceleration", "maxSpeed", "collisionQueryRange",
+    "pathOptimizationRange", "separationWeight", "updateFlags", "obstacleAvoidanceType", "queryFilterType"
+))
+
+# Immutable formation info (get_formation_info_tuple), the same keys as in get_formation_info
+FormationInfo = namedtuple("FormationInfo", (
+    "id", "type", "spacing", "leader_idx", "agent_count", "has_target",
+    "target_x", "target_y", "target_z", "dir_x", "dir_y", "dir_z"
+))
+
+# Error messages (built once at import time)
+_ERR_OBJ_EXTENSION = "Fail init geometry. Only *.obj files are supported"
+_ERR_OBJ_NOT_FOUND = "Fail init geometry. File does not exist: "
+_ERR_OBJ_INVALID = "Fail init geometry. File does not contain a valid mesh: "
+_ERR_RAW_VERTICES = "Fail init geometry from raw data. The number of vertices coordinates should be 3*k"
+_ERR_BATCH_COORDINATES = "Fail to find straight path for several points. The number of input coordinates should be divisible by 6"
+_ERR_NAVMESH_NOT_FOUND = "Fail to load navmesh. File does not exist: "
+_ERR_NAVMESH_INVALID = "Fail to load navmesh. File does not contain a valid navmesh: "
+_ERR_NAVMESH_BYTES_INVALID = "Fail to load navmesh. Data does not contain a valid navmesh"
+_ERR_AGENT_POSITIONS = "Fail to add agents. The number of position coordinates should be divisible by 3"
+_ERR_AGENT_TARGETS = "Fail to add agents. Targets should be a single point or have the same shape as positions"
+_ERR_AREA_TYPE = "Invalid area type: "
+_ERR_FORMATION_TYPE = "Invalid formation type: "
+_ERR_CROWD_NOT_INIT = "Crowd is not initialized. Call init_crowd first"
+_ERR_AGENT_STATE = "Fail to get agent state. Invalid agent index or agent is not active"
+_ERR_AGENT_POSITION = "Fail to get agent position. Crowd is not initialized, invalid agent index or agent is not active"
+_ERR_AGENT_VELOCITY = "Fail to get agent velocity. Crowd is not initialized, invalid agent index or agent is not active"
+_ERR_AGENT_PARAMETERS = "Fail to get agent parameters. Crowd is not initialized, invalid agent index or agent is not active"
+_ERR_FORMATION_NOT_FOUND = "Formation does not exist: "
+_ERR_GEOMETRY_NOT_INIT = "Geometry is not initialized. Call init_by_obj, init_by_raw or load_navmesh first"
+_ERR_NAVMESH_NOT_BUILD = "Navmesh is not built. Call build_navmesh or load_navmesh first"
+_ERR_BATCH_POINTS = "Fail to add items. The number of point coordinates should be divisible by 3"
+_ERR_FILTER_COSTS = "Fail to get query filter area costs. Crowd is not initialized or the filter index is invalid"
+
+
+def _batch_values(values: Any, dtype: Any, count: int) -> np.ndarray:
+    """Return contiguous array with count values, a single value is used for all items."""
+    return np.ascontiguousarray(np.broadcast_to(np.asarray(values, dtype=dtype), (count,)))
+
+
+def _raw_values(values: Any, dtype: Any) -> np.ndarray:
+    """Return flat contiguous array, bytes-like input is read as raw values of dtype without copy."""
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        return np.frombuffer(values, dtype=dtype)
+    return np.ascontiguousarray(values, dtype=dtype).reshape(-1)
+
+
 # ============================================================================
 # NAVMESH WRAPPER CLASS
 # ============================================================================
@@ -112,9 +253,76 @@ class Navmesh:
     - Pythonic API with type hints
     """
 
+    # fixed instance layout: no per-instance __dict__ and faster attribute access
+    # (a subclass can add "__dict__" to its own __slots__ if it needs dynamic attributes)
+    __slots__ = (
+        "_navmesh",
+        "_settings",
+        "_partition_type",
+        "_bounding_box",
+        "_max_agents",
+        "_query_half_extents",
+        "_log_version",
+        "_agent_states",
+        "_state_buf",
+        "_update_crowd",
+        "_tick",
+        "_set_agent_target",
+        "_set_agent_velocity",
+        "_get_agent_position",
+        "_get_agent_velocity",
+        "_get_agent_state",
+        "_is_agent_active",
+        "_get_agent_corners",
+    )
+
     def __init__(self) -> None:
         """Initialize a new Navmesh instance."""
         self._navmesh = rd.Navmesh()
+        # values of the pure readers, cached on the first call and reset by the methods which can change them
+        self._settings: Optional[Dict[str, Any]] = None
+        self._partition_type: Optional[int] = None
+        self._bounding_box: Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]] = None
+        self._max_agents: Optional[int] = None
+        self._query_half_extents: Optional[Tuple[float, float, float]] = None
+        self._log_version: Optional[int] = None  # log version at the last get_log, the log is empty after it
+        self._agent_states: Optional[Dict[str, np.ndarray]] = None  # preallocated by init_crowd
+        self._state_buf: Optional[np.ndarray] = None  # (maxAgents, len(AGENT_STATE_FIELDS)), preallocated by init_crowd
+
+        # bound methods of the crowd functions, which are called every frame (one attribute lookup instead of two)
+        self._update_crowd = self._navmesh.update_crowd
+        self._tick = self._navmesh.tick
+        self._set_agent_target = self._navmesh.set_agent_target
+        self._set_agent_velocity = self._navmesh.set_agent_velocity
+        self._get_agent_position = self._navmesh.get_agent_position
+        self._get_agent_velocity = self._navmesh.get_agent_velocity
+        self._get_agent_state = self._navmesh.get_agent_state
+        self._is_agent_active = self._navmesh.is_agent_active
+        self._get_agent_corners = self._navmesh.get_agent_corners
+
+    @property
+    def native(self) -> Any:
+        """
+        The compiled C++ navmesh object behind this wrapper.
+
+        Its crowd and query methods have the same names and arguments as the wrapper methods, but are called
+        without the extra Python frame and without the wrapper input checks. Use it in hot
+        per-agent loops, where the arguments are already known to be valid.
+
+        Example:
+            set_target = navmesh.native.set_agent_target
+            for idx, target in zip(agent_ids, targets):
+                set_target(idx, target)
+        """
+        return self._navmesh
+
+    def _reset_caches(self) -> None:
+        """Forget all cached reader values, called when the geometry or the crowd is replaced."""
+        self._settings = None
+        self._partition_type = None
+        self._bounding_box = None
+        self._max_agents = None
+        self._query_half_extents = None
 
     # ========================================================================
     # INITIALIZATION & BUILDING
@@ -125,33 +333,47 @@ class Navmesh:
 
         Input:
             file_path - path to the file with extension *.obj
+
+        Raises:
+            FileNotFoundError if the file does not exist
+            ValueError if the file is not *.obj or does not contain a valid mesh
         '''
-        if os.path.exists(file_path):
-            extension: str = os.path.splitext(file_path)[1]
-            if extension == ".obj":
-                self._navmesh.init_by_obj(file_path)
-            else:
-                print("Fail init geometry. Only *.obj files are supported")
-        else:
-            print("Fail init geometry. File " + file_path + " does not exist")
-
-    def init_by_raw(self, vertices: List[float], faces: List[int]) -> None:
+        if not file_path.endswith(".obj"):
+            raise ValueError(_ERR_OBJ_EXTENSION)
+        self._reset_caches()
+        # the file is opened only once in C++, the existence is checked only to explain the failure
+        if not self._navmesh.init_by_obj(file_path):
+            if not os.path.isfile(file_path):
+                raise FileNotFoundError(_ERR_OBJ_NOT_FOUND + file_path)
+            raise ValueError(_ERR_OBJ_INVALID + file_path)
+
+    def init_by_raw(self, vertices: Any, faces: Any) -> None:
         '''Initialize geometry by raw data. This data contains vertex positions and vertex indexes of polygons.
 
+        The data is passed to C++ as one buffer, so numpy arrays (float32 and int32 are used without copy),
+        array.array('f') / array.array('i') and bytes are much faster for large meshes than Python lists.
+
         Input:
             vertices - list of floats of the length 3x(the number of vertices) in the form [x1, y1, z1, x2, y2, z2, ...], where
                 xi, yi, zi - coordinates of the i-th vertex
+                It can be also any buffer with float32 values (numpy array, array.array('f'), bytes)
             faces - list of integers in the form [n1, i1, i2, ..., in1, n2, i1, i2, ..., in2, ...],
                 where n1, n2, ... - the number of edges in each polygon, i1, i2, ... - indexes of polygon corners
                 orientation of polygons should be in clock-wise direction
+                It can be also any buffer with int32 values
 
         Example: the simple plane has the following data
             [1.0, 0.0, 1.0, -1.0, 0.0, 1.0, -1.0, 0.0, -1.0, 1.0, 0.0, -1.0], [4, 0, 3, 2, 1]
+
+        Raises:
+            ValueError if the number of vertex coordinates is not divisible by 3
         '''
-        if len(vertices) % 3 == 0:
-            self._navmesh.init_by_raw(vertices, faces)
-        else:
-            print("Fail init geometry from raw data. The number of vertices coordinates should be 3*k")
+        vertices_array: np.ndarray = _raw_values(vertices, np.float32)
+        if vertices_array.size % 3 != 0:
+            raise ValueError(_ERR_RAW_VERTICES)
+        faces_array: np.ndarray = _raw_values(faces, np.int32)
+        self._reset_caches()
+        self._navmesh.init_by_raw(vertices_array, faces_array)
 
     def build_navmesh(self) -> None:
         '''Generate navmesh data. Before this method the geometry should be inited.
@@ -161,9 +383,16 @@ class Navmesh:
     def get_log(self) -> str:
         '''Return the string with inetrnal log messages.
 
+        The log is cleared after each call. If nothing was logged since the previous call,
+        the empty string is returned without copying the log from C++, so it can be polled every frame.
+
         Output:
             string with log messages
         '''
+        version: int = self._navmesh.get_log_version()
+        if version == self._log_version:
+            return ""
+        self._log_version = version
         return self._navmesh.get_log()
 
     # ========================================================================
@@ -188,8 +417,12 @@ class Navmesh:
                 vertsPerPoly - the maximum number of vertices in each polygon
                 detailSampleDist - detail sample distance in voxels
                 detailSampleMaxError - detail sample max error in voxel heights
+            the settings are read from the navmesh once and cached until the next set_settings or geometry initialization,
+            each call returns a new dictionary, so it can be modified and passed to set_settings
         '''
-        return self._navmesh.get_settings()
+        if self._settings is None:
+            self._settings = self._navmesh.get_settings()
+        return dict(self._settings)
 
     def set_settings(self, settings: Dict[str, Any]) -> None:
         '''Set settings for building navmesh
@@ -210,6 +443,7 @@ class Navmesh:
                 detailSampleDist - detail sample distance in voxels
                 detailSampleMaxError - detail sample max error in voxel heights
         '''
+        self._settings = None
         self._navmesh.set_settings(settings)
 
     def get_partition_type(self) -> int:
@@ -221,7 +455,9 @@ class Navmesh:
                 1 - SAMPLE_PARTITION_MONOTONE
                 2 - SAMPLE_PARTITION_LAYERS
         '''
-        return self._navmesh.get_partition_type()
+        if self._partition_type is None:
+            self._partition_type = self._navmesh.get_partition_type()
+        return self._partition_type
 
     def set_partition_type(self, type: int) -> None:
         '''Set partition type for generation navmesh
@@ -231,28 +467,35 @@ class Navmesh:
                 0 - SAMPLE_PARTITION_WATERSHED
                 1 - SAMPLE_PARTITION_MONOTONE
                 2 - SAMPLE_PARTITION_LAYERS
+                for other values build_navmesh fails with error in the log
         '''
+        self._partition_type = None
         self._navmesh.set_partition_type(type)
 
-    def get_bounding_box(self) -> Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]]:
+    def get_bounding_box(self) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
         '''Return bounding box of the mesh
 
         Output:
             tuple in the form (b_min, b_max), where
                 b_min is a triple (x, y, z) with the lowerest corner of the bounding box
                 b_max is a triple (x, y, z) with the highest corner of the bounding box
+
+        Raises:
+            ValueError if the geometry is not initialized
         '''
-        b = self._navmesh.get_bounding_box()
-        if len(b) == 6:
-            return ((b[0], b[1], b[2]), (b[3], b[4], b[5]))
-        else:
-            return None
+        if self._bounding_box is None:
+            b = self._navmesh.get_bounding_box()
+            if len(b) != 6:
+                raise ValueError(_ERR_GEOMETRY_NOT_INIT)
+            # two slices of the returned list instead of six indexed reads
+            self._bounding_box = (tuple(b[:3]), tuple(b[3:]))
+        return self._bounding_box
 
     # ========================================================================
     # PATHFINDING
     # ========================================================================
 
-    def pathfind_straight(self, start: Tuple[float, float, float], end: Tuple[float, float, float], vertex_mode: int = 0) -> Optional[List[Tuple[float, float, float]]]:
+    def pathfind_straight(self, start: Tuple[float, float, float], end: Tuple[float, float, float], vertex_mode: int = 0) -> np.ndarray:
         '''Return the shortest path between start and end point inside generated navmesh.
 
         Input:
@@ -264,51 +507,101 @@ class Navmesh:
                 if vertex_mode = 2 then vertex at every polygon edge crossing is added
 
         Output:
-            list in the from [(x1, y1, z1), ... (xn, yn, zn)] with sequences of path points
+            float32 array with shape (n, 3), each row [x, y, z] is a path point (the array is empty if there is no path).
+                Call path.tolist() to get the list of points as Python floats
         '''
-        if len(start) == 3 and len(end) == 3:
-            coordinates: List[float] = self._navmesh.pathfind_straight(start, end, vertex_mode)
-            points_count = len(coordinates) // 3
-            return [(coordinates[3*i], coordinates[3*i + 1], coordinates[3*i + 2]) for i in range(points_count)]
-        else:
-            print("Fail to find straight path. Points should be triples")
-            return None
-
-    def pathfind_straight_batch(self, coordinates: List[float], vertex_mode: int = 0) -> Optional[List[List[Tuple[float, float, float]]]]:
+        return self._navmesh.pathfind_straight(start, end, vertex_mode)
+
+    def pathfind_straight_batch(self, coordinates: Any, vertex_mode: int = 0) -> List[np.ndarray]:
         '''Find path between multiple input points.
 
+        Coordinates are packed into one contiguous float32 buffer (without copy, if it is already such numpy array),
+        which is passed to C++ through the buffer protocol instead of conversion of each float value.
+
         Input:
             coordinates - list of floats in the form [s1_x, s1_y, s1_z, e1_x, e1_y, e1_z, s2_x, s2_y, s2_z, e2_x, e2_y, e2_z, ...], where
                 si_* are coordinates of the i-th start point, ei_* are coordinates of the i-th end point.
-                The number of float values in the list should be x6.
+                It can be also numpy array with shape (n, 6) (or any other shape with 6*n values).
+                The number of float values should be x6.
             vertex_mode - define how the result path is formed
                 if vertex_mode = 0 then points adden only in path corners,
                 if vertex_mode = 1 then a vertex at every polygon edge crossing where area changes is added
                 if vertex_mode = 2 then vertex at every polygon edge crossing is added
 
         Output:
-            One list in the form [[(p1_x1, p1_y1, p1_z1), ...], [(p2_x1, p2_y1, p2_z1), ...]], where each item in the list is a list
-                with 3-tuples of path coordinates. The number of ites is the same as the number of input pairs (len(coordinates) // 6)
+            list of float32 arrays with shape (k_i, 3), where k_i is the number of points in the i-th path.
+                The number of items is the same as the number of input pairs (len(coordinates) // 6).
+                Each array is a view into one shared buffer with all points of all paths
+
+        Raises:
+            ValueError if the number of coordinates is not divisible by 6 or the navmesh is not built
         '''
-        batch_size: int = len(coordinates) // 6
-        if len(coordinates) % 6 == 0:
-            output: List[float] = self._navmesh.pathfind_straight_batch(coordinates, vertex_mode)
-            result_array: List[List[Tuple[float, float, float]]] = []
-            index: int = 0
-            for step in range(batch_size):
-                step_size = int(output[index])  # the number of points in the path
-                step_array: List[Tuple[float, float, float]] = []
-                index += 1
-                for p_index in range(step_size):
-                    step_array.append((output[index], output[index + 1], output[index + 2]))
-                    index += 3
-                result_array.append(step_array)
-            return result_array
-        else:
-            print("Fail to find straight path for several points. The number of input coorsinates should be divisible by 6")
-            return None
-
-    def distance_to_wall(self, point: Tuple[float, float, float]) -> Optional[float]:
+        offsets, points = self.pathfind_straight_batch_packed(coordinates, vertex_mode)
+        # slicing with Python ints is several times faster than np.split for many short paths
+        bounds: List[int] = offsets.tolist()
+        return [points[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def pathfind_straight_batch_packed(self, coordinates: Any, vertex_mode: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        '''Find path between multiple input points and return all paths in two flat arrays.
+
+        The same as pathfind_straight_batch, but the result is not splitted into separate arrays,
+        so no Python object is created per path.
+
+        Input:
+            coordinates - the same as in pathfind_straight_batch
+            vertex_mode - the same as in pathfind_straight_batch
+
+        Output:
+            the tuple (offsets, points), where
+                offsets is an int32 array with n + 1 values, n is the number of input pairs
+                points is a float32 array with shape (m, 3) with points of all paths,
+                the i-th path is points[offsets[i]:offsets[i + 1]]
+
+        Raises:
+            ValueError if the number of coordinates is not divisible by 6 or the navmesh is not built
+        '''
+        points_array: np.ndarray = np.ascontiguousarray(coordinates, dtype=np.float32)
+        if points_array.size % 6 != 0:
+            raise ValueError(_ERR_BATCH_COORDINATES)
+        result = self._navmesh.pathfind_straight_batch_buf(points_array, vertex_mode)
+        if result is None:
+            raise ValueError(_ERR_NAVMESH_NOT_BUILD)
+        offsets, points = result
+        return (offsets, points)
+
+    # the same method, the name is kept for the code written for numpy input
+    pathfind_straight_batch_np = pathfind_straight_batch
+
+    def pathfind_straight_batch_shared(self, coordinates: Any, vertex_mode: int = 0) -> List[np.ndarray]:
+        '''Find path between multiple input points, sharing the work between repeated points and pairs.
+
+        Nearest polygon lookups are done once per unique point, and identical pairs (the same start and end points)
+        are searched once. Every other pair gets its own corridor search, so the paths are exactly the same
+        as the ones of pathfind_straight_batch.
+        It is faster than pathfind_straight_batch when many pairs start and end in the same places
+        (for example, many agents sent from one spawn point to one target), otherwise there is no gain.
+
+        Input:
+            coordinates - the same as in pathfind_straight_batch
+            vertex_mode - the same as in pathfind_straight_batch
+
+        Output:
+            list of float32 arrays with shape (k_i, 3) in the order of input pairs, the same as in pathfind_straight_batch
+
+        Raises:
+            ValueError if the number of coordinates is not divisible by 6 or the navmesh is not built
+        '''
+        points_array: np.ndarray = np.ascontiguousarray(coordinates, dtype=np.float32)
+        if points_array.size % 6 != 0:
+            raise ValueError(_ERR_BATCH_COORDINATES)
+        result = self._navmesh.pathfind_straight_batch_shared_buf(points_array, vertex_mode)
+        if result is None:
+            raise ValueError(_ERR_NAVMESH_NOT_BUILD)
+        offsets, points = result
+        bounds: List[int] = offsets.tolist()
+        return [points[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def distance_to_wall(self, point: Tuple[float, float, float]) -> float:
         '''Return the minimal distance between input point and navmesh edge
 
         Input:
@@ -317,13 +610,25 @@ class Navmesh:
         Output:
             minimal distance as float number
         '''
-        if len(point) == 3:
-            return self._navmesh.distance_to_wall(point)
-        else:
-            print("Fail calculate distance to wall. The point should be triple")
-            return None
+        return self._navmesh.distance_to_wall(point)
+
+    def distance_to_wall_batch(self, points: Any) -> np.ndarray:
+        '''Return the minimal distances between input points and navmesh edges in one call
+
+        The same as distance_to_wall for each point, but the points are passed to the library at once.
+
+        Input:
+            points - float32 array (or any sequence) with shape (n, 3)
+
+        Output:
+            float32 array with shape (n,), 0.0 for the points outside of the navmesh
+        '''
+        distances = self._navmesh.distance_to_wall_batch(points)
+        if distances is None:
+            raise ValueError(_ERR_NAVMESH_NOT_BUILD)
+        return distances
 
-    def raycast(self, start: Tuple[float, float, float], end: Tuple[float, float, float]) -> Optional[List[Tuple[float, float, float]]]:
+    def raycast(self, start: Tuple[float, float, float], end: Tuple[float, float, float]) -> Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]]:
         '''Return the segment of the line between start point and navmesh edge (or end point, if there are no collisions with navmesh edges)
 
         Input:
@@ -331,17 +636,27 @@ class Navmesh:
             end - triple of floats in the form [x, y, z]
 
         Output:
-            the pair [(x1, y1, z1), (x2, y2, z2)], where (x1, y1, z1) - coordinates of the start point, (x2, y2, z2) - coordinates of the finish point
+            the pair ((x1, y1, z1), (x2, y2, z2)), where (x1, y1, z1) - coordinates of the start point, (x2, y2, z2) - coordinates of the finish point
+                or None if calculations are fail
         '''
-        if len(start) == 3 and len(end) == 3:
-            c = self._navmesh.raycast(start, end)
-            if len(c) > 0:
-                return [(c[0], c[1], c[2]), (c[3], c[4], c[5])]
-            else:
-                return None  # if calculations are fail
-        else:
-            print("Fails to raycast. Start and end should be triples")
-            return None
+        return self._navmesh.raycast(start, end)
+
+    def raycast_batch(self, starts: Any, ends: Any) -> np.ndarray:
+        '''Return the hit points of the rays from starts to ends in one call
+
+        The same as raycast for each pair, but only the finish points are returned.
+
+        Input:
+            starts - float32 array (or any sequence) with shape (n, 3)
+            ends - float32 array (or any sequence) with shape (n, 3)
+
+        Output:
+            float32 array with shape (n, 3), rows are NaN for the starts outside of the navmesh
+        '''
+        hits = self._navmesh.raycast_batch(starts, ends)
+        if hits is None:
+            raise ValueError(_ERR_NAVMESH_NOT_BUILD)
+        return hits
 
     def hit_mesh(self, start: Tuple[float, float, float], end: Tuple[float, float, float]) -> Optional[Tuple[float, float, float]]:
         '''Return coordinates of the intersection point of the ray from start to end and geometry polygons
@@ -353,16 +668,9 @@ class Navmesh:
         Output:
             the tuple (x, y, z) with coordinates of the intersection point
                 if there are no intersections, then return coordinates of the end point
+                or None if calculations are fail
         '''
-        if len(start) == 3 and len(end) == 3:
-            c = self._navmesh.hit_mesh(start, end)
-            if len(c) == 3:
-                return (c[0], c[1], c[2])
-            else:
-                return None  # if calculations are fail
-        else:
-            print("Fails to hit mesh. Start and end should be triples")
-            return None
+        return self._navmesh.hit_mesh(start, end)
 
     # ========================================================================
     # SERIALIZATION
@@ -380,62 +688,111 @@ class Navmesh:
         """
         Load navmesh from *.bin file
 
+        The navmesh is read into the new instance directly, the geometry is not built.
+
         Input:
             file_path - path to the file with extension *.bin
+
+        Raises:
+            FileNotFoundError if the file does not exist
+            ValueError if the file does not contain a valid navmesh
+        """
+        self._reset_caches()
+        if not self._navmesh.load_navmesh_fresh(file_path):
+            if not os.path.isfile(file_path):
+                raise FileNotFoundError(_ERR_NAVMESH_NOT_FOUND + file_path)
+            raise ValueError(_ERR_NAVMESH_INVALID + file_path)
+
+    def save_navmesh_to_bytes(self) -> bytes:
+        """
+        Serialize the built navmesh to bytes, the same data as written by save_navmesh.
+
+        Returns:
+            bytes for load_navmesh_from_bytes, e.g. to cache a navmesh instead of building it again
+
+        Raises:
+            ValueError: if the navmesh is not built
+        """
+        data = self._navmesh.save_navmesh_to_bytes()
+        if not data:
+            raise ValueError(_ERR_NAVMESH_NOT_BUILD)
+        return data
+
+    def load_navmesh_from_bytes(self, data: Any) -> None:
+        """
+        Load navmesh from bytes returned by save_navmesh_to_bytes (or read from a *.bin file).
+
+        The geometry from init_by_obj / init_by_raw is kept, so hit_mesh still uses it.
+        Without geometry the navmesh is loaded as with load_navmesh.
+
+        Args:
+            data: bytes or any other bytes-like object
+
+        Raises:
+            ValueError: if data does not contain a valid navmesh
+
+        Example:
+            cache = navmesh.save_navmesh_to_bytes()
+            other = Navmesh()
+            other.load_navmesh_from_bytes(cache)
         """
-        if os.path.exists(file_path):
-            # clear generated navmesh and load simple plane
-            # by default we will use the size 4.0
-            self.init_by_raw(*self._generate_plane(4.0))
-            settings: Dict[str, Any] = self.get_settings()
-            cell_size: float = settings["cellSize"]
-            if 4.0 / cell_size < 20.0:
-                # regenerate the plane
-                plane_size: float = cell_size * 20.0  # assume that the plane contains 20 tiles in each direction
-                self.init_by_raw(*self._generate_plane(plane_size))
-            # build this simple navmesh
-            self.build_navmesh()
-            self._navmesh.load_navmesh(file_path)
-        else:
-            print("Fails to load navmesh. The file " + file_path + " does not exist")
+        self._reset_caches()
+        if not self._navmesh.load_navmesh_from_bytes(data):
+            raise ValueError(_ERR_NAVMESH_BYTES_INVALID)
 
     # ========================================================================
     # MESH EXPORT
     # ========================================================================
 
-    def get_navmesh_trianglulation(self) -> Tuple[List[float], List[int]]:
+    def get_navmesh_trianglulation(self, as_lists: bool = False) -> Tuple[Any, Any]:
         '''Return triangulation data of the generated navmesh
 
+        Input:
+            as_lists - if True, return flat Python lists [x1, y1, z1, x2, ...] and [t11, t12, t13, t21, ...] as in older versions
+
         Output:
             the tuple (vertices, triangles), where
-                vertices is a list [x1, y1, z1, x2, y2, z2, ...] with coordinates of the navmesh vertices
-                triangles is a list [t11, t12, t13, t21, t22, t23, t31, t32, t33, t41, t42, t43, ...], where ti1, ti2 and ti3 are vertex indexes of the i-th triangle
+                vertices is a float32 array with shape (N, 3) with coordinates of the navmesh vertices
+                triangles is an int32 array with shape (M, 3), where each row contains vertex indexes of the triangle
         '''
-        return self._navmesh.get_navmesh_trianglulation()
+        vertices, triangles = self._navmesh.get_navmesh_trianglulation()
+        if as_lists:
+            return (vertices.ravel().tolist(), triangles.ravel().tolist())
+        return (vertices, triangles)
 
-    def get_navmesh_poligonization(self) -> Tuple[List[float], List[int], List[int]]:
+    def get_navmesh_poligonization(self, as_lists: bool = False) -> Tuple[Any, Any, Any]:
         '''Return polygon description of the navigation mesh
 
+        Input:
+            as_lists - if True, return flat Python lists instead of arrays as in older versions
+
         Output:
             the tuple (vertices, polygons, sizes), where
-                vertices is a list [x1, y1, z1, x2, y2, z2, ...] with coordinates of the navmesh vertices
-                polygons is a list [p11, p12, p13, ..., p1n1, p21, p22, p23, ..., p2n2, ...], where pij is the j-th vertex index of the polygon pi
-                sizes is a list [n1, n2, ...], where ni is a size of the i-th polygon
+                vertices is a float32 array with shape (N, 3) with coordinates of the navmesh vertices
+                polygons is a flat int32 array [p11, p12, p13, ..., p1n1, p21, p22, p23, ..., p2n2, ...], where pij is the j-th vertex index of the polygon pi
+                sizes is an int32 array [n1, n2, ...], where ni is a size of the i-th polygon
         '''
-        return self._navmesh.get_navmesh_polygonization()
+        vertices, polygons, sizes = self._navmesh.get_navmesh_polygonization()
+        if as_lists:
+            return (vertices.ravel().tolist(), polygons.tolist(), sizes.tolist())
+        return (vertices, polygons, sizes)
 
-    # ========================================================================
-    # SERIALIZATION - HELPER
-    # ========================================================================
+    def get_navmesh_poly_areas(self) -> np.ndarray:
+        '''Return area types of the navmesh polygons
 
-    def _generate_plane(self, plane_size: float) -> Tuple[List[float], List[int]]:
-        """Internal function, generate geometry data for simple plane"""
-        plane_verts: List[float] = [plane_size, 0.0, plane_size,
-                                    -plane_size, 0.0, plane_size,
-                                    -plane_size, 0.0, -plane_size,
-                                    plane_size, 0.0, -plane_size]
-        plane_polys: List[int] = [4, 0, 3, 2, 1]
-        return (plane_verts, plane_polys)
+        Output:
+            uint8 array with POLYAREA_* type of each polygon in the same order as polygons in get_navmesh_poligonization()
+            the cost of each polygon is POLYAREA_COST_LUT[areas]
+        '''
+        return self._navmesh.get_navmesh_poly_areas()
+
+    def get_navmesh_poly_flags(self) -> np.ndarray:
+        '''Return flags of the navmesh polygons
+
+        Output:
+            uint16 array with flags of each polygon in the same order as polygons in get_navmesh_poligonization()
+        '''
+        return self._navmesh.get_navmesh_poly_flags()
 
     # ========================================================================
     # CROWD SIMULATION
@@ -452,7 +809,20 @@ class Navmesh:
         Returns:
             True if successful
         """
-        return self._navmesh.init_crowd(maxAgents, maxAgentRadius)
+        self._max_agents = None
+        self._query_half_extents = None
+        is_init: bool = self._navmesh.init_crowd(maxAgents, maxAgentRadius)
+        if is_init:
+            # buffers for get_all_agent_states, reallocated only when the crowd is reinitialized
+            self._agent_states = {
+                "pos": np.zeros((maxAgents, 3), dtype=np.float32),
+                "vel": np.zeros((maxAgents, 3), dtype=np.float32),
+                "state": np.zeros(maxAgents, dtype=AGENT_STATE_DTYPE),
+                "targetState": np.zeros(maxAgents, dtype=TARGET_STATE_DTYPE),
+                "active": np.zeros(maxAgents, dtype=np.uint8)
+            }
+            self._state_buf = np.zeros((maxAgents, len(AGENT_STATE_FIELDS)), dtype=np.float32)
+        return is_init
 
     def add_agent(self, pos: Tuple[float, float, float], params: Dict[str, Any]) -> int:
         """
@@ -465,7 +835,42 @@ class Navmesh:
         Returns:
             Agent index, or -1 on failure
         """
-        return self._navmesh.add_agent(list(pos), params)
+        return self._navmesh.add_agent(pos, params)
+
+    def add_agents(self, positions: Any, params: Optional[Dict[str, Any]] = None, targets: Any = None) -> np.ndarray:
+        """
+        Add several agents with the same parameters to crowd in one call.
+
+        Args:
+            positions: Initial positions, array-like with shape (N, 3) or flat [x1, y1, z1, x2, y2, z2, ...]
+            params: Agent parameters dictionary, DEFAULT_AGENT_PARAMS when omitted
+            targets: Optional move targets with the same shape as positions, or a single
+                (x, y, z) target for all agents. The targets are set in the same C++ call,
+                as set_agent_target does, and a repeated target is looked up on the navmesh once
+
+        Returns:
+            int32 array with N agent indexes, -1 for agents which were not added
+
+        Raises:
+            ValueError: if the number of coordinates is not divisible by 3 or targets
+                do not match positions
+
+        Example:
+            >>> ids = navmesh.add_agents([(0, 0, 0), (2, 0, 0), (4, 0, 0)], targets=(90, 0, 90))
+        """
+        if params is None:
+            params = DEFAULT_AGENT_PARAMS
+        positions = np.ascontiguousarray(positions, dtype=np.float32)
+        if positions.size % 3 != 0:
+            raise ValueError(_ERR_AGENT_POSITIONS)
+        if targets is not None:
+            targets = np.asarray(targets, dtype=np.float32)
+            if targets.size == 3:
+                targets = np.broadcast_to(targets.reshape(-1), (positions.size // 3, 3))
+            targets = np.ascontiguousarray(targets)
+            if targets.size != positions.size:
+                raise ValueError(_ERR_AGENT_TARGETS)
+        return self._navmesh.add_agents(positions, params, targets)
 
     def remove_agent(self, idx: int) -> None:
         """Remove agent from crowd."""
@@ -485,6 +890,10 @@ class Navmesh:
         """
         Set agent's navigation target.
 
+        Repeating the current target (within 0.1) does not restart the path search while the path
+        is valid or being searched and the query filters are not changed, so AI code can re-assert
+        its goal every frame.
+
         Args:
             idx: Agent index
             pos: Target position (x, y, z)
@@ -492,7 +901,7 @@ class Navmesh:
         Returns:
             True if successful
         """
-        return self._navmesh.set_agent_target(idx, list(pos))
+        return self._set_agent_target(idx, pos)
 
     def set_agent_velocity(self, idx: int, vel: Tuple[float, float, float]) -> None:
         """
@@ -502,7 +911,7 @@ class Navmesh:
             idx: Agent index
             vel: Velocity vector (x, y, z)
         """
-        self._navmesh.set_agent_velocity(idx, list(vel))
+        self._set_agent_velocity(idx, vel)
 
     def reset_agent_target(self, idx: int) -> None:
         """Clear agent's current target."""
@@ -515,37 +924,227 @@ class Navmesh:
         Args:
             dt: Delta time in seconds
         """
-        self._navmesh.update_crowd(dt)
+        self._update_crowd(dt)
+
+    def tick(self, dt: float) -> None:
+        """
+        Update formations and then the crowd simulation in one call.
+
+        The same as update_formations(dt) followed by update_crowd(dt), but with one call
+        into the native module per frame (the GIL is released during the whole update).
+
+        Args:
+            dt: Delta time in seconds
+
+        Example:
+            # In game loop, instead of update_formations(dt) and update_crowd(dt)
+            navmesh.tick(dt)
+        """
+        self._tick(dt)
+
+    def make_stepper(self, dt: float) -> Callable[[], None]:
+        """
+        Create a zero-argument function, which updates the crowd with the fixed time step.
+
+        The time step and the bound native method are captured once, so the game loop with
+        the fixed dt calls the stepper without the method lookup and the argument passing.
+        For the variable time step use update_crowd().
+
+        Args:
+            dt: Fixed delta time in seconds
+
+        Returns:
+            Function without arguments, each call advances the crowd simulation by dt
+
+        Example:
+            >>> step = navmesh.make_stepper(1.0 / 60.0)
+            >>> for _ in range(600):
+            ...     step()
+        """
+        return functools.partial(self._update_crowd, float(dt))
 
     def get_agent_position(self, idx: int) -> Tuple[float, float, float]:
         """
         Get agent's current position.
 
+        Every call creates a new tuple. To read the same agent every frame without copies,
+        keep the row get_agent_positions_view()[idx], a live zero-copy (3,) view.
+
         Args:
             idx: Agent index
 
         Returns:
             Position as (x, y, z)
+
+        Raises:
+            ValueError: if the crowd is not initialized or the agent is not active
         """
-        pos = self._navmesh.get_agent_position(idx)
-        return (pos[0], pos[1], pos[2])
+        return self._get_agent_position(idx)
 
     def get_agent_velocity(self, idx: int) -> Tuple[float, float, float]:
         """
         Get agent's current velocity.
 
+        Every call creates a new tuple. To read the same agent every frame without copies,
+        keep the row get_agent_velocities_view()[idx], a live zero-copy (3,) view.
+
         Args:
             idx: Agent index
 
         Returns:
             Velocity as (x, y, z)
+
+        Raises:
+            ValueError: if the crowd is not initialized or the agent is not active
+        """
+        return self._get_agent_velocity(idx)
+
+    def get_agent_position_into(self, idx: int, out: np.ndarray) -> np.ndarray:
         """
-        vel = self._navmesh.get_agent_velocity(idx)
-        return (vel[0], vel[1], vel[2])
+        Write agent's current position into a preallocated buffer.
+
+        Allocate the buffer once and reuse it, so reading positions in a loop
+        creates no tuple and no Python floats.
+
+        Args:
+            idx: Agent index
+            out: Contiguous float32 array with at least 3 items
+
+        Returns:
+            The out array with (x, y, z) in its first 3 items
+
+        Raises:
+            ValueError: if the crowd is not initialized or the agent is not active
+            TypeError: if out has a wrong dtype or is not contiguous
+
+        Example:
+            pos = np.empty(3, dtype=np.float32)
+            for agent_id in agent_ids:
+                navmesh.get_agent_position_into(agent_id, pos)
+        """
+        if not self._navmesh.get_agent_position_into(idx, out):
+            raise ValueError(_ERR_AGENT_POSITION)
+        return out
+
+    def get_agent_velocity_into(self, idx: int, out: np.ndarray) -> np.ndarray:
+        """
+        Write agent's current velocity into a preallocated buffer.
+
+        The same as get_agent_position_into, but for the velocity.
+
+        Args:
+            idx: Agent index
+            out: Contiguous float32 array with at least 3 items
+
+        Returns:
+            The out array with (vx, vy, vz) in its first 3 items
+
+        Raises:
+            ValueError: if the crowd is not initialized or the agent is not active
+            TypeError: if out has a wrong dtype or is not contiguous
+        """
+        if not self._navmesh.get_agent_velocity_into(idx, out):
+            raise ValueError(_ERR_AGENT_VELOCITY)
+        return out
+
+    def get_all_agent_positions(self) -> np.ndarray:
+        """
+        Get positions of all crowd agents in one call.
+
+        Returns:
+            New (N, 3) float32 array, the row i is the position of the agent i
+            (N is the max agent count, inactive agents are included)
+
+        Raises:
+            ValueError: if the crowd is not initialized
+
+        Example:
+            active = navmesh.get_all_agent_states()["active"] == 1
+            positions = navmesh.get_all_agent_positions()[active]
+        """
+        if self._agent_states is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        return self._navmesh.get_all_agent_positions()
+
+    def get_all_agent_velocities(self) -> np.ndarray:
+        """
+        Get velocities of all crowd agents in one call.
+
+        Returns:
+            New (N, 3) float32 array, the row i is the velocity of the agent i
+
+        Raises:
+            ValueError: if the crowd is not initialized
+        """
+        if self._agent_states is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        return self._navmesh.get_all_agent_velocities()
+
+    def get_all_agent_targets(self) -> np.ndarray:
+        """
+        Get movement targets of all crowd agents in one call.
+
+        Returns:
+            New (N, 3) float32 array, the row i is the target position of the agent i
+            (or the requested velocity for agents with CROWDAGENT_TARGET_VELOCITY)
+
+        Raises:
+            ValueError: if the crowd is not initialized
+        """
+        if self._agent_states is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        return self._navmesh.get_all_agent_targets()
+
+    def get_agent_positions_view(self) -> np.ndarray:
+        """
+        Get a live read-only view of the positions of all crowd agents.
+
+        The view is a numpy array over a buffer, which the C++ side refreshes after each
+        update_crowd() / tick() with one linear pass over the agents, so reading it needs
+        no call into the module. The buffer is allocated on the first call (the mirror is
+        not maintained until then). New agents appear in the view after the next update.
+        After init_crowd() the old view keeps its last values, call this method again.
+
+        Returns:
+            Read-only (N, 3) float32 array, the row i is the position of the agent i
+            (N is the max agent count, inactive agents are included)
+
+        Raises:
+            ValueError: if the crowd is not initialized
+
+        Example:
+            positions = navmesh.get_agent_positions_view()   # once, after init_crowd
+            for frame in range(600):
+                navmesh.update_crowd(dt)
+                center = positions[active_ids].mean(axis=0)  # always the current positions
+        """
+        if self._agent_states is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        view: np.ndarray = self._navmesh.get_agent_positions_view()
+        view.flags.writeable = False
+        return view
+
+    def get_agent_velocities_view(self) -> np.ndarray:
+        """
+        Get a live read-only view of the velocities of all crowd agents.
+
+        The same as get_agent_positions_view, but for the agent velocities.
+
+        Returns:
+            Read-only (N, 3) float32 array, the row i is the velocity of the agent i
+
+        Raises:
+            ValueError: if the crowd is not initialized
+        """
+        if self._agent_states is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        view: np.ndarray = self._navmesh.get_agent_velocities_view()
+        view.flags.writeable = False
+        return view
 
     def get_agent_count(self) -> int:
         """Get total number of agents in crowd."""
-        return self._navmesh.get_agent_count()
+        return self.get_max_agent_count()
 
     def get_agent_state(self, idx: int) -> Dict[str, Any]:
         """
@@ -557,7 +1156,140 @@ class Navmesh:
         Returns:
             Dictionary with agent state information
         """
-        return self._navmesh.get_agent_state(idx)
+        return self._get_agent_state(idx)
+
+    def get_all_agent_states(self, out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        Get state of all crowd agents in one call.
+
+        The arrays are allocated once in init_crowd and overwritten on each call,
+        copy them if the values should be kept between frames.
+
+        Args:
+            out: Dictionary with caller-owned arrays to fill instead of the internal ones,
+                with the same keys, dtypes and shapes as the result (C-contiguous).
+                Arrays with fewer rows receive only the first agents
+
+        Returns:
+            Dictionary with arrays indexed by agent index (inactive agents are included):
+                pos: (N, 3) float32 positions
+                vel: (N, 3) float32 velocities
+                state: (N,) uint8 agent states (CROWDAGENT_STATE_*)
+                targetState: (N,) uint8 target states (CROWDAGENT_TARGET_*)
+                active: (N,) uint8, 1 for active agents
+            The out dictionary if it is given
+
+        Raises:
+            ValueError: if the crowd is not initialized
+            TypeError: if an out array has a wrong dtype or is not contiguous
+
+        Example:
+            states = navmesh.get_all_agent_states()
+            moving = states["pos"][states["active"] == 1]
+        """
+        states = self._agent_states
+        if states is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        if out is not None:
+            states = out
+        self._navmesh.get_all_agent_states(states["pos"], states["vel"], states["state"], states["targetState"], states["active"])
+        return states
+
+    def get_agents_snapshot(self, agent_ids: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get positions, velocities and target states of selected agents in one call.
+
+        Args:
+            agent_ids: Sequence or array of agent indices
+
+        Returns:
+            Tuple (pos, vel, target_state) of new arrays, the i-th row is agent_ids[i]:
+                pos: (N, 3) float32 positions
+                vel: (N, 3) float32 velocities
+                target_state: (N,) uint8 target states (CROWDAGENT_TARGET_*)
+            Invalid or inactive agents get NaN vectors and CROWDAGENT_TARGET_NONE
+
+        Raises:
+            ValueError: if the crowd is not initialized
+
+        Example:
+            pos, vel, target_state = navmesh.get_agents_snapshot(agents)
+            speeds = np.linalg.norm(vel, axis=1)
+            valid = target_state == CROWDAGENT_TARGET_VALID
+        """
+        snapshot = self._navmesh.get_agents_snapshot(agent_ids)
+        if snapshot is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        return snapshot
+
+    def get_agent_state_into(self, idx: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Write agent state into a float32 row without creating a dictionary.
+
+        Args:
+            idx: Agent index
+            out: Contiguous float32 array with at least len(AGENT_STATE_FIELDS) items.
+                By default the row idx of the buffer allocated in init_crowd is used
+
+        Returns:
+            The out array, values follow the AGENT_STATE_FIELDS layout
+
+        Raises:
+            ValueError: if the crowd is not initialized, the index is invalid or the agent is not active
+
+        Example:
+            row = navmesh.get_agent_state_into(agent_id)
+            speed = np.hypot(row[3], row[5])
+        """
+        if out is None:
+            if self._state_buf is None:
+                raise ValueError(_ERR_CROWD_NOT_INIT)
+            # checked before slicing: numpy would raise IndexError or wrap negative indices
+            if not 0 <= idx < len(self._state_buf):
+                raise ValueError(_ERR_AGENT_STATE)
+            out = self._state_buf[idx]
+        if not self._navmesh.get_agent_state_into(idx, out):
+            raise ValueError(_ERR_AGENT_STATE)
+        return out
+
+    def get_agent_state_tuple(self, idx: int) -> AgentState:
+        """
+        Get agent state as a named tuple instead of a dictionary.
+
+        Args:
+            idx: Agent index
+
+        Returns:
+            AgentState with float fields in the AGENT_STATE_FIELDS order
+
+        Raises:
+            ValueError: if the crowd is not initialized, the index is invalid or the agent is not active
+
+        Example:
+            st = navmesh.get_agent_state_tuple(agent_id)
+            if st.state == CROWDAGENT_STATE_WALKING:
+                print(st.posX, st.posZ)
+        """
+        return AgentState._make(self.get_agent_state_into(idx).tolist())
+
+    def get_all_states(self) -> np.ndarray:
+        """
+        Get state rows of all crowd agents in one call.
+
+        The returned array is a view of the buffer allocated in init_crowd and it is
+        overwritten on each call.
+
+        Returns:
+            float32 array with shape (get_agent_count(), len(AGENT_STATE_FIELDS)),
+            the i-th row is the state of the agent i (inactive agents have active = 0)
+
+        Raises:
+            ValueError: if the crowd is not initialized
+        """
+        if self._state_buf is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        count: int = self._navmesh.get_all_agent_state_rows(self._state_buf)
+        return self._state_buf[:count]
 
     # ========================================================================
     # CONVEX VOLUMES (NEW v1.1.0)
@@ -625,6 +1357,64 @@ class Navmesh:
         """
         return self._navmesh.get_all_convex_volumes()
 
+    def get_all_convex_volumes_soa(self) -> Dict[str, np.ndarray]:
+        """
+        Get all convex volumes as arrays (one array per field) instead of a list of dictionaries.
+
+        Returns:
+            Dictionary with arrays:
+                verts: (M, 3) float32 vertices of all volumes one after another
+                offsets: (N + 1,) int32, the vertices of the volume i are verts[offsets[i]:offsets[i + 1]]
+                hmin, hmax: (N,) float32 heights
+                area: (N,) uint8 area types (POLYAREA_*)
+
+        Example:
+            vols = navmesh.get_all_convex_volumes_soa()
+            water = np.flatnonzero(vols["area"] == POLYAREA_WATER)
+        """
+        return self._navmesh.get_all_convex_volumes_soa()
+
+    def add_convex_volumes_batch(
+        self,
+        verts: Any,
+        counts: Any,
+        minhs: Any,
+        maxhs: Any,
+        areas: Any
+    ) -> int:
+        """
+        Add several convex volumes in one call.
+
+        Args:
+            verts: Vertices of all volumes one after another, array-like with shape (sum(counts), 3) or flat
+            counts: Number of vertices of each volume (3-12)
+            minhs: Minimum height of each volume, or one value for all volumes
+            maxhs: Maximum height of each volume, or one value for all volumes
+            areas: Area type (POLYAREA_*) of each volume, or one value for all volumes
+
+        Returns:
+            Number of added volumes
+
+        Raises:
+            ValueError: if the sizes of the inputs do not match
+
+        Example:
+            # Two water zones
+            verts = [(10,0,10), (20,0,10), (20,0,20), (10,0,20), (30,0,30), (40,0,30), (35,0,40)]
+            navmesh.add_convex_volumes_batch(verts, [4, 3], 0.0, 2.0, POLYAREA_WATER)
+        """
+        verts = np.ascontiguousarray(verts, dtype=np.float32)
+        if verts.size % 3 != 0:
+            raise ValueError(_ERR_BATCH_POINTS)
+        counts = np.ascontiguousarray(counts, dtype=np.int32).ravel()
+        n = counts.size
+        return self._navmesh.add_convex_volumes_batch(
+            verts, counts,
+            _batch_values(minhs, np.float32, n),
+            _batch_values(maxhs, np.float32, n),
+            _batch_values(areas, np.uint8, n)
+        )
+
     # ========================================================================
     # OFF-MESH CONNECTIONS (NEW v1.1.0)
     # ========================================================================
@@ -658,7 +1448,7 @@ class Navmesh:
             )
         """
         self._navmesh.add_offmesh_connection(
-            list(start_pos), list(end_pos),
+            start_pos, end_pos,
             radius, bidirectional, area, flags
         )
 
@@ -701,6 +1491,73 @@ class Navmesh:
         """
         return self._navmesh.get_all_offmesh_connections()
 
+    def get_all_offmesh_connections_soa(self) -> Dict[str, np.ndarray]:
+        """
+        Get all off-mesh connections as arrays (one array per field) instead of a list of dictionaries.
+
+        Returns:
+            Dictionary with arrays:
+                start, end: (N, 3) float32 connection end points
+                radius: (N,) float32 radii
+                bidirectional: (N,) uint8, 1 for two-way connections
+                area: (N,) uint8 area types (POLYAREA_*)
+                flags: (N,) uint16 capability flags (POLYFLAGS_*)
+
+        Example:
+            cons = navmesh.get_all_offmesh_connections_soa()
+            lengths = np.linalg.norm(cons["end"] - cons["start"], axis=1)
+        """
+        connections = self._navmesh.get_all_offmesh_connections_soa()
+        verts = connections.pop("verts")
+        connections["start"] = verts[:, :3]
+        connections["end"] = verts[:, 3:]
+        return connections
+
+    def add_offmesh_connections_batch(
+        self,
+        start_positions: Any,
+        end_positions: Any,
+        radii: Any,
+        bidirectional: Any,
+        areas: Any,
+        flags: Any
+    ) -> int:
+        """
+        Add several off-mesh connections in one call.
+
+        Args:
+            start_positions: Start positions, array-like with shape (N, 3)
+            end_positions: End positions, array-like with shape (N, 3)
+            radii: Radius of each connection, or one value for all connections
+            bidirectional: True for two-way connections, one value per connection or for all
+            areas: Area type (POLYAREA_*) of each connection, or one value for all
+            flags: Capability flags (POLYFLAGS_*) of each connection, or one value for all
+
+        Returns:
+            Number of added connections
+
+        Raises:
+            ValueError: if the sizes of the inputs do not match
+
+        Example:
+            # Ladders along a wall
+            starts = [(x, 0, 5) for x in range(0, 50, 10)]
+            ends = [(x, 4, 6) for x in range(0, 50, 10)]
+            navmesh.add_offmesh_connections_batch(starts, ends, 0.5, True, POLYAREA_CLIMB, POLYFLAGS_CLIMB)
+        """
+        starts = np.asarray(start_positions, dtype=np.float32).reshape(-1, 3)
+        ends = np.asarray(end_positions, dtype=np.float32).reshape(-1, 3)
+        if starts.shape != ends.shape:
+            raise ValueError(_ERR_BATCH_POINTS)
+        n = starts.shape[0]
+        return self._navmesh.add_offmesh_connections_batch(
+            np.hstack((starts, ends)),
+            _batch_values(radii, np.float32, n),
+            _batch_values(bidirectional, np.uint8, n),
+            _batch_values(areas, np.uint8, n),
+            _batch_values(flags, np.uint16, n)
+        )
+
     # ========================================================================
     # AUTO-MARKUP SYSTEM (NEW v1.1.0)
     # ========================================================================
@@ -732,7 +1589,7 @@ class Navmesh:
             # Road
             navmesh.mark_box_area((0,0,0), (100,1,5), POLYAREA_ROAD)
         """
-        self._navmesh.mark_box_area(list(bmin), list(bmax), area_id)
+        self._navmesh.mark_box_area(bmin, bmax, area_id)
 
     def mark_cylinder_area(
         self,
@@ -754,7 +1611,7 @@ class Navmesh:
             # Water pond
             navmesh.mark_cylinder_area((25,0,25), 10.0, 2.0, POLYAREA_WATER)
         """
-        self._navmesh.mark_cylinder_area(list(pos), radius, height, area_id)
+        self._navmesh.mark_cylinder_area(pos, radius, height, area_id)
 
     def mark_convex_poly_area(
         self,
@@ -774,6 +1631,65 @@ class Navmesh:
         """
         self._navmesh.mark_convex_poly_area(verts, hmin, hmax, area_id)
 
+    def mark_box_areas_batch(self, bmins: Any, bmaxs: Any, area_ids: Any) -> int:
+        """
+        Mark several box-shaped areas in one call.
+
+        Args:
+            bmins: Minimum bounds, array-like with shape (N, 3)
+            bmaxs: Maximum bounds, array-like with shape (N, 3)
+            area_ids: Area type (POLYAREA_*) of each box, or one value for all boxes
+
+        Returns:
+            Number of marked boxes
+
+        Raises:
+            ValueError: if the sizes of the inputs do not match
+
+        Example:
+            # Road segments
+            navmesh.mark_box_areas_batch([(0,0,0), (0,0,50)], [(100,1,5), (5,1,100)], POLYAREA_ROAD)
+        """
+        bmins = np.asarray(bmins, dtype=np.float32).reshape(-1, 3)
+        bmaxs = np.asarray(bmaxs, dtype=np.float32).reshape(-1, 3)
+        if bmins.shape != bmaxs.shape:
+            raise ValueError(_ERR_BATCH_POINTS)
+        return self._navmesh.mark_box_areas_batch(
+            np.hstack((bmins, bmaxs)),
+            _batch_values(area_ids, np.uint8, bmins.shape[0])
+        )
+
+    def mark_cylinder_areas_batch(self, positions: Any, radii: Any, heights: Any, area_ids: Any) -> int:
+        """
+        Mark several cylindrical areas in one call.
+
+        Args:
+            positions: Center positions, array-like with shape (N, 3)
+            radii: Radius of each cylinder, or one value for all cylinders
+            heights: Height of each cylinder, or one value for all cylinders
+            area_ids: Area type (POLYAREA_*) of each cylinder, or one value for all cylinders
+
+        Returns:
+            Number of marked cylinders
+
+        Raises:
+            ValueError: if the sizes of the inputs do not match
+
+        Example:
+            # Ponds
+            navmesh.mark_cylinder_areas_batch([(25,0,25), (60,0,40)], [10.0, 5.0], 2.0, POLYAREA_WATER)
+        """
+        positions = np.ascontiguousarray(positions, dtype=np.float32)
+        if positions.size % 3 != 0:
+            raise ValueError(_ERR_BATCH_POINTS)
+        n = positions.size // 3
+        return self._navmesh.mark_cylinder_areas_batch(
+            positions,
+            _batch_values(radii, np.float32, n),
+            _batch_values(heights, np.float32, n),
+            _batch_values(area_ids, np.uint8, n)
+        )
+
     def erode_walkable_area(self, radius: int) -> None:
         """
         Erode walkable area by radius.
@@ -791,13 +1707,14 @@ class Navmesh:
     # ADVANCED CROWD FEATURES (NEW v1.1.0)
     # ========================================================================
 
-    def set_obstacle_avoidance_params(self, idx: int, params: Dict[str, float]) -> None:
+    def set_obstacle_avoidance_params(self, idx: int, params: Mapping[str, float]) -> None:
         """
         Set obstacle avoidance parameters for profile.
 
         Args:
             idx: Profile index (0-7)
-            params: Avoidance parameters dictionary
+            params: Avoidance parameters, any mapping (for example a read-only profile
+                of OBSTACLE_AVOIDANCE_PROFILES)
 
         Example:
             params = create_obstacle_avoidance_params("aggressive")
@@ -832,6 +1749,47 @@ class Navmesh:
         """
         self._navmesh.set_query_filter_area_cost(filter_index, area_id, cost)
 
+    def set_query_filter_area_costs(self, filter_index: int, costs: Any) -> int:
+        """
+        Set traversal costs of several areas of a query filter in one call.
+
+        Args:
+            filter_index: Filter index (0-15)
+            costs: Sequence or array of costs, costs[i] is the cost of the area i
+                (areas beyond len(costs) are not changed, at most 64 values are used)
+
+        Returns:
+            Number of changed areas (0 if the crowd is not initialized or the filter index is invalid)
+
+        Example:
+            # Same cost for all game areas
+            navmesh.set_query_filter_area_costs(2, np.ones(NUM_POLYAREAS))
+        """
+        return self._navmesh.set_query_filter_area_costs(filter_index, costs)
+
+    def get_query_filter_area_costs(self, filter_index: int) -> np.ndarray:
+        """
+        Get traversal costs of all areas of a query filter.
+
+        Args:
+            filter_index: Filter index (0-15)
+
+        Returns:
+            float32 array with 64 values (DT_MAX_AREAS), the item i is the cost of the area i
+
+        Raises:
+            ValueError: if the crowd is not initialized or the filter index is invalid
+
+        Example:
+            costs = navmesh.get_query_filter_area_costs(0)
+            costs[[POLYAREA_WATER, POLYAREA_DANGER]] = 10.0
+            navmesh.set_query_filter_area_costs(0, costs)
+        """
+        costs = self._navmesh.get_query_filter_area_costs(filter_index)
+        if costs.size == 0:
+            raise ValueError(_ERR_FILTER_COSTS)
+        return costs
+
     def get_query_filter_area_cost(self, filter_index: int, area_id: int) -> float:
         """
         Get area cost for query filter.
@@ -881,7 +1839,7 @@ class Navmesh:
         """
         return self._navmesh.get_agent_neighbors(agent_idx)
 
-    def get_agent_corners(self, agent_idx: int) -> List[Tuple[float, float, float]]:
+    def get_agent_corners(self, agent_idx: int) -> np.ndarray:
         """
         Get path corner points for agent.
 
@@ -889,14 +1847,35 @@ class Navmesh:
             agent_idx: Agent index
 
         Returns:
-            List of corner positions [(x,y,z), ...]
+            float32 array with shape (N, 3), one row per corner position
+            (the shape is (0, 3) if the agent has no corners or is not active)
+        """
+        return self._get_agent_corners(agent_idx)
+
+    def get_all_agent_corners(self, indices: Any = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get path corner points of several agents in one call.
+
+        Args:
+            indices: Agent indexes, all agents of the crowd when omitted
+
+        Returns:
+            Tuple (offsets, points), where offsets is an int32 array with len(indices) + 1 values
+            and points is a float32 array with shape (M, 3); the corners of the agent indices[i]
+            are points[offsets[i]:offsets[i + 1]] (empty for invalid or inactive agents)
+
+        Raises:
+            ValueError: if the crowd is not initialized
+
+        Example:
+            offsets, corners = navmesh.get_all_agent_corners()
+            next_corner = corners[offsets[:-1][np.diff(offsets) > 0]]  # first corner of each agent with a path
         """
-        corners_flat = self._navmesh.get_agent_corners(agent_idx)
-        if not corners_flat:
-            return []
-        count = len(corners_flat) // 3
-        return [(corners_flat[3*i], corners_flat[3*i+1], corners_flat[3*i+2])
-                for i in range(count)]
+        if self._agent_states is None:
+            raise ValueError(_ERR_CROWD_NOT_INIT)
+        if indices is None:
+            indices = np.arange(len(self._agent_states["active"]), dtype=np.int32)
+        return self._navmesh.get_all_agent_corners(indices)
 
     def get_active_agents(self) -> List[int]:
         """
@@ -914,7 +1893,11 @@ class Navmesh:
         Returns:
             Maximum number of agents
         """
-        return self._navmesh.get_max_agent_count()
+        if self._max_agents is None:
+            if self._agent_states is None:
+                return self._navmesh.get_max_agent_count()  # 0 with the error in the log
+            self._max_agents = self._navmesh.get_max_agent_count()
+        return self._max_agents
 
     def get_query_half_extents(self) -> Tuple[float, float, float]:
         """
@@ -923,8 +1906,12 @@ class Navmesh:
         Returns:
             Half extents as (x, y, z)
         """
-        extents = self._navmesh.get_query_half_extents()
-        return (extents[0], extents[1], extents[2])
+        if self._query_half_extents is None:
+            extents = self._navmesh.get_query_half_extents()
+            if self._agent_states is None:
+                return (extents[0], extents[1], extents[2])
+            self._query_half_extents = (extents[0], extents[1], extents[2])
+        return self._query_half_extents
 
     def is_agent_active(self, idx: int) -> bool:
         """
@@ -936,7 +1923,7 @@ class Navmesh:
         Returns:
             True if agent is active
         """
-        return self._navmesh.is_agent_active(idx)
+        return self._is_agent_active(idx)
 
     def get_agent_parameters(self, idx: int) -> Dict[str, Any]:
         """
@@ -950,11 +1937,33 @@ class Navmesh:
         """
         return self._navmesh.get_agent_parameters(idx)
 
+    def get_agent_parameters_tuple(self, idx: int) -> AgentParameters:
+        """
+        Get agent's current parameters as a named tuple instead of a dictionary.
+
+        Args:
+            idx: Agent index
+
+        Returns:
+            AgentParameters, updateFlags, obstacleAvoidanceType and queryFilterType are ints
+
+        Raises:
+            ValueError: if the crowd is not initialized or the agent is not active
+
+        Example:
+            p = navmesh.get_agent_parameters_tuple(agent_id)
+            reach = p.maxSpeed * 2.0
+        """
+        params = self._navmesh.get_agent_parameters_tuple(idx)
+        if params is None:
+            raise ValueError(_ERR_AGENT_PARAMETERS)
+        return AgentParameters._make(params)
+
     # ========================================================================
     # FORMATIONS & GROUP BEHAVIORS (NEW v1.1.0)
     # ========================================================================
 
-    def create_formation(self, formation_type: int, spacing: float) -> int:
+    def create_formation(self, formation_type: int, spacing: float, max_agents: int = 64) -> int:
         """
         Create a new formation group.
 
@@ -966,6 +1975,8 @@ class Navmesh:
                 3 = Box (rectangular grid)
                 4 = Circle (circular arrangement)
             spacing: Distance between agents in meters
+            max_agents: Capacity of the formation, storage is reserved up front and
+                add_agent_to_formation returns False once it is full
 
         Returns:
             Formation ID, or -1 on failure
@@ -973,8 +1984,10 @@ class Navmesh:
         Example:
             # Create line formation with 2m spacing
             formation_id = navmesh.create_formation(0, 2.0)
+            # Formation for a whole battalion
+            formation_id = navmesh.create_formation(3, 1.5, max_agents=256)
         """
-        return self._navmesh.create_formation(formation_type, spacing)
+        return self._navmesh.create_formation(formation_type, spacing, max_agents)
 
     def delete_formation(self, formation_id: int) -> None:
         """
@@ -994,7 +2007,7 @@ class Navmesh:
             agent_idx: Agent index
 
         Returns:
-            True if successful
+            True if successful, False if the formation is full (see max_agents of create_formation)
 
         Example:
             formation_id = navmesh.create_formation(0, 2.0)
@@ -1033,11 +2046,7 @@ class Navmesh:
             # Move formation to (50, 0, 50) facing north
             navmesh.set_formation_target(formation_id, (50, 0, 50), (0, 0, 1))
         """
-        self._navmesh.set_formation_target(
-            formation_id,
-            list(target_pos),
-            list(target_dir)
-        )
+        self._navmesh.set_formation_target(formation_id, target_pos, target_dir)
 
     def set_formation_leader(self, formation_id: int, agent_idx: int) -> None:
         """
@@ -1052,15 +2061,16 @@ class Navmesh:
         """
         self._navmesh.set_formation_leader(formation_id, agent_idx)
 
-    def get_formation_agents(self, formation_id: int) -> List[int]:
+    def get_formation_agents(self, formation_id: int) -> np.ndarray:
         """
-        Get list of agent indices in a formation.
+        Get agent indices in a formation.
 
         Args:
             formation_id: Formation ID
 
         Returns:
-            List of agent indices
+            int32 array with agent indices (empty if the formation does not exist),
+            use tolist() to get a list
         """
         return self._navmesh.get_formation_agents(formation_id)
 
@@ -1084,6 +2094,52 @@ class Navmesh:
         """
         return self._navmesh.get_formation_info(formation_id)
 
+    def get_formation_info_tuple(self, formation_id: int) -> FormationInfo:
+        """
+        Get information about a formation as a named tuple instead of a dictionary.
+
+        Args:
+            formation_id: Formation ID
+
+        Returns:
+            FormationInfo with the same fields as get_formation_info, id, type, leader_idx
+            and agent_count are ints and has_target is a bool
+
+        Raises:
+            ValueError: if the formation does not exist
+
+        Example:
+            info = navmesh.get_formation_info_tuple(formation_id)
+            if info.has_target:
+                print(info.target_x, info.target_z)
+        """
+        info = self._navmesh.get_formation_info_tuple(formation_id)
+        if info is None:
+            raise ValueError(_ERR_FORMATION_NOT_FOUND + str(formation_id))
+        return FormationInfo._make(info)
+
+    def get_formation_slot_offsets(self, formation_id: int) -> np.ndarray:
+        """
+        Get the slot offsets used by update_formations for the agents of a formation.
+
+        The offsets are computed in C++ when an agent joins or leaves the formation,
+        update_formations only rotates them to the formation direction.
+
+        Args:
+            formation_id: Formation ID
+
+        Returns:
+            float32 array of shape (agent_count, 2) in the order of get_formation_agents,
+            each row (a, b) is the offset a * right + b * forward from the formation target
+
+        Raises:
+            ValueError: if the formation does not exist
+        """
+        offsets = self._navmesh.get_formation_slot_offsets(formation_id)
+        if offsets is None:
+            raise ValueError(_ERR_FORMATION_NOT_FOUND + str(formation_id))
+        return offsets
+
     def update_formations(self, dt: float) -> None:
         """
         Update all formations and set agent targets.
@@ -1099,6 +2155,7 @@ class Navmesh:
             # In game loop
             navmesh.update_crowd(dt)
             navmesh.update_formations(dt)
+            # or navmesh.tick(dt) for both
         """
         self._navmesh.update_formations(dt)
 
@@ -1116,10 +2173,31 @@ class Navmesh:
 # HELPER FUNCTIONS
 # ============================================================================
 
+# Default agent parameters, built once at import time
+_DEFAULT_AGENT_PARAMS: Dict[str, Any] = {
+    "radius": 0.6,
+    "height": 2.0,
+    "maxAcceleration": 8.0,
+    "maxSpeed": 3.5,
+    "collisionQueryRange": 7.2,  # radius * 12
+    "pathOptimizationRange": 18.0,  # radius * 30
+    "separationWeight": 2.0,
+    "updateFlags": _DEFAULT_UPDATE_FLAGS,
+    "obstacleAvoidanceType": 3,
+    "queryFilterType": 0
+}
+
+# Read-only view of the default agent parameters, can be passed to add_agent without copy
+DEFAULT_AGENT_PARAMS = MappingProxyType(_DEFAULT_AGENT_PARAMS)
+
+
 def create_default_agent_params() -> Dict[str, Any]:
     """
     Create a dictionary with default agent parameters for crowd simulation.
 
+    Returns a new copy on each call, so it can be modified. Use DEFAULT_AGENT_PARAMS
+    if parameters are only read.
+
     Returns:
         dict: Default agent parameters
 
@@ -1128,24 +2206,182 @@ def create_default_agent_params() -> Dict[str, Any]:
         params["maxSpeed"] = 5.0  # Override specific values
         agent_id = navmesh.add_agent((0, 0, 0), params)
     """
-    return {
-        "radius": 0.6,
-        "height": 2.0,
-        "maxAcceleration": 8.0,
-        "maxSpeed": 3.5,
-        "collisionQueryRange": 7.2,  # radius * 12
-        "pathOptimizationRange": 18.0,  # radius * 30
-        "separationWeight": 2.0,
-        "updateFlags": CROWD_ANTICIPATE_TURNS | CROWD_OPTIMIZE_VIS | CROWD_OPTIMIZE_TOPO | CROWD_OBSTACLE_AVOIDANCE,
-        "obstacleAvoidanceType": 3,
-        "queryFilterType": 0
-    }
+    return _DEFAULT_AGENT_PARAMS.copy()
+
+
+def walking_indices(states: np.ndarray) -> np.ndarray:
+    """
+    Indexes of the agents in the walking state.
+
+    Args:
+        states: Agent states array, for example navmesh.get_all_agent_states()["state"]
+
+    Returns:
+        Array with indexes of the agents with the state CROWDAGENT_STATE_WALKING
+    """
+    return np.nonzero(states == CROWDAGENT_STATE_WALKING)[0]
+
+
+def needs_replan_mask(target_states: np.ndarray) -> np.ndarray:
+    """
+    Mask of the agents which are waiting for a new path.
+
+    Args:
+        target_states: Target states array, for example navmesh.get_all_agent_states()["targetState"]
+
+    Returns:
+        Boolean array, True for the agents with the target state CROWDAGENT_TARGET_REQUESTING
+        or CROWDAGENT_TARGET_WAITING_FOR_PATH
+    """
+    return (target_states == CROWDAGENT_TARGET_REQUESTING) | (target_states == CROWDAGENT_TARGET_WAITING_FOR_PATH)
+
+
+@functools.lru_cache(maxsize=256)
+def get_formation_offsets(kind: int, n: int) -> np.ndarray:
+    """
+    Slot offsets of a formation with n agents and unit spacing.
+
+    The layout is the same as the one used by update_formations. Each row (a, b) is the
+    offset a * right + b * forward from the formation target, scaled by the spacing.
+    The result is cached for each (kind, n) pair and returned as a read-only array.
+
+    Args:
+        kind: Formation type (FORMATION_*)
+        n: Number of agents
+
+    Returns:
+        float32 array with shape (n, 2)
+
+    Raises:
+        ValueError: if the formation type is unknown
+
+    Example:
+        # spawn 10 agents in a wedge around (50, 0, 50) facing +Z with spacing 2.0
+        offsets = get_formation_offsets(FORMATION_WEDGE, 10) * 2.0
+        positions = np.zeros((10, 3), dtype=np.float32)
+        positions[:, 0] = 50.0 + offsets[:, 0]
+        positions[:, 2] = 50.0 + offsets[:, 1]
+        ids = navmesh.add_agents(positions)
+    """
+    i = np.arange(n, dtype=np.float32)
+    offsets = np.zeros((n, 2), dtype=np.float32)
+    if kind == FORMATION_LINE:
+        offsets[:, 0] = i - n // 2
+    elif kind == FORMATION_COLUMN:
+        offsets[:, 1] = -i
+    elif kind == FORMATION_WEDGE:
+        row = np.floor(np.sqrt(i))
+        offsets[:, 0] = (i - row * row) - row * 0.5
+        offsets[:, 1] = -row
+    elif kind == FORMATION_BOX:
+        side_len = int(np.ceil(np.sqrt(n)))
+        offsets[:, 0] = (i % side_len) - side_len * 0.5
+        offsets[:, 1] = -(i // side_len)
+    elif kind == FORMATION_CIRCLE:
+        angle = np.linspace(0.0, 2.0 * np.pi, n, endpoint=False)
+        radius = n / (2.0 * np.pi)
+        offsets[:, 0] = radius * np.cos(angle)
+        offsets[:, 1] = radius * np.sin(angle)
+    else:
+        raise ValueError(_ERR_FORMATION_TYPE + str(kind))
+    offsets.setflags(write=False)
+    return offsets
+
+
+def walkable(flags: np.ndarray, include: int = POLYFLAGS_DEFAULT_INCLUDE) -> np.ndarray:
+    """
+    Test polygon flags the same way as the Detour query filter does.
+
+    A polygon passes if it has any of the include flags and is not disabled. Unlike
+    polyflags_match, which requires all include flags, this is the test used by
+    set_query_filter_include_flags and set_query_filter_exclude_flags.
+
+    Args:
+        flags: Array of polygon flags, for example navmesh.get_navmesh_poly_flags()
+        include: Flags, one of which should be set
+
+    Returns:
+        Boolean array with the same shape as flags
+    """
+    flags = np.asarray(flags, dtype=POLYFLAGS_DTYPE)
+    return ((flags & include) != 0) & ((flags & POLYFLAGS_DEFAULT_EXCLUDE) == 0)
+
+
+def set_area_cost(area: int, cost: float) -> None:
+    """
+    Set the traversal cost of an area type in POLYAREA_COST_LUT.
+
+    Args:
+        area: Area type (POLYAREA_*)
+        cost: Traversal cost multiplier
+
+    Raises:
+        ValueError: if the area type is not in [0, NUM_POLYAREAS)
+
+    Example:
+        set_area_cost(POLYAREA_GRASS, 3.0)
+        polygon_costs = POLYAREA_COST_LUT[navmesh.get_navmesh_poly_areas()]
+    """
+    if not 0 <= area < NUM_POLYAREAS:
+        raise ValueError(_ERR_AREA_TYPE + str(area))
+    POLYAREA_COST_LUT[area] = cost
+
+
+def polyflags_match(flags: np.ndarray, include: int, exclude: int = 0) -> np.ndarray:
+    """
+    Test polygon flags against include and exclude masks in one vectorized pass.
+
+    A polygon matches if it has all include flags and none of the exclude flags.
+
+    Args:
+        flags: Array of polygon flags, for example navmesh.get_navmesh_poly_flags()
+        include: Flags which should be set
+        exclude: Flags which should not be set
+
+    Returns:
+        Boolean array with the same shape as flags
+
+    Example:
+        walkable = polyflags_match(navmesh.get_navmesh_poly_flags(), POLYFLAGS_WALK, POLYFLAGS_DISABLED)
+    """
+    flags = np.asarray(flags, dtype=POLYFLAGS_DTYPE)
+    return ((flags & include) == include) & ((flags & exclude) == 0)
+
+
+def decode_crowd_flags(flags: int) -> Tuple[bool, bool, bool, bool, bool]:
+    """
+    Decode crowd update flags into separate booleans with one table lookup.
+
+    Args:
+        flags: Combination of CrowdUpdateFlags, for example params["updateFlags"]
+
+    Returns:
+        Tuple (anticipate_turns, obstacle_avoidance, separation, optimize_vis, optimize_topo)
+
+    Example:
+        anticipate, avoid, sep, vis, topo = decode_crowd_flags(params["updateFlags"])
+    """
+    return _CROWD_FLAG_TABLE[int(flags) & 31]
+
+
+# Default vehicle parameters, built once at import time
+_VEHICLE_PARAMS: Dict[str, Any] = {
+    "radius": 2.5,
+    "height": 2.0,
+    "maxSpeed": 15.0,
+    "maxAcceleration": 3.0,
+    "collisionQueryRange": 30.0,
+    "pathOptimizationRange": 75.0,
+    "separationWeight": 3.0,
+    "updateFlags": _VEHICLE_UPDATE_FLAGS
+}
 
 
 def create_vehicle_params() -> Dict[str, Any]:
     """
     Create a dictionary with default vehicle parameters.
     Vehicle agents have larger radius, higher speeds, and different movement characteristics.
+    Returns a new copy on each call, so it can be modified.
 
     Returns:
         dict: Default vehicle parameters
@@ -1154,16 +2390,61 @@ def create_vehicle_params() -> Dict[str, Any]:
         vehicle_params = create_vehicle_params()
         vehicle_id = navmesh.add_agent((10, 0, 10), vehicle_params)
     """
-    return {
-        "radius": 2.5,
-        "height": 2.0,
-        "maxSpeed": 15.0,
-        "maxAcceleration": 3.0,
-        "collisionQueryRange": 30.0,
-        "pathOptimizationRange": 75.0,
-        "separationWeight": 3.0,
-        "updateFlags": CROWD_ANTICIPATE_TURNS | CROWD_OBSTACLE_AVOIDANCE
+    return _VEHICLE_PARAMS.copy()
+
+
+# Read-only obstacle avoidance profiles, built once at import time, can be passed to
+# set_obstacle_avoidance_params without copy
+OBSTACLE_AVOIDANCE_PROFILES: Mapping[str, Mapping[str, float]] = MappingProxyType({name: MappingProxyType(profile) for name, profile in {
+    "default": {
+        "velBias": 0.4,
+        "weightDesVel": 2.0,
+        "weightCurVel": 0.75,
+        "weightSide": 0.75,
+        "weightToi": 2.5,
+        "horizTime": 2.5,
+        "gridSize": 33,
+        "adaptiveDivs": 7,
+        "adaptiveRings": 2,
+        "adaptiveDepth": 5
+    },
+    "aggressive": {
+        "velBias": 0.5,
+        "weightDesVel": 2.5,
+        "weightCurVel": 1.0,
+        "weightSide": 0.5,
+        "weightToi": 3.0,
+        "horizTime": 2.0,
+        "gridSize": 33,
+        "adaptiveDivs": 7,
+        "adaptiveRings": 3,
+        "adaptiveDepth": 6
+    },
+    "passive": {
+        "velBias": 0.3,
+        "weightDesVel": 1.0,
+        "weightCurVel": 0.5,
+        "weightSide": 1.0,
+        "weightToi": 1.5,
+        "horizTime": 3.5,
+        "gridSize": 20,
+        "adaptiveDivs": 5,
+        "adaptiveRings": 2,
+        "adaptiveDepth": 3
+    },
+    "defensive": {
+        "velBias": 0.2,
+        "weightDesVel": 1.0,
+        "weightCurVel": 0.3,
+        "weightSide": 1.5,
+        "weightToi": 1.0,
+        "horizTime": 4.0,
+        "gridSize": 25,
+        "adaptiveDivs": 6,
+        "adaptiveRings": 2,
+        "adaptiveDepth": 4
     }
+}.items()})
 
 
 def create_obstacle_avoidance_params(profile: str = "default") -> Dict[str, float]:
@@ -1174,7 +2455,8 @@ def create_obstacle_avoidance_params(profile: str = "default") -> Dict[str, floa
         profile: One of "default", "aggressive", "passive", "defensive"
 
     Returns:
-        dict: Obstacle avoidance parameters
+        dict: Obstacle avoidance parameters, a new copy on each call (unknown profiles give "default").
+        Use OBSTACLE_AVOIDANCE_PROFILES[profile] when nothing is modified
 
     Profiles:
         - default: Balanced behavior
@@ -1191,58 +2473,7 @@ def create_obstacle_avoidance_params(profile: str = "default") -> Dict[str, floa
         agent_params["obstacleAvoidanceType"] = 0
         soldier_id = navmesh.add_agent((5, 0, 5), agent_params)
     """
-    profiles = {
-        "default": {
-            "velBias": 0.4,
-            "weightDesVel": 2.0,
-            "weightCurVel": 0.75,
-            "weightSide": 0.75,
-            "weightToi": 2.5,
-            "horizTime": 2.5,
-            "gridSize": 33,
-            "adaptiveDivs": 7,
-            "adaptiveRings": 2,
-            "adaptiveDepth": 5
-        },
-        "aggressive": {
-            "velBias": 0.5,
-            "weightDesVel": 2.5,
-            "weightCurVel": 1.0,
-            "weightSide": 0.5,
-            "weightToi": 3.0,
-            "horizTime": 2.0,
-            "gridSize": 33,
-            "adaptiveDivs": 7,
-            "adaptiveRings": 3,
-            "adaptiveDepth": 6
-        },
-        "passive": {
-            "velBias": 0.3,
-            "weightDesVel": 1.0,
-            "weightCurVel": 0.5,
-            "weightSide": 1.0,
-            "weightToi": 1.5,
-            "horizTime": 3.5,
-            "gridSize": 20,
-            "adaptiveDivs": 5,
-            "adaptiveRings": 2,
-            "adaptiveDepth": 3
-        },
-        "defensive": {
-            "velBias": 0.2,
-            "weightDesVel": 1.0,
-            "weightCurVel": 0.3,
-            "weightSide": 1.5,
-            "weightToi": 1.0,
-            "horizTime": 4.0,
-            "gridSize": 25,
-            "adaptiveDivs": 6,
-            "adaptiveRings": 2,
-            "adaptiveDepth": 4
-        }
-    }
-
-    return profiles.get(profile, profiles["default"])
+    return dict(OBSTACLE_AVOIDANCE_PROFILES.get(profile, OBSTACLE_AVOIDANCE_PROFILES["default"]))
 
 
 def setup_query_filter_infantry(navmesh: Navmesh, filter_index: int = 0) -> None:
@@ -1253,6 +2484,9 @@ def setup_query_filter_infantry(navmesh: Navmesh, filter_index: int = 0) -> None
         navmesh: Navmesh instance
         filter_index: Filter index to configure (0-15)
 
+    Raises:
+        ValueError: if the crowd is not initialized or the filter index is invalid
+
     Example:
         setup_query_filter_infantry(navmesh, 0)
 
@@ -1260,11 +2494,14 @@ def setup_query_filter_infantry(navmesh: Navmesh, filter_index: int = 0) -> None
         agent_params["queryFilterType"] = 0
         infantry_id = navmesh.add_agent((5, 0, 5), agent_params)
     """
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_GROUND, 1.0)
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_ROAD, 0.5)    # Prefer roads
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_GRASS, 1.5)   # Grass slows down
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_WATER, 10.0)  # Avoid water
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_DANGER, 5.0)  # Avoid danger
+    # read the current costs once, so the areas not listed here keep their values
+    costs = navmesh.get_query_filter_area_costs(filter_index)
+    costs[POLYAREA_GROUND] = 1.0
+    costs[POLYAREA_ROAD] = 0.5    # Prefer roads
+    costs[POLYAREA_GRASS] = 1.5   # Grass slows down
+    costs[POLYAREA_WATER] = 10.0  # Avoid water
+    costs[POLYAREA_DANGER] = 5.0  # Avoid danger
+    navmesh.set_query_filter_area_costs(filter_index, costs[:NUM_POLYAREAS])
     navmesh.set_query_filter_include_flags(filter_index, POLYFLAGS_WALK | POLYFLAGS_JUMP | POLYFLAGS_DOOR)
     navmesh.set_query_filter_exclude_flags(filter_index, POLYFLAGS_SWIM | POLYFLAGS_DISABLED)
 
@@ -1277,6 +2514,9 @@ def setup_query_filter_amphibious(navmesh: Navmesh, filter_index: int = 1) -> No
         navmesh: Navmesh instance
         filter_index: Filter index to configure (0-15)
 
+    Raises:
+        ValueError: if the crowd is not initialized or the filter index is invalid
+
     Example:
         setup_query_filter_amphibious(navmesh, 1)
 
@@ -1284,14 +2524,20 @@ def setup_query_filter_amphibious(navmesh: Navmesh, filter_index: int = 1) -> No
         agent_params["queryFilterType"] = 1
         amphibious_id = navmesh.add_agent((5, 0, 5), agent_params)
     """
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_GROUND, 1.0)
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_ROAD, 0.8)
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_WATER, 0.7)   # Prefer water
-    navmesh.set_query_filter_area_cost(filter_index, POLYAREA_DANGER, 5.0)
+    costs = navmesh.get_query_filter_area_costs(filter_index)
+    costs[POLYAREA_GROUND] = 1.0
+    costs[POLYAREA_ROAD] = 0.8
+    costs[POLYAREA_WATER] = 0.7   # Prefer water
+    costs[POLYAREA_DANGER] = 5.0
+    navmesh.set_query_filter_area_costs(filter_index, costs[:NUM_POLYAREAS])
     navmesh.set_query_filter_include_flags(filter_index, POLYFLAGS_WALK | POLYFLAGS_SWIM | POLYFLAGS_JUMP)
     navmesh.set_query_filter_exclude_flags(filter_index, POLYFLAGS_DISABLED)
 
 
+# Area costs of the flying filter, every game area has the same cost
+_FLYING_AREA_COSTS = np.ones(NUM_POLYAREAS, dtype=np.float32)
+
+
 def setup_query_filter_flying(navmesh: Navmesh, filter_index: int = 2) -> None:
     """
     Configure a query filter for flying units (ignores terrain type).
@@ -1300,6 +2546,9 @@ def setup_query_filter_flying(navmesh: Navmesh, filter_index: int = 2) -> None:
         navmesh: Navmesh instance
         filter_index: Filter index to configure (0-15)
 
+    Raises:
+        ValueError: if the crowd is not initialized or the filter index is invalid
+
     Example:
         setup_query_filter_flying(navmesh, 2)
 
@@ -1308,8 +2557,8 @@ def setup_query_filter_flying(navmesh: Navmesh, filter_index: int = 2) -> None:
         flying_id = navmesh.add_agent((5, 5, 5), agent_params)
     """
     # All areas have same cost for flying units
-    for area in range(8):
-        navmesh.set_query_filter_area_cost(filter_index, area, 1.0)
+    if not navmesh.set_query_filter_area_costs(filter_index, _FLYING_AREA_COSTS):
+        raise ValueError(_ERR_FILTER_COSTS)
     navmesh.set_query_filter_include_flags(filter_index, POLYFLAGS_ALL)
     navmesh.set_query_filter_exclude_flags(filter_index, POLYFLAGS_DISABLED)
 
@@ -1323,14 +2572,24 @@ __all__ = [
     'Navmesh',
 
     # Helper functions
+    'DEFAULT_AGENT_PARAMS',
     'create_default_agent_params',
+    'decode_crowd_flags',
+    'polyflags_match',
+    'walkable',
+    'get_formation_offsets',
+    'walking_indices',
+    'needs_replan_mask',
+    'set_area_cost',
     'create_vehicle_params',
     'create_obstacle_avoidance_params',
+    'OBSTACLE_AVOIDANCE_PROFILES',
     'setup_query_filter_infantry',
     'setup_query_filter_amphibious',
     'setup_query_filter_flying',
 
     # Crowd constants
+    'CrowdUpdateFlags',
     'CROWD_ANTICIPATE_TURNS',
     'CROWD_OBSTACLE_AVOIDANCE',
     'CROWD_SEPARATION',
@@ -1350,6 +2609,8 @@ __all__ = [
     'CROWDAGENT_TARGET_WAITING_FOR_QUEUE',
     'CROWDAGENT_TARGET_WAITING_FOR_PATH',
     'CROWDAGENT_TARGET_VELOCITY',
+    'AGENT_STATE_DTYPE',
+    'TARGET_STATE_DTYPE',
 
     # Partition types
     'PARTITION_WATERSHED',
@@ -1365,6 +2626,8 @@ __all__ = [
     'POLYAREA_JUMP',
     'POLYAREA_CLIMB',
     'POLYAREA_DANGER',
+    'NUM_POLYAREAS',
+    'POLYAREA_COST_LUT',
 
     # Poly flags
     'POLYFLAGS_WALK',
@@ -1374,6 +2637,19 @@ __all__ = [
     'POLYFLAGS_CLIMB',
     'POLYFLAGS_DISABLED',
     'POLYFLAGS_ALL',
+    'POLYFLAGS_DEFAULT_INCLUDE',
+    'POLYFLAGS_DEFAULT_EXCLUDE',
+    'POLYFLAGS_DTYPE',
+    'POLYFLAG_MASKS',
+
+    # Agent state row layout
+    'AGENT_STATE_FIELDS',
+    'AgentState',
+    'AgentParameters',
+    'FormationInfo',
+
+    # Namespace with all flag and state constants
+    'F',
 
     # Formation types
     'FORMATION_LINE',
@@ -3,6 +3,8 @@
 Script de diagnostic pour tester le mouvement des agents
 """
 
+import numpy as np
+
 from Py37RecastDetour import Navmesh, create_default_agent_params, CROWDAGENT_TARGET_VALID
 
 print("="*60)
@@ -13,7 +15,7 @@ print("="*60)
 print("\n[1/8] Construction du navmesh...")
 navmesh = Navmesh()
 vertices = [0, 0, 0,  100, 0, 0,  100, 0, 100,  0, 0, 100]
-faces = [0, 1, 2,  0, 2, 3]
+faces = [4, 0, 3, 2, 1]  # nombre de coins puis indices (sens horaire)
 
 navmesh.init_by_raw(vertices, faces)
 navmesh.build_navmesh()
@@ -26,8 +28,9 @@ else:
 # Étape 2: Vérifier bounding box
 print("\n[2/8] Vérification du bounding box...")
 bbox = navmesh.get_bounding_box()
-print(f"   Min: ({bbox[0]:.1f}, {bbox[1]:.1f}, {bbox[2]:.1f})")
-print(f"   Max: ({bbox[3]:.1f}, {bbox[4]:.1f}, {bbox[5]:.1f})")
+b_min, b_max = bbox
+print(f"   Min: ({b_min[0]:.1f}, {b_min[1]:.1f}, {b_min[2]:.1f})")
+print(f"   Max: ({b_max[0]:.1f}, {b_max[1]:.1f}, {b_max[2]:.1f})")
 
 # Étape 3: Initialiser le crowd
 print("\n[3/8] Initialisation du crowd...")
@@ -103,40 +106,51 @@ print("   Frame | Position (X, Z)  | Velocity (X, Z) | Speed | Target")
 print("   " + "-"*70)
 
 dt = 0.1  # 10 FPS pour mieux voir le mouvement
-has_moved = False
-initial_pos = navmesh.get_agent_position(agent_id)
+frames = 10
+
+# positions de tous les agents à chaque frame: track[0] est l'état initial
+states = navmesh.get_all_agent_states()
+track = np.empty((frames + 1,) + states["pos"].shape, dtype=np.float32)
+track[0] = states["pos"]
 
-for frame in range(10):
+for frame in range(frames):
     # APPEL CRITIQUE: Sans ceci, les agents ne bougent PAS!
     navmesh.update_crowd(dt)
 
-    pos = navmesh.get_agent_position(agent_id)
-    vel = navmesh.get_agent_velocity(agent_id)
-    state = navmesh.get_agent_state(agent_id)
+    # un seul appel par frame pour tous les agents (les tableaux sont réutilisés)
+    states = navmesh.get_all_agent_states()
+    track[frame + 1] = states["pos"]
 
-    speed = (vel[0]**2 + vel[1]**2 + vel[2]**2)**0.5
-    target_state = state['targetState']
+    pos = states["pos"][agent_id]
+    vel = states["vel"][agent_id]
+    speed = np.linalg.norm(vel)
+    target_state = states["targetState"][agent_id]
 
     target_status = "VALID" if target_state == CROWDAGENT_TARGET_VALID else f"OTHER({target_state})"
 
     print(f"   {frame:5d} | ({pos[0]:6.2f}, {pos[2]:6.2f}) | ({vel[0]:6.2f}, {vel[2]:6.2f}) | {speed:5.2f} | {target_status}")
 
-    # Vérifier si l'agent a bougé
-    distance_moved = ((pos[0]-initial_pos[0])**2 + (pos[2]-initial_pos[2])**2)**0.5
-    if distance_moved > 0.01:
-        has_moved = True
-
 # Résultat final
 print("\n" + "="*60)
 print("RÉSULTAT DU DIAGNOSTIC")
 print("="*60)
 
-final_pos = navmesh.get_agent_position(agent_id)
-total_distance = ((final_pos[0]-initial_pos[0])**2 + (final_pos[2]-initial_pos[2])**2)**0.5
+# distances horizontales (X, Z) depuis la position initiale, pour toutes les frames et tous les agents
+xz = track[..., ::2]
+offsets = xz[1:] - xz[0]
+distances = np.linalg.norm(offsets, axis=-1)
+moved = (distances > 0.01).any(axis=0)
+active = states["active"] == 1
+
+initial_pos = track[0, agent_id]
+final_pos = track[-1, agent_id]
+has_moved = bool(moved[agent_id])
+total_distance = float(distances[-1, agent_id])
 
 print(f"\nPosition initiale: ({initial_pos[0]:.2f}, {initial_pos[2]:.2f})")
 print(f"Position finale:   ({final_pos[0]:.2f}, {final_pos[2]:.2f})")
 print(f"Distance parcourue: {total_distance:.2f} unités")
+print(f"Agents actifs ayant bougé: {int(moved[active].sum())}/{int(active.sum())}")
 
 if has_moved and total_distance > 0.1:
     print("\n✓ SUCCÈS: Les agents bougent correctement!")
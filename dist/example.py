@@ -6,13 +6,133 @@ PyRecastDetour - Usage Examples
 from Py37RecastDetour import (
     Navmesh,
     create_default_agent_params,
+    DEFAULT_AGENT_PARAMS,
     CROWD_ANTICIPATE_TURNS,
     CROWD_OBSTACLE_AVOIDANCE,
     CROWD_OPTIMIZE_VIS,
     CROWD_OPTIMIZE_TOPO,
     CROWDAGENT_TARGET_VALID
 )
+import array
+import atexit
+import contextlib
+import ctypes
+import functools
+import io
+import math
+import os
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _speeds(vel):
+        """
+        Norms of (n, 3) velocities, compiled by Numba for large crowds.
+        """
+        out = np.empty(vel.shape[0], dtype=vel.dtype)
+        for i in prange(vel.shape[0]):
+            out[i] = math.sqrt(vel[i, 0] ** 2 + vel[i, 1] ** 2 + vel[i, 2] ** 2)
+        return out
+else:
+    def _speeds(vel):
+        """
+        Norms of (n, 3) velocities, computed by NumPy when Numba is not installed.
+        """
+        return np.linalg.norm(vel, axis=1)
+
+
+# Example geometries, created once: init_by_raw reads these contiguous
+# buffers directly, without converting every Python item
+_PLANE100_V = array.array('f', (0, 0, 0,  100, 0, 0,  100, 0, 100,  0, 0, 100))
+_PLANE50_V = array.array('f', (0, 0, 0,  50, 0, 0,  50, 0, 50,  0, 0, 50))
+_PLANE_F = array.array('i', (4, 0, 3, 2, 1))  # number of corners, then indices (clockwise)
+
+_PLANES = {100: _PLANE100_V, 50: _PLANE50_V}
+
+
+@functools.lru_cache(maxsize=4)
+def _build_plane(size):
+    """
+    Build the navmesh of the plane of the given size and return its bytes.
+    Cached in each process, main() builds the planes once before starting the pool
+    and passes the bytes to the processes (see _seed_plane_cache).
+    """
+    navmesh = Navmesh()
+    navmesh.init_by_raw(_PLANES[size], _PLANE_F)
+    navmesh.build_navmesh()
+    return navmesh.save_navmesh_to_bytes()
+
+
+def _materialize(data, size):
+    """
+    Create a Navmesh on the plane of the given size and load the data bytes into it.
+    """
+    navmesh = Navmesh()
+    navmesh.init_by_raw(_PLANES[size], _PLANE_F)
+    navmesh.load_navmesh_from_bytes(data)
+    return navmesh
+
+
+# plane bytes received from the parent process, in the pool processes
+_SHARED_PLANES = {}
+
+
+def _seed_plane_cache(planes):
+    """
+    Initializer of the pool processes: receives the plane bytes built by main().
+    """
+    _SHARED_PLANES.update(planes)
+
+
+def _get_plane_navmesh(size):
+    """
+    Return a ready to use Navmesh for the plane of the given size.
+    """
+    data = _SHARED_PLANES.get(size)
+    if data is None:
+        data = _build_plane(size)
+    return _materialize(data, size)
+
+
+# PYRD_REALTIME=0 disables waiting between frames (benchmarks, CI)
+REALTIME = os.environ.get("PYRD_REALTIME", "1") == "1"
+
+# final margin waited in a busy loop: time.sleep can overshoot by the system
+# timer resolution (up to ~15.6 ms by default on Windows)
+_SPIN_MARGIN = 1e-3
+
+if REALTIME and sys.platform == "win32":
+    # 1 ms Windows timer resolution while the examples run
+    _winmm = ctypes.WinDLL("winmm")
+    _winmm.timeBeginPeriod(1)
+    atexit.register(_winmm.timeEndPeriod, 1)
+
+
+def _pace(deadline, dt, realtime=REALTIME):
+    """
+    Advance the frame deadline by dt and wait until it in realtime mode.
+    The wait accounts for the time already spent in the frame, so it does not drift:
+    sleep until _SPIN_MARGIN before the deadline, then busy-wait on perf_counter.
+    """
+    deadline += dt
+    if realtime:
+        delay = deadline - time.perf_counter() - _SPIN_MARGIN
+        if delay > 0:
+            time.sleep(delay)
+        while time.perf_counter() < deadline:
+            pass
+    return deadline
 
 
 def example_1_basic_pathfinding():
@@ -31,11 +151,7 @@ def example_1_basic_pathfinding():
     # navmesh.init_by_obj("level.obj")
 
     # Alternative: create simple geometry (plane)
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
+    navmesh.init_by_raw(_PLANE100_V, _PLANE_F)
 
     # Build navmesh
     navmesh.build_navmesh()
@@ -52,12 +168,12 @@ def example_1_basic_pathfinding():
     print(f"\nFinding path from {start} to {end}...")
     path = navmesh.pathfind_straight(start, end)
 
-    if path:
-        print(f"Path found with {len(path)//3} points:")
-        for i in range(0, min(len(path), 15), 3):  # Display max 5 points
-            print(f"  Point {i//3}: ({path[i]:.2f}, {path[i+1]:.2f}, {path[i+2]:.2f})")
-        if len(path) > 15:
-            print(f"  ... ({len(path)//3 - 5} more points)")
+    if len(path) > 0:
+        print(f"Path found with {len(path)} points:")
+        shown = path[:5].tolist()  # Display max 5 points, converted to Python floats in one call
+        print("\n".join(f"  Point {i}: ({x:.2f}, {y:.2f}, {z:.2f})" for i, (x, y, z) in enumerate(shown)))
+        if len(path) > 5:
+            print(f"  ... ({len(path) - 5} more points)")
     else:
         print("No path found!")
 
@@ -74,11 +190,7 @@ def example_2_custom_settings():
     navmesh = Navmesh()
 
     # Simple geometry
-    vertices = [
-        0, 0, 0,    50, 0, 0,    50, 0, 50,   0, 0, 50
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
+    navmesh.init_by_raw(_PLANE50_V, _PLANE_F)
 
     # Get default settings
     settings = navmesh.get_settings()
@@ -110,8 +222,9 @@ def example_2_custom_settings():
     # Get bounding box
     bbox = navmesh.get_bounding_box()
     print(f"\nBounding box:")
-    print(f"  Min: ({bbox[0]:.2f}, {bbox[1]:.2f}, {bbox[2]:.2f})")
-    print(f"  Max: ({bbox[3]:.2f}, {bbox[4]:.2f}, {bbox[5]:.2f})")
+    b_min, b_max = bbox
+    print(f"  Min: ({b_min[0]:.2f}, {b_min[1]:.2f}, {b_min[2]:.2f})")
+    print(f"  Max: ({b_max[0]:.2f}, {b_max[1]:.2f}, {b_max[2]:.2f})")
 
 
 def example_3_crowd_simulation():
@@ -123,15 +236,8 @@ def example_3_crowd_simulation():
     print("EXAMPLE 3: Crowd Simulation")
     print("="*60)
 
-    navmesh = Navmesh()
-
     # Create large terrain
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(100)
 
     # Initialize crowd
     print("\nInitializing crowd manager...")
@@ -144,12 +250,14 @@ def example_3_crowd_simulation():
     agents = []
     print("\nCreating agents...")
 
+    # shared parameters created once, add_agent copies them on the C++ side
+    params = create_default_agent_params()
+    params["radius"] = 0.5
+    params["height"] = 2.0
+    params["maxAcceleration"] = 8.0
+
     for i in range(5):
-        params = create_default_agent_params()
-        params["radius"] = 0.5
-        params["height"] = 2.0
         params["maxSpeed"] = 3.0 + i * 0.5  # Varied speeds
-        params["maxAcceleration"] = 8.0
 
         # Starting position in a line
         start_pos = [10.0 + i * 3.0, 0.0, 10.0]
@@ -173,27 +281,28 @@ def example_3_crowd_simulation():
     frames = 0
     display_interval = 60  # Display every 60 frames (1 second)
 
-    for _ in range(300):  # 5 seconds at 60 FPS
-        navmesh.update_crowd(dt)
+    # methods bound once, without attribute or global lookups on every frame
+    update_crowd, pace = navmesh.update_crowd, _pace
+    deadline = time.perf_counter()
+    for _ in repeat(None, 300):  # 5 seconds at 60 FPS
+        update_crowd(dt)
         frames += 1
 
         # Display state every 60 frames
         if frames % display_interval == 0:
-            print(f"Frame {frames} (t={frames*dt:.1f}s):")
-            for agent_id in agents:
-                pos = navmesh.get_agent_position(agent_id)
-                vel = navmesh.get_agent_velocity(agent_id)
-                state = navmesh.get_agent_state(agent_id)
-
-                speed = (vel[0]**2 + vel[1]**2 + vel[2]**2)**0.5
-                target_state = int(state['targetState'])
-
-                status = "VALID" if target_state == CROWDAGENT_TARGET_VALID else "OTHER"
-                print(f"  Agent {agent_id}: pos=({pos[0]:.1f}, {pos[2]:.1f}) "
-                      f"speed={speed:.2f} target={status}")
-            print()
-
-        time.sleep(dt)
+            lines = [f"Frame {frames} (t={frames*dt:.1f}s):"]
+            # one call for all agents, speeds computed outside of the Python loop
+            pos, vel, target_state = navmesh.get_agents_snapshot(agents)
+            speeds = _speeds(vel)
+            valid = target_state == CROWDAGENT_TARGET_VALID
+            for agent_id, (x, _, z), speed, is_valid in zip(agents, pos.tolist(), speeds.tolist(), valid.tolist()):
+                status = "VALID" if is_valid else "OTHER"
+                lines.append(f"  Agent {agent_id}: pos=({x:.1f}, {z:.1f}) "
+                             f"speed={speed:.2f} target={status}")
+            # one write per display instead of one print per agent
+            sys.stdout.write("\n".join(lines) + "\n\n")
+
+        deadline = pace(deadline, dt)
 
     print("Simulation complete!")
 
@@ -207,36 +316,31 @@ def example_4_dynamic_agents():
     print("EXAMPLE 4: Dynamic Agent Management")
     print("="*60)
 
-    navmesh = Navmesh()
-
     # Setup navmesh
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(100)
     navmesh.init_crowd(100, 1.0)
 
     agents = []
 
     # Add some initial agents
     print("\nAdding initial agents...")
-    for i in range(3):
-        params = create_default_agent_params()
-        agent_id = navmesh.add_agent([20.0 + i*5, 0, 20.0], params)
+    # one call adds the agents and gives them the same target
+    starts = np.array([[20.0 + i*5, 0, 20.0] for i in range(3)], dtype=np.float32)
+    ids = navmesh.add_agents(starts, DEFAULT_AGENT_PARAMS, targets=(80, 0, 80))
+    for agent_id in ids.tolist():
         agents.append(agent_id)
-        navmesh.set_agent_target(agent_id, [80, 0, 80])
         print(f"  Added agent {agent_id}")
 
     # Simulate
+    dt = 0.016
+    update_crowd, pace = navmesh.update_crowd, _pace
+    deadline = time.perf_counter()
     for frame in range(120):
-        navmesh.update_crowd(0.016)
+        update_crowd(dt)
 
         # Add an agent every 30 frames
         if frame % 30 == 0 and frame > 0:
-            params = create_default_agent_params()
-            new_agent = navmesh.add_agent([10, 0, 10], params)
+            new_agent = navmesh.add_agent([10, 0, 10], DEFAULT_AGENT_PARAMS)
             if new_agent >= 0:
                 agents.append(new_agent)
                 navmesh.set_agent_target(new_agent, [90, 0, 90])
@@ -248,7 +352,7 @@ def example_4_dynamic_agents():
             navmesh.remove_agent(removed)
             print(f"Frame {frame}: Removed agent {removed}")
 
-        time.sleep(0.016)
+        deadline = pace(deadline, dt)
 
     # Final state
     print(f"\nFinal agent count: {navmesh.get_agent_count()}")
@@ -264,15 +368,8 @@ def example_5_agent_parameters():
     print("EXAMPLE 5: Parameter Modification")
     print("="*60)
 
-    navmesh = Navmesh()
-
     # Setup
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(100)
     navmesh.init_crowd(10, 1.0)
 
     # Create agent
@@ -280,18 +377,22 @@ def example_5_agent_parameters():
     params["maxSpeed"] = 2.0
     agent_id = navmesh.add_agent([10, 0, 10], params)
     navmesh.set_agent_target(agent_id, [90, 0, 90])
+    dt = 0.016
 
     print(f"\nAgent {agent_id} created with maxSpeed=2.0")
 
     # Simulate for 2 seconds
     print("Simulating for 2 seconds...")
-    for _ in range(120):
-        navmesh.update_crowd(0.016)
-        time.sleep(0.016)
+    update_crowd, pace = navmesh.update_crowd, _pace
+    deadline = time.perf_counter()
+    for _ in repeat(None, 120):
+        update_crowd(dt)
+        deadline = pace(deadline, dt)
 
     state = navmesh.get_agent_state(agent_id)
-    pos1 = navmesh.get_agent_position(agent_id)
-    print(f"Position after 2s: ({pos1[0]:.1f}, {pos1[2]:.1f})")
+    # the state already holds the position, no second call needed
+    x1, z1 = state["posX"], state["posZ"]
+    print(f"Position after 2s: ({x1:.1f}, {z1:.1f})")
     print(f"Max speed: {state['maxSpeed']:.1f}")
 
     # Increase speed
@@ -303,23 +404,26 @@ def example_5_agent_parameters():
 
     # Simulate for 2 more seconds
     print("Simulating for 2 more seconds...")
-    for _ in range(120):
-        navmesh.update_crowd(0.016)
-        time.sleep(0.016)
+    deadline = time.perf_counter()
+    for _ in repeat(None, 120):
+        update_crowd(dt)
+        deadline = pace(deadline, dt)
 
     state = navmesh.get_agent_state(agent_id)
-    pos2 = navmesh.get_agent_position(agent_id)
-    print(f"Position after 4s: ({pos2[0]:.1f}, {pos2[2]:.1f})")
+    x2, z2 = state["posX"], state["posZ"]
+    print(f"Position after 4s: ({x2:.1f}, {z2:.1f})")
     print(f"Max speed: {state['maxSpeed']:.1f}")
 
-    distance_moved = ((pos2[0]-pos1[0])**2 + (pos2[2]-pos1[2])**2)**0.5
+    dx, dz = x2 - x1, z2 - z1
+    distance_moved = math.sqrt(dx * dx + dz * dz)
     print(f"\nDistance moved in last 2s: {distance_moved:.1f} (faster!)")
 
 
-def example_6_save_load():
+def example_6_save_load(filename=None):
     """
     Example 6: Save and Load
     Saves the built navmesh and reloads it
+    (in memory by default, in the filename file if it is given)
     """
     print("\n" + "="*60)
     print("EXAMPLE 6: Save and Load")
@@ -328,31 +432,35 @@ def example_6_save_load():
     # Build and save
     print("\nBuilding navmesh...")
     navmesh = Navmesh()
-    vertices = [
-        0, 0, 0,    50, 0, 0,    50, 0, 50,   0, 0, 50
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
+    navmesh.init_by_raw(_PLANE50_V, _PLANE_F)
     navmesh.build_navmesh()
 
-    filename = "test_navmesh.bin"
-    print(f"Saving to {filename}...")
-    navmesh.save_navmesh(filename)
-    print("Saved successfully!")
+    if filename is None:
+        # in-memory roundtrip, without disk writes or reads
+        print("Saving to bytes...")
+        data = navmesh.save_navmesh_to_bytes()
+        print(f"Saved successfully! ({len(data)} bytes)")
+    else:
+        print(f"Saving to {filename}...")
+        navmesh.save_navmesh(filename)
+        print("Saved successfully!")
 
     # Create new navmesh and load
-    print(f"\nLoading from {filename}...")
     navmesh2 = Navmesh()
-    navmesh2.init_by_raw(vertices, faces)  # Geometry needed
-    navmesh2.load_navmesh(filename)
+    navmesh2.init_by_raw(_PLANE50_V, _PLANE_F)  # Geometry needed
+    if filename is None:
+        print("\nLoading from bytes...")
+        navmesh2.load_navmesh_from_bytes(data)
+    else:
+        print(f"\nLoading from {filename}...")
+        navmesh2.load_navmesh(filename)
     print("Loaded successfully!")
 
     # Test pathfinding
     path = navmesh2.pathfind_straight([5, 0, 5], [45, 0, 45])
-    print(f"Path from loaded navmesh: {len(path)//3} points")
+    print(f"Path from loaded navmesh: {len(path)} points")
 
-    import os
-    if os.path.exists(filename):
+    if filename is not None and os.path.exists(filename):
         os.remove(filename)
         print(f"\nCleaned up {filename}")
 
@@ -366,13 +474,7 @@ def example_7_spatial_queries():
     print("EXAMPLE 7: Spatial Queries")
     print("="*60)
 
-    navmesh = Navmesh()
-    vertices = [
-        0, 0, 0,    50, 0, 0,    50, 0, 50,   0, 0, 50
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(50)
 
     # Raycast through navmesh
     print("\nRaycast test:")
@@ -389,8 +491,9 @@ def example_7_spatial_queries():
         [5, 0, 25],   # Near left edge
         [45, 0, 25]   # Near right edge
     ]
-    for point in points:
-        dist = navmesh.distance_to_wall(point)
+    # All points in one call
+    distances = navmesh.distance_to_wall_batch(np.array(points, dtype=np.float32))
+    for point, dist in zip(points, distances.tolist()):
         print(f"  At {point}: {dist:.2f} units to wall")
 
     # Hit mesh (original geometry)
@@ -399,6 +502,17 @@ def example_7_spatial_queries():
     print(f"  Ray intersects mesh at: {mesh_hit}")
 
 
+def _run(example):
+    """
+    Run an example in a pool process and return its output,
+    so the output of parallel examples is not interleaved.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        example()
+    return output.getvalue()
+
+
 def main():
     """
     Main function - runs all examples
@@ -410,14 +524,22 @@ def main():
     print("Some require .obj files - modify the code if necessary.")
 
     try:
-        # Quick examples (no sleep)
-        example_1_basic_pathfinding()
-        example_2_custom_settings()
-        example_6_save_load()
-        example_7_spatial_queries()
+        # Quick examples (no sleep), independent: run in parallel in separate
+        # processes, their output is printed in order once they are done
+        quick_examples = [
+            example_1_basic_pathfinding,
+            example_2_custom_settings,
+            example_6_save_load,
+            example_7_spatial_queries,
+        ]
+        # planes built only once here, every pool process reloads them from these bytes
+        planes = {size: _build_plane(size) for size in _PLANES}
+        with ProcessPoolExecutor(max_workers=4, initializer=_seed_plane_cache, initargs=(planes,)) as executor:
+            for output in executor.map(_run, quick_examples):
+                print(output, end="")
 
         # Examples with simulation (commented by default as they take time)
-        # Uncomment to run them:
+        # Uncomment to run them, PYRD_REALTIME=0 runs them without waiting:
 
         # example_3_crowd_simulation()
         # example_4_dynamic_agents()
@@ -6,13 +6,133 @@ PyRecastDetour - Exemples d'utilisation
 from PyRecastDetour import (
     Navmesh,
     create_default_agent_params,
+    DEFAULT_AGENT_PARAMS,
     CROWD_ANTICIPATE_TURNS,
     CROWD_OBSTACLE_AVOIDANCE,
     CROWD_OPTIMIZE_VIS,
     CROWD_OPTIMIZE_TOPO,
     CROWDAGENT_TARGET_VALID
 )
+import array
+import atexit
+import contextlib
+import ctypes
+import functools
+import io
+import math
+import os
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _speeds(vel):
+        """
+        Normes des vitesses (n, 3), compilées par Numba pour les grandes foules.
+        """
+        out = np.empty(vel.shape[0], dtype=vel.dtype)
+        for i in prange(vel.shape[0]):
+            out[i] = math.sqrt(vel[i, 0] ** 2 + vel[i, 1] ** 2 + vel[i, 2] ** 2)
+        return out
+else:
+    def _speeds(vel):
+        """
+        Normes des vitesses (n, 3), calculées par NumPy quand Numba n'est pas installé.
+        """
+        return np.linalg.norm(vel, axis=1)
+
+
+# Géométries des exemples, créées une seule fois: init_by_raw lit ces tampons
+# contigus directement, sans convertir chaque élément Python
+_PLANE100_V = array.array('f', (0, 0, 0,  100, 0, 0,  100, 0, 100,  0, 0, 100))
+_PLANE50_V = array.array('f', (0, 0, 0,  50, 0, 0,  50, 0, 50,  0, 0, 50))
+_PLANE_F = array.array('i', (4, 0, 3, 2, 1))  # nombre de coins puis indices (sens horaire)
+
+_PLANES = {100: _PLANE100_V, 50: _PLANE50_V}
+
+
+@functools.lru_cache(maxsize=4)
+def _build_plane(size):
+    """
+    Construit le navmesh du plan de la taille donnée et retourne ses octets.
+    Mis en cache dans chaque processus, main() construit les plans une seule fois avant
+    de lancer le pool et transmet les octets aux processus (voir _seed_plane_cache).
+    """
+    navmesh = Navmesh()
+    navmesh.init_by_raw(_PLANES[size], _PLANE_F)
+    navmesh.build_navmesh()
+    return navmesh.save_navmesh_to_bytes()
+
+
+def _materialize(data, size):
+    """
+    Crée un Navmesh sur le plan de la taille donnée et y charge les octets data.
+    """
+    navmesh = Navmesh()
+    navmesh.init_by_raw(_PLANES[size], _PLANE_F)
+    navmesh.load_navmesh_from_bytes(data)
+    return navmesh
+
+
+# octets des plans reçus du processus parent, dans les processus du pool
+_SHARED_PLANES = {}
+
+
+def _seed_plane_cache(planes):
+    """
+    Initialiseur des processus du pool: reçoit les octets des plans construits par main().
+    """
+    _SHARED_PLANES.update(planes)
+
+
+def _get_plane_navmesh(size):
+    """
+    Retourne un Navmesh prêt à l'emploi pour le plan de la taille donnée.
+    """
+    data = _SHARED_PLANES.get(size)
+    if data is None:
+        data = _build_plane(size)
+    return _materialize(data, size)
+
+
+# PYRD_REALTIME=0 désactive l'attente entre les frames (benchmarks, CI)
+REALTIME = os.environ.get("PYRD_REALTIME", "1") == "1"
+
+# marge finale attendue en boucle active: time.sleep peut dépasser son délai de
+# la résolution du timer système (jusqu'à ~15.6 ms par défaut sous Windows)
+_SPIN_MARGIN = 1e-3
+
+if REALTIME and sys.platform == "win32":
+    # résolution du timer Windows à 1 ms pendant l'exécution des exemples
+    _winmm = ctypes.WinDLL("winmm")
+    _winmm.timeBeginPeriod(1)
+    atexit.register(_winmm.timeEndPeriod, 1)
+
+
+def _pace(deadline, dt, realtime=REALTIME):
+    """
+    Avance l'échéance de la frame de dt et attend jusqu'à elle en mode temps réel.
+    L'attente tient compte du temps déjà passé dans la frame, sans dérive:
+    sleep jusqu'à _SPIN_MARGIN de l'échéance, puis boucle active sur perf_counter.
+    """
+    deadline += dt
+    if realtime:
+        delay = deadline - time.perf_counter() - _SPIN_MARGIN
+        if delay > 0:
+            time.sleep(delay)
+        while time.perf_counter() < deadline:
+            pass
+    return deadline
 
 
 def example_1_basic_pathfinding():
@@ -31,11 +151,7 @@ def example_1_basic_pathfinding():
     # navmesh.init_by_obj("level.obj")
 
     # Alternative: créer une géométrie simple (plan)
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
+    navmesh.init_by_raw(_PLANE100_V, _PLANE_F)
 
     # Construire navmesh
     navmesh.build_navmesh()
@@ -52,12 +168,12 @@ def example_1_basic_pathfinding():
     print(f"\nFinding path from {start} to {end}...")
     path = navmesh.pathfind_straight(start, end)
 
-    if path:
-        print(f"Path found with {len(path)//3} points:")
-        for i in range(0, min(len(path), 15), 3):  # Afficher max 5 points
-            print(f"  Point {i//3}: ({path[i]:.2f}, {path[i+1]:.2f}, {path[i+2]:.2f})")
-        if len(path) > 15:
-            print(f"  ... ({len(path)//3 - 5} more points)")
+    if len(path) > 0:
+        print(f"Path found with {len(path)} points:")
+        shown = path[:5].tolist()  # Afficher max 5 points, convertis en floats Python en un seul appel
+        print("\n".join(f"  Point {i}: ({x:.2f}, {y:.2f}, {z:.2f})" for i, (x, y, z) in enumerate(shown)))
+        if len(path) > 5:
+            print(f"  ... ({len(path) - 5} more points)")
     else:
         print("No path found!")
 
@@ -74,11 +190,7 @@ def example_2_custom_settings():
     navmesh = Navmesh()
 
     # Géométrie simple
-    vertices = [
-        0, 0, 0,    50, 0, 0,    50, 0, 50,   0, 0, 50
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
+    navmesh.init_by_raw(_PLANE50_V, _PLANE_F)
 
     # Récupérer settings par défaut
     settings = navmesh.get_settings()
@@ -110,8 +222,9 @@ def example_2_custom_settings():
     # Obtenir bounding box
     bbox = navmesh.get_bounding_box()
     print(f"\nBounding box:")
-    print(f"  Min: ({bbox[0]:.2f}, {bbox[1]:.2f}, {bbox[2]:.2f})")
-    print(f"  Max: ({bbox[3]:.2f}, {bbox[4]:.2f}, {bbox[5]:.2f})")
+    b_min, b_max = bbox
+    print(f"  Min: ({b_min[0]:.2f}, {b_min[1]:.2f}, {b_min[2]:.2f})")
+    print(f"  Max: ({b_max[0]:.2f}, {b_max[1]:.2f}, {b_max[2]:.2f})")
 
 
 def example_3_crowd_simulation():
@@ -123,15 +236,8 @@ def example_3_crowd_simulation():
     print("EXEMPLE 3: Simulation de Foule")
     print("="*60)
 
-    navmesh = Navmesh()
-
     # Créer un grand terrain
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(100)
 
     # Initialiser crowd
     print("\nInitializing crowd manager...")
@@ -144,12 +250,14 @@ def example_3_crowd_simulation():
     agents = []
     print("\nCreating agents...")
 
+    # paramètres communs créés une seule fois, add_agent les copie côté C++
+    params = create_default_agent_params()
+    params["radius"] = 0.5
+    params["height"] = 2.0
+    params["maxAcceleration"] = 8.0
+
     for i in range(5):
-        params = create_default_agent_params()
-        params["radius"] = 0.5
-        params["height"] = 2.0
         params["maxSpeed"] = 3.0 + i * 0.5  # Vitesses variées
-        params["maxAcceleration"] = 8.0
 
         # Position de départ en ligne
         start_pos = [10.0 + i * 3.0, 0.0, 10.0]
@@ -173,27 +281,28 @@ def example_3_crowd_simulation():
     frames = 0
     display_interval = 60  # Afficher tous les 60 frames (1 seconde)
 
-    for _ in range(300):  # 5 secondes à 60 FPS
-        navmesh.update_crowd(dt)
+    # méthodes liées une fois, sans recherche d'attribut ni de global à chaque frame
+    update_crowd, pace = navmesh.update_crowd, _pace
+    deadline = time.perf_counter()
+    for _ in repeat(None, 300):  # 5 secondes à 60 FPS
+        update_crowd(dt)
         frames += 1
 
         # Afficher état tous les 60 frames
         if frames % display_interval == 0:
-            print(f"Frame {frames} (t={frames*dt:.1f}s):")
-            for agent_id in agents:
-                pos = navmesh.get_agent_position(agent_id)
-                vel = navmesh.get_agent_velocity(agent_id)
-                state = navmesh.get_agent_state(agent_id)
-
-                speed = (vel[0]**2 + vel[1]**2 + vel[2]**2)**0.5
-                target_state = int(state['targetState'])
-
-                status = "VALID" if target_state == CROWDAGENT_TARGET_VALID else "OTHER"
-                print(f"  Agent {agent_id}: pos=({pos[0]:.1f}, {pos[2]:.1f}) "
-                      f"speed={speed:.2f} target={status}")
-            print()
-
-        time.sleep(dt)
+            lines = [f"Frame {frames} (t={frames*dt:.1f}s):"]
+            # un seul appel pour tous les agents, vitesses calculées hors de la boucle Python
+            pos, vel, target_state = navmesh.get_agents_snapshot(agents)
+            speeds = _speeds(vel)
+            valid = target_state == CROWDAGENT_TARGET_VALID
+            for agent_id, (x, _, z), speed, is_valid in zip(agents, pos.tolist(), speeds.tolist(), valid.tolist()):
+                status = "VALID" if is_valid else "OTHER"
+                lines.append(f"  Agent {agent_id}: pos=({x:.1f}, {z:.1f}) "
+                             f"speed={speed:.2f} target={status}")
+            # une seule écriture par affichage au lieu d'un print par agent
+            sys.stdout.write("\n".join(lines) + "\n\n")
+
+        deadline = pace(deadline, dt)
 
     print("Simulation complete!")
 
@@ -207,36 +316,31 @@ def example_4_dynamic_agents():
     print("EXEMPLE 4: Gestion Dynamique d'Agents")
     print("="*60)
 
-    navmesh = Navmesh()
-
     # Setup navmesh
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(100)
     navmesh.init_crowd(100, 1.0)
 
     agents = []
 
     # Ajouter quelques agents initiaux
     print("\nAdding initial agents...")
-    for i in range(3):
-        params = create_default_agent_params()
-        agent_id = navmesh.add_agent([20.0 + i*5, 0, 20.0], params)
+    # un seul appel ajoute les agents et leur donne la même cible
+    starts = np.array([[20.0 + i*5, 0, 20.0] for i in range(3)], dtype=np.float32)
+    ids = navmesh.add_agents(starts, DEFAULT_AGENT_PARAMS, targets=(80, 0, 80))
+    for agent_id in ids.tolist():
         agents.append(agent_id)
-        navmesh.set_agent_target(agent_id, [80, 0, 80])
         print(f"  Added agent {agent_id}")
 
     # Simuler
+    dt = 0.016
+    update_crowd, pace = navmesh.update_crowd, _pace
+    deadline = time.perf_counter()
     for frame in range(120):
-        navmesh.update_crowd(0.016)
+        update_crowd(dt)
 
         # Ajouter un agent toutes les 30 frames
         if frame % 30 == 0 and frame > 0:
-            params = create_default_agent_params()
-            new_agent = navmesh.add_agent([10, 0, 10], params)
+            new_agent = navmesh.add_agent([10, 0, 10], DEFAULT_AGENT_PARAMS)
             if new_agent >= 0:
                 agents.append(new_agent)
                 navmesh.set_agent_target(new_agent, [90, 0, 90])
@@ -248,7 +352,7 @@ def example_4_dynamic_agents():
             navmesh.remove_agent(removed)
             print(f"Frame {frame}: Removed agent {removed}")
 
-        time.sleep(0.016)
+        deadline = pace(deadline, dt)
 
     # État final
     print(f"\nFinal agent count: {navmesh.get_agent_count()}")
@@ -264,15 +368,8 @@ def example_5_agent_parameters():
     print("EXEMPLE 5: Modification des Paramètres")
     print("="*60)
 
-    navmesh = Navmesh()
-
     # Setup
-    vertices = [
-        0, 0, 0,    100, 0, 0,    100, 0, 100,   0, 0, 100
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(100)
     navmesh.init_crowd(10, 1.0)
 
     # Créer agent
@@ -280,18 +377,22 @@ def example_5_agent_parameters():
     params["maxSpeed"] = 2.0
     agent_id = navmesh.add_agent([10, 0, 10], params)
     navmesh.set_agent_target(agent_id, [90, 0, 90])
+    dt = 0.016
 
     print(f"\nAgent {agent_id} created with maxSpeed=2.0")
 
     # Simuler 2 secondes
     print("Simulating for 2 seconds...")
-    for _ in range(120):
-        navmesh.update_crowd(0.016)
-        time.sleep(0.016)
+    update_crowd, pace = navmesh.update_crowd, _pace
+    deadline = time.perf_counter()
+    for _ in repeat(None, 120):
+        update_crowd(dt)
+        deadline = pace(deadline, dt)
 
     state = navmesh.get_agent_state(agent_id)
-    pos1 = navmesh.get_agent_position(agent_id)
-    print(f"Position after 2s: ({pos1[0]:.1f}, {pos1[2]:.1f})")
+    # l'état contient déjà la position, pas besoin d'un second appel
+    x1, z1 = state["posX"], state["posZ"]
+    print(f"Position after 2s: ({x1:.1f}, {z1:.1f})")
     print(f"Max speed: {state['maxSpeed']:.1f}")
 
     # Augmenter la vitesse
@@ -303,23 +404,26 @@ def example_5_agent_parameters():
 
     # Simuler 2 secondes de plus
     print("Simulating for 2 more seconds...")
-    for _ in range(120):
-        navmesh.update_crowd(0.016)
-        time.sleep(0.016)
+    deadline = time.perf_counter()
+    for _ in repeat(None, 120):
+        update_crowd(dt)
+        deadline = pace(deadline, dt)
 
     state = navmesh.get_agent_state(agent_id)
-    pos2 = navmesh.get_agent_position(agent_id)
-    print(f"Position after 4s: ({pos2[0]:.1f}, {pos2[2]:.1f})")
+    x2, z2 = state["posX"], state["posZ"]
+    print(f"Position after 4s: ({x2:.1f}, {z2:.1f})")
     print(f"Max speed: {state['maxSpeed']:.1f}")
 
-    distance_moved = ((pos2[0]-pos1[0])**2 + (pos2[2]-pos1[2])**2)**0.5
+    dx, dz = x2 - x1, z2 - z1
+    distance_moved = math.sqrt(dx * dx + dz * dz)
     print(f"\nDistance moved in last 2s: {distance_moved:.1f} (faster!)")
 
 
-def example_6_save_load():
+def example_6_save_load(filename=None):
     """
     Exemple 6: Sauvegarde et chargement
     Sauvegarde le navmesh construit et le recharge
+    (en mémoire par défaut, dans le fichier filename s'il est donné)
     """
     print("\n" + "="*60)
     print("EXEMPLE 6: Sauvegarde et Chargement")
@@ -328,31 +432,35 @@ def example_6_save_load():
     # Construire et sauvegarder
     print("\nBuilding navmesh...")
     navmesh = Navmesh()
-    vertices = [
-        0, 0, 0,    50, 0, 0,    50, 0, 50,   0, 0, 50
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
+    navmesh.init_by_raw(_PLANE50_V, _PLANE_F)
     navmesh.build_navmesh()
 
-    filename = "test_navmesh.bin"
-    print(f"Saving to {filename}...")
-    navmesh.save_navmesh(filename)
-    print("Saved successfully!")
+    if filename is None:
+        # aller-retour en mémoire, sans écriture ni lecture disque
+        print("Saving to bytes...")
+        data = navmesh.save_navmesh_to_bytes()
+        print(f"Saved successfully! ({len(data)} bytes)")
+    else:
+        print(f"Saving to {filename}...")
+        navmesh.save_navmesh(filename)
+        print("Saved successfully!")
 
     # Créer nouveau navmesh et charger
-    print(f"\nLoading from {filename}...")
     navmesh2 = Navmesh()
-    navmesh2.init_by_raw(vertices, faces)  # Géométrie nécessaire
-    navmesh2.load_navmesh(filename)
+    navmesh2.init_by_raw(_PLANE50_V, _PLANE_F)  # Géométrie nécessaire
+    if filename is None:
+        print("\nLoading from bytes...")
+        navmesh2.load_navmesh_from_bytes(data)
+    else:
+        print(f"\nLoading from {filename}...")
+        navmesh2.load_navmesh(filename)
     print("Loaded successfully!")
 
     # Tester pathfinding
     path = navmesh2.pathfind_straight([5, 0, 5], [45, 0, 45])
-    print(f"Path from loaded navmesh: {len(path)//3} points")
+    print(f"Path from loaded navmesh: {len(path)} points")
 
-    import os
-    if os.path.exists(filename):
+    if filename is not None and os.path.exists(filename):
         os.remove(filename)
         print(f"\nCleaned up {filename}")
 
@@ -366,13 +474,7 @@ def example_7_spatial_queries():
     print("EXEMPLE 7: Requêtes Spatiales")
     print("="*60)
 
-    navmesh = Navmesh()
-    vertices = [
-        0, 0, 0,    50, 0, 0,    50, 0, 50,   0, 0, 50
-    ]
-    faces = [0, 1, 2,  0, 2, 3]
-    navmesh.init_by_raw(vertices, faces)
-    navmesh.build_navmesh()
+    navmesh = _get_plane_navmesh(50)
 
     # Raycast à travers le navmesh
     print("\nRaycast test:")
@@ -389,8 +491,9 @@ def example_7_spatial_queries():
         [5, 0, 25],   # Près du bord gauche
         [45, 0, 25]   # Près du bord droit
     ]
-    for point in points:
-        dist = navmesh.distance_to_wall(point)
+    # Tous les points en un seul appel
+    distances = navmesh.distance_to_wall_batch(np.array(points, dtype=np.float32))
+    for point, dist in zip(points, distances.tolist()):
         print(f"  At {point}: {dist:.2f} units to wall")
 
     # Hit mesh (géométrie originale)
@@ -399,6 +502,17 @@ def example_7_spatial_queries():
     print(f"  Ray intersects mesh at: {mesh_hit}")
 
 
+def _run(example):
+    """
+    Exécute un exemple dans un processus du pool et retourne sa sortie,
+    pour que les sorties des exemples parallèles ne se mélangent pas.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        example()
+    return output.getvalue()
+
+
 def main():
     """
     Fonction principale - exécute tous les exemples
@@ -410,14 +524,22 @@ def main():
     print("Certains nécessitent des fichiers .obj - modifiez le code si nécessaire.")
 
     try:
-        # Exemples rapides (pas de sleep)
-        example_1_basic_pathfinding()
-        example_2_custom_settings()
-        example_6_save_load()
-        example_7_spatial_queries()
+        # Exemples rapides (pas de sleep), indépendants: exécutés en parallèle dans des
+        # processus séparés, leur sortie est affichée dans l'ordre une fois terminés
+        quick_examples = [
+            example_1_basic_pathfinding,
+            example_2_custom_settings,
+            example_6_save_load,
+            example_7_spatial_queries,
+        ]
+        # plans construits une seule fois ici, chaque processus du pool les recharge depuis ces octets
+        planes = {size: _build_plane(size) for size in _PLANES}
+        with ProcessPoolExecutor(max_workers=4, initializer=_seed_plane_cache, initargs=(planes,)) as executor:
+            for output in executor.map(_run, quick_examples):
+                print(output, end="")
 
         # Exemples avec simulation (commentés par défaut car ils prennent du temps)
-        # Décommentez pour les exécuter:
+        # Décommentez pour les exécuter, PYRD_REALTIME=0 les exécute sans attendre:
 
         # example_3_crowd_simulation()
         # example_4_dynamic_agents()
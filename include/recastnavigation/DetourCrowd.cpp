@@ -1176,6 +1176,10 @@ void dtCrowd::update(const float dt, dtCrowdAgentDebugInfo* debug)
 	}
 		
 	// Calculate steering.
+	// Each agent writes only its own desired velocity and reads neighbour positions, so the loop can be parallel.
+#ifdef _OPENMP
+#pragma omp parallel for schedule(dynamic, 16)
+#endif
 	for (int i = 0; i < nagents; ++i)
 	{
 		dtCrowdAgent* ag = agents[i];
@@ -1213,6 +1217,7 @@ void dtCrowd::update(const float dt, dtCrowdAgentDebugInfo* debug)
 		{
 			const float separationDist = ag->params.collisionQueryRange; 
 			const float invSeparationDist = 1.0f / separationDist; 
+			const float separationDistSqr = dtSqr(separationDist);
 			const float separationWeight = ag->params.separationWeight;
 			
 			float w = 0;
@@ -1226,16 +1231,16 @@ void dtCrowd::update(const float dt, dtCrowdAgentDebugInfo* debug)
 				dtVsub(diff, ag->npos, nei->npos);
 				diff[1] = 0;
 				
+				// Branchless: neighbours that are too close or out of range get a zero mask
+				// instead of a data dependent continue. The distance is clamped so that the
+				// masked-out terms stay finite.
 				const float distSqr = dtVlenSqr(diff);
-				if (distSqr < 0.00001f)
-					continue;
-				if (distSqr > dtSqr(separationDist))
-					continue;
-				const float dist = dtMathSqrtf(distSqr);
-				const float weight = separationWeight * (1.0f - dtSqr(dist*invSeparationDist));
+				const float inRange = (float)((distSqr >= 0.00001f) & (distSqr <= separationDistSqr));
+				const float dist = dtMathSqrtf(dtMax(distSqr, 0.00001f));
+				const float weight = inRange * separationWeight * (1.0f - dtSqr(dist*invSeparationDist));
 				
 				dtVmad(disp, disp, diff, weight/dist);
-				w += 1.0f;
+				w += inRange;
 			}
 			
 			if (w > 0.0001f)
@@ -1312,6 +1317,9 @@ void dtCrowd::update(const float dt, dtCrowdAgentDebugInfo* debug)
 	}
 
 	// Integrate.
+#ifdef _OPENMP
+#pragma omp parallel for schedule(dynamic, 16)
+#endif
 	for (int i = 0; i < nagents; ++i)
 	{
 		dtCrowdAgent* ag = agents[i];
@@ -1325,6 +1333,10 @@ void dtCrowd::update(const float dt, dtCrowdAgentDebugInfo* debug)
 	
 	for (int iter = 0; iter < 4; ++iter)
 	{
+		// Two phases: displacements are computed from the current positions first and applied after that.
+#ifdef _OPENMP
+#pragma omp parallel for schedule(dynamic, 16)
+#endif
 		for (int i = 0; i < nagents; ++i)
 		{
 			dtCrowdAgent* ag = agents[i];
@@ -1377,6 +1389,9 @@ void dtCrowd::update(const float dt, dtCrowdAgentDebugInfo* debug)
 			}
 		}
 		
+#ifdef _OPENMP
+#pragma omp parallel for schedule(dynamic, 16)
+#endif
 		for (int i = 0; i < nagents; ++i)
 		{
 			dtCrowdAgent* ag = agents[i];